@@ -10,7 +10,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.core.config import settings
 from app.models.base import Base
-from app.models.hotel import Room, Guest, Booking, Employee, FinancialTransaction
+from app.models.hotel import Room, Guest, Booking, Employee, FinancialTransaction, RoomHold, RoomInventory, Allotment, BookingChange
+from app.models.audit import NightAuditRun, DailyRevenue
+from app.models.idempotency import IdempotencyKey
 
 config = context.config
 
@@ -0,0 +1,61 @@
+"""add allotments
+
+Revision ID: add_allotments
+Revises: add_room_assignment
+Create Date: 2026-10-20 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_allotments'
+down_revision = 'add_room_assignment'
+branch_labels = None
+depends_on = None
+
+# The roomtype enum already exists (rooms.type)
+roomtype = postgresql.ENUM('GUEST_HOUSE', 'FRAME', name='roomtype', create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'allotments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('holder', sa.String(), nullable=False),
+        sa.Column('room_type', roomtype, nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('rooms', sa.Integer(), nullable=False),
+        sa.Column('release_date', sa.Date(), nullable=False),
+        sa.Column('released_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_allotments_id'), 'allotments', ['id'], unique=False)
+    op.create_index(op.f('ix_allotments_release_date'), 'allotments', ['release_date'], unique=False)
+
+    op.add_column('bookings', sa.Column('allotment_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'bookings_allotment_id_fkey', 'bookings', 'allotments', ['allotment_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index(op.f('ix_bookings_allotment_id'), 'bookings', ['allotment_id'], unique=False)
+
+    op.add_column('inventory', sa.Column('allotted', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column(
+        'night_audit_runs', sa.Column('allotments_released', sa.Integer(), nullable=False, server_default='0')
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('night_audit_runs', 'allotments_released')
+    op.drop_column('inventory', 'allotted')
+    op.drop_index(op.f('ix_bookings_allotment_id'), table_name='bookings')
+    op.drop_constraint('bookings_allotment_id_fkey', 'bookings', type_='foreignkey')
+    op.drop_column('bookings', 'allotment_id')
+    op.drop_index(op.f('ix_allotments_release_date'), table_name='allotments')
+    op.drop_index(op.f('ix_allotments_id'), table_name='allotments')
+    op.drop_table('allotments')
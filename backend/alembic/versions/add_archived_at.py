@@ -0,0 +1,30 @@
+"""add archived_at to rooms, guests and bookings
+
+Revision ID: add_archived_at
+Revises: update_foreign_keys
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_archived_at'
+down_revision = 'update_foreign_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Archived rows stay in the database but are hidden from listings.
+    # Hard deletes rely on the ON DELETE CASCADE keys from update_foreign_keys.
+    op.add_column('rooms', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.add_column('guests', sa.Column('archived_at', sa.DateTime(), nullable=True))
+    op.add_column('bookings', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('bookings', 'archived_at')
+    op.drop_column('guests', 'archived_at')
+    op.drop_column('rooms', 'archived_at')
@@ -0,0 +1,47 @@
+"""add booking changes
+
+Revision ID: add_booking_changes
+Revises: add_allotments
+Create Date: 2026-10-21 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_booking_changes'
+down_revision = 'add_allotments'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'booking_changes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('booking_id', sa.Integer(), nullable=False),
+        sa.Column('changed_by', sa.Integer(), nullable=True),
+        sa.Column('old_check_in_date', sa.Date(), nullable=False),
+        sa.Column('old_check_out_date', sa.Date(), nullable=False),
+        sa.Column('new_check_in_date', sa.Date(), nullable=False),
+        sa.Column('new_check_out_date', sa.Date(), nullable=False),
+        sa.Column('old_room_id', sa.Integer(), nullable=True),
+        sa.Column('new_room_id', sa.Integer(), nullable=True),
+        sa.Column('old_total_price', sa.Float(), nullable=True),
+        sa.Column('new_total_price', sa.Float(), nullable=True),
+        sa.Column('reason', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['booking_id'], ['bookings.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['changed_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_changes_id'), 'booking_changes', ['id'], unique=False)
+    op.create_index(op.f('ix_booking_changes_booking_id'), 'booking_changes', ['booking_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_booking_changes_booking_id'), table_name='booking_changes')
+    op.drop_index(op.f('ix_booking_changes_id'), table_name='booking_changes')
+    op.drop_table('booking_changes')
@@ -0,0 +1,29 @@
+"""add booking date and status indexes
+
+Revision ID: add_booking_date_indexes
+Revises: add_archived_at
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_booking_date_indexes'
+down_revision = 'add_archived_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Arrivals, departures and in-house lists filter on these
+    op.create_index('ix_bookings_check_in_date_status', 'bookings', ['check_in_date', 'status'])
+    op.create_index('ix_bookings_check_out_date_status', 'bookings', ['check_out_date', 'status'])
+    op.create_index('ix_bookings_status', 'bookings', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_status', table_name='bookings')
+    op.drop_index('ix_bookings_check_out_date_status', table_name='bookings')
+    op.drop_index('ix_bookings_check_in_date_status', table_name='bookings')
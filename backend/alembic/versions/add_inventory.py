@@ -0,0 +1,50 @@
+"""add room type inventory and type-level bookings
+
+Revision ID: add_inventory
+Revises: add_room_holds
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_inventory'
+down_revision = 'add_room_holds'
+branch_labels = None
+depends_on = None
+
+# The roomtype enum already exists (rooms.type)
+roomtype = postgresql.ENUM('GUEST_HOUSE', 'FRAME', name='roomtype', create_type=False)
+
+
+def upgrade() -> None:
+    op.add_column('bookings', sa.Column('room_type', roomtype, nullable=True))
+    op.execute(
+        "UPDATE bookings SET room_type = (SELECT rooms.type FROM rooms WHERE rooms.id = bookings.room_id)"
+    )
+
+    # Rows are created on first use with counts taken from bookings and holds,
+    # so existing data needs no backfill
+    op.create_table(
+        'inventory',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('room_type', roomtype, nullable=False),
+        sa.Column('night', sa.Date(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('sold', sa.Integer(), nullable=False),
+        sa.Column('held', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('room_type', 'night', name='uq_inventory_room_type_night')
+    )
+    op.create_index(op.f('ix_inventory_id'), 'inventory', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventory_id'), table_name='inventory')
+    op.drop_table('inventory')
+    op.drop_column('bookings', 'room_type')
@@ -0,0 +1,68 @@
+"""add night audit run log, daily revenue and no_show status
+
+Revision ID: add_night_audit
+Revises: add_booking_date_indexes
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_night_audit'
+down_revision = 'add_booking_date_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # ADD VALUE can't run inside a transaction block on older PostgreSQL
+        with op.get_context().autocommit_block():
+            op.execute("ALTER TYPE bookingstatus ADD VALUE IF NOT EXISTS 'no_show'")
+
+    op.create_table(
+        'night_audit_runs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('business_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('duration_ms', sa.Integer(), nullable=True),
+        sa.Column('checked_out', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_shows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rooms_blocked', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rooms_released', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_night_audit_runs_id'), 'night_audit_runs', ['id'], unique=False)
+    op.create_index(op.f('ix_night_audit_runs_business_date'), 'night_audit_runs', ['business_date'], unique=False)
+
+    op.create_table(
+        'daily_revenue',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('business_date', sa.Date(), nullable=False),
+        sa.Column('income', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('expenses', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('room_revenue', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rooms_occupied', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rooms_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('business_date')
+    )
+    op.create_index(op.f('ix_daily_revenue_id'), 'daily_revenue', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    # PostgreSQL can't drop a value from an enum type; 'no_show' stays in bookingstatus
+    op.drop_index(op.f('ix_daily_revenue_id'), table_name='daily_revenue')
+    op.drop_table('daily_revenue')
+    op.drop_index(op.f('ix_night_audit_runs_business_date'), table_name='night_audit_runs')
+    op.drop_index(op.f('ix_night_audit_runs_id'), table_name='night_audit_runs')
+    op.drop_table('night_audit_runs')
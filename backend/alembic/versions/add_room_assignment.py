@@ -0,0 +1,27 @@
+"""add auto_assigned and party_size to bookings
+
+Revision ID: add_room_assignment
+Revises: add_inventory
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_room_assignment'
+down_revision = 'add_inventory'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rooms were all chosen by hand, so nothing starts out movable
+    op.add_column('bookings', sa.Column('auto_assigned', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('bookings', sa.Column('party_size', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('bookings', 'party_size')
+    op.drop_column('bookings', 'auto_assigned')
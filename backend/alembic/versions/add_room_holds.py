@@ -0,0 +1,48 @@
+"""add room holds
+
+Revision ID: add_room_holds
+Revises: add_version_columns
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_room_holds'
+down_revision = 'add_version_columns'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'room_holds',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('guest_id', sa.Integer(), nullable=False),
+        sa.Column('room_id', sa.Integer(), nullable=False),
+        sa.Column('check_in_date', sa.Date(), nullable=False),
+        sa.Column('check_out_date', sa.Date(), nullable=False),
+        sa.Column('special_requests', sa.String(), nullable=True),
+        sa.Column('total_price', sa.Float(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['guest_id'], ['guests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['room_id'], ['rooms.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_room_holds_id'), 'room_holds', ['id'], unique=False)
+    op.create_index(op.f('ix_room_holds_expires_at'), 'room_holds', ['expires_at'], unique=False)
+    # Overlap checks probe bookings and holds through the same (room, dates) index
+    op.create_index('ix_room_holds_room_id_dates', 'room_holds', ['room_id', 'check_in_date', 'check_out_date'])
+    op.create_index('ix_bookings_room_id_dates', 'bookings', ['room_id', 'check_in_date', 'check_out_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bookings_room_id_dates', table_name='bookings')
+    op.drop_index('ix_room_holds_room_id_dates', table_name='room_holds')
+    op.drop_index(op.f('ix_room_holds_expires_at'), table_name='room_holds')
+    op.drop_index(op.f('ix_room_holds_id'), table_name='room_holds')
+    op.drop_table('room_holds')
@@ -0,0 +1,29 @@
+"""add version columns for optimistic concurrency
+
+Revision ID: add_version_columns
+Revises: add_idempotency_keys
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_version_columns'
+down_revision = 'add_idempotency_keys'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Mapped with version_id_col; every UPDATE checks and bumps it
+    op.add_column('rooms', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('bookings', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('room_tariffs', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('room_tariffs', 'version')
+    op.drop_column('bookings', 'version')
+    op.drop_column('rooms', 'version')
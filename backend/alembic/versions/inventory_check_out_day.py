@@ -0,0 +1,26 @@
+"""inventory counts the check-out day
+
+Revision ID: inventory_check_out_day
+Revises: add_booking_changes
+Create Date: 2026-10-22 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'inventory_check_out_day'
+down_revision = 'add_booking_changes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Rows counted stays without their check-out day. They are derived data:
+    # dropping them makes the app rebuild each one on first use, counted
+    # from bookings, holds and allotments with the new rule.
+    op.execute("DELETE FROM inventory")
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM inventory")
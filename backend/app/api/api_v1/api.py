@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.api_v1.endpoints import rooms, guests, bookings, employees, financial, dashboard, auth, users, tariffs
+from app.api.api_v1.endpoints import rooms, guests, bookings, employees, financial, dashboard, auth, users, tariffs, profiles, memory, holds, inventory, allotments
 
 api_router = APIRouter()
 
@@ -14,19 +14,29 @@ async def root():
             "rooms": "/rooms",
             "guests": "/guests",
             "bookings": "/bookings",
+            "holds": "/holds",
+            "inventory": "/inventory",
+            "allotments": "/allotments",
             "employees": "/employees",
             "financial": "/financial",
             "dashboard": "/dashboard",
-            "tariffs": "/tariffs"
+            "tariffs": "/tariffs",
+            "profiles": "/profiles",
+            "memory": "/memory"
         }
     }
 
 api_router.include_router(rooms.router, prefix="/rooms", tags=["rooms"])
 api_router.include_router(guests.router, prefix="/guests", tags=["guests"])
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
+api_router.include_router(holds.router, prefix="/holds", tags=["holds"])
+api_router.include_router(inventory.router, prefix="/inventory", tags=["inventory"])
+api_router.include_router(allotments.router, prefix="/allotments", tags=["allotments"])
 api_router.include_router(employees.router, prefix="/employees", tags=["employees"])
 api_router.include_router(financial.router, prefix="/financial", tags=["financial"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["dashboard"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(tariffs.router, prefix="/tariffs", tags=["tariffs"]) 
\ No newline at end of file
+api_router.include_router(tariffs.router, prefix="/tariffs", tags=["tariffs"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
+api_router.include_router(memory.router, prefix="/memory", tags=["memory"])
\ No newline at end of file
@@ -0,0 +1,127 @@
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.profiling import ProfilingRoute
+from app.crud.hotel import allotment as allotment_crud
+from app.models.hotel import Allotment as AllotmentModel, RoomType
+from app.models.user import User
+from app.schemas.hotel import Allotment, AllotmentCreate, AllotmentPickUp, AllotmentReleaseResult, BookingBatchResult
+from app.services import allotments
+
+router = APIRouter(route_class=ProfilingRoute)
+
+def _get_or_404(db: Session, allotment_id: int) -> AllotmentModel:
+    allotment = allotment_crud.get(db, id=allotment_id)
+    if not allotment:
+        raise HTTPException(status_code=404, detail="Allotment not found")
+    return allotment
+
+@router.get("/", response_model=List[Allotment])
+def read_allotments(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+    room_type: Optional[RoomType] = None,
+    include_released: bool = False,
+) -> Any:
+    """
+    Retrieve allotments, by start date.
+    """
+    return allotment_crud.get_filtered(
+        db, skip=skip, limit=limit, room_type=room_type, include_released=include_released
+    )
+
+@router.post("/", response_model=Allotment)
+def create_allotment(
+    *,
+    db: Session = Depends(deps.get_db),
+    allotment_in: AllotmentCreate,
+) -> Any:
+    """
+    Keep `rooms` rooms of a type for every day from start_date to end_date,
+    both included like a stay's, for a tour operator. They are taken off
+    general sale until picked up or released; 400 if the type hasn't that
+    many rooms left on some day.
+    """
+    try:
+        return allotments.create_allotment(db, allotment_in)
+    except allotments.AllotmentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/release", response_model=AllotmentReleaseResult)
+def release_due_allotments(
+    db: Session = Depends(deps.get_db),
+    on: Optional[date] = None,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Release every allotment whose release date is on or before `on` (today
+    by default), as the night audit does. Rooms not picked up go back on
+    general sale.
+    """
+    released = allotments.release_due(db, on or date.today())
+    return {"released": len(released), "allotment_ids": released}
+
+@router.get("/{allotment_id}", response_model=Allotment)
+def read_allotment(
+    *,
+    db: Session = Depends(deps.get_db),
+    allotment_id: int,
+) -> Any:
+    """
+    Get allotment by ID.
+    """
+    return _get_or_404(db, allotment_id)
+
+@router.post("/{allotment_id}/pick-up", response_model=BookingBatchResult)
+def pick_up_allotment(
+    *,
+    db: Session = Depends(deps.get_db),
+    allotment_id: int,
+    pick_up_in: AllotmentPickUp,
+) -> Any:
+    """
+    Book guests into the allotment, in one transaction like POST
+    /bookings/batch. Stays must fall within the allotment's dates and are
+    priced at the current tariff. With all_or_nothing (the default) any
+    invalid item rejects the whole pick-up with 409.
+    """
+    allotment = _get_or_404(db, allotment_id)
+    try:
+        results, created = allotments.pick_up(
+            db, allotment, pick_up_in.items, all_or_nothing=pick_up_in.all_or_nothing
+        )
+    except allotments.AllotmentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    body = {
+        "created": len(created),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "results": results,
+    }
+    if pick_up_in.all_or_nothing and body["failed"]:
+        raise HTTPException(status_code=409, detail=body)
+    return body
+
+@router.post("/{allotment_id}/release", response_model=Allotment)
+def release_allotment(
+    *,
+    db: Session = Depends(deps.get_db),
+    allotment_id: int,
+) -> Any:
+    """
+    Release an allotment before its release date.
+    """
+    return allotments.release(db, _get_or_404(db, allotment_id))
+
+@router.delete("/{allotment_id}", response_model=dict)
+def delete_allotment(
+    allotment_id: int,
+    db: Session = Depends(deps.get_db),
+):
+    """
+    Delete an allotment. Bookings picked up from it are kept.
+    """
+    allotments.delete(db, _get_or_404(db, allotment_id))
+    return {"message": "Allotment deleted", "allotment_id": allotment_id}
@@ -3,44 +3,60 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 import logging
 from jose import jwt, JWTError
 
 from app.api import deps
-from app.core import security
+from app.core import metrics, security
 from app.core.config import settings
 from app.schemas.user import User, UserCreate, Token
 from app.models.user import User as UserModel
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 logger = logging.getLogger(__name__)
 
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many concurrent logins, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     db: Session = Depends(deps.get_db),
     form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
     """
     OAuth2 compatible token login, get an access token for future requests
     """
-    logger.info(f"Login attempt for user: {form_data.username}")
-    user = deps.authenticate_user(db, form_data.username, form_data.password)
+    logger.info("Login attempt for user: %s", form_data.username)
+    try:
+        user = await deps.authenticate_user(db, form_data.username, form_data.password)
+    except security.PasswordHasherBusy:
+        logger.warning("Login rejected, password hasher busy: %s", form_data.username)
+        metrics.LOGIN_FAILURES.labels("busy").inc()
+        raise _hasher_busy()
     if not user:
-        logger.warning(f"Login failed for user: {form_data.username}")
+        logger.warning("Login failed for user: %s", form_data.username)
+        metrics.LOGIN_FAILURES.labels("invalid_credentials").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     elif not user.is_active:
-        logger.warning(f"Inactive user attempted login: {form_data.username}")
+        logger.warning("Inactive user attempted login: %s", form_data.username)
+        metrics.LOGIN_FAILURES.labels("inactive").inc()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    logger.info(f"Login successful for user: {form_data.username}")
+    logger.info("Login successful for user: %s", form_data.username)
     return {
         "access_token": security.create_access_token(
             user.id, expires_delta=access_token_expires
@@ -90,13 +106,13 @@ def refresh_token(
         # Get the user from database
         user = db.query(UserModel).filter(UserModel.id == user_id).first()
         if not user:
-            logger.warning(f"Token refresh failed: User {user_id} not found")
+            logger.warning("Token refresh failed: User %s not found", user_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found",
             )
         if not user.is_active:
-            logger.warning(f"Token refresh failed: User {user_id} is inactive")
+            logger.warning("Token refresh failed: User %s is inactive", user_id)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Inactive user",
@@ -108,20 +124,20 @@ def refresh_token(
             user.id, expires_delta=access_token_expires
         )
         
-        logger.info(f"Token refreshed successfully for user {user_id}")
+        logger.info("Token refreshed successfully for user %s", user_id)
         return {
             "access_token": new_token,
             "token_type": "bearer",
         }
     except JWTError as e:
-        logger.error(f"Token refresh failed: {str(e)}")
+        logger.error("Token refresh failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         )
 
 @router.post("/register", response_model=User)
-def register(
+async def register(
     *,
     db: Session = Depends(deps.get_db),
     user_in: UserCreate,
@@ -129,18 +145,28 @@ def register(
     """
     Create new user.
     """
-    user = db.query(UserModel).filter(UserModel.email == user_in.email).first()
+    user = await run_in_threadpool(
+        lambda: db.query(UserModel).filter(UserModel.email == user_in.email).first()
+    )
     if user:
         raise HTTPException(
             status_code=400,
             detail="The user with this email already exists in the system.",
         )
+    try:
+        hashed_password = await security.get_password_hash_pooled(user_in.password)
+    except security.PasswordHasherBusy:
+        raise _hasher_busy()
     user = UserModel(
         email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         is_superuser=user_in.is_superuser,
     )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
+
+    def _save() -> None:
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+
+    await run_in_threadpool(_save)
     return user 
\ No newline at end of file
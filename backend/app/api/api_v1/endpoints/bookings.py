@@ -1,18 +1,35 @@
-from typing import List, Optional, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Iterator, List, Optional, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.crud.hotel import booking, room, guest, financial_transaction
-from app.schemas.hotel import Booking, BookingCreate, BookingUpdate, FinancialTransactionCreate
-from app.models.hotel import BookingStatus, Booking as BookingModel, FinancialTransaction, RoomTariff
-from datetime import date, timedelta
+from app.crud.hotel import booking, room, guest, room_hold
+from app.schemas.hotel import (
+    Booking, BookingAssign, BookingBatchCreate, BookingBatchResult, BookingBulkDeleteResult, BookingChange,
+    BookingCreate, BookingModify, BookingSummary, BookingUpdate,
+)
+from app.models.hotel import (
+    RELEASED_STATUSES, BookingStatus, Booking as BookingModel, Guest as GuestModel, Room as RoomModel,
+)
+from datetime import date
 from app.models.user import User
 from app.crud import hotel as crud
+from app.core import metrics, tracing
+from app.core.config import settings
+import json
 import logging
+from app.core.profiling import ProfilingRoute
+from app.services.pricing import find_overlapping_booking, price_stay, select_tariff
+from app.services import booking_updates, inventory
+from app.services.booking_batch import create_bookings
+from app.services.booking_import import BookingImporter
+from app.services.importer import RawRow
+from app.schemas.imports import BookingImportReport
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[Booking])
 def read_bookings(
@@ -21,12 +38,15 @@ def read_bookings(
     room_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
+    include_archived: bool = False,
     current_user: User = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Retrieve bookings.
     """
     query = db.query(BookingModel)
+    if not include_archived:
+        query = query.filter(BookingModel.archived_at.is_(None))
     if guest_id is not None:
         query = query.filter(BookingModel.guest_id == guest_id)
     if room_id is not None:
@@ -34,6 +54,107 @@ def read_bookings(
     bookings = query.offset(skip).limit(limit).all()
     return bookings
 
+EXPORT_BATCH_SIZE = 1000
+
+@router.get("/export")
+def export_bookings(
+    db: Session = Depends(deps.get_db),
+    guest_id: Optional[int] = None,
+    room_id: Optional[int] = None,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Stream bookings as NDJSON, one flat row per line.
+    Only the exported columns are selected and rows are fetched in batches,
+    so memory stays flat regardless of how many bookings are exported.
+    """
+    query = (
+        db.query(
+            BookingModel.id,
+            BookingModel.guest_id,
+            BookingModel.room_id,
+            BookingModel.room_type,
+            BookingModel.check_in_date,
+            BookingModel.check_out_date,
+            BookingModel.status,
+            BookingModel.total_price,
+            BookingModel.payment_status,
+            GuestModel.first_name,
+            GuestModel.last_name,
+            RoomModel.number.label("room_number"),
+        )
+        .join(GuestModel, GuestModel.id == BookingModel.guest_id)
+        .outerjoin(RoomModel, RoomModel.id == BookingModel.room_id)
+        .order_by(BookingModel.id)
+    )
+    if guest_id is not None:
+        query = query.filter(BookingModel.guest_id == guest_id)
+    if room_id is not None:
+        query = query.filter(BookingModel.room_id == room_id)
+
+    def rows():
+        for row in query.yield_per(EXPORT_BATCH_SIZE):
+            yield json.dumps(row._asdict(), default=str) + "\n"
+
+    return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+@router.get("/arrivals", response_model=List[BookingSummary])
+def read_arrivals(
+    db: Session = Depends(deps.get_db),
+    on: Optional[date] = Query(None, alias="date", description="Business date, defaults to today"),
+    status: Optional[List[BookingStatus]] = Query(None, description="Defaults to every status except cancelled and no_show"),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bookings checking in on the given date.
+    """
+    on = on or date.today()
+    return booking.get_summaries(
+        db, filters=[BookingModel.check_in_date == on], statuses=status, skip=skip, limit=limit
+    )
+
+@router.get("/departures", response_model=List[BookingSummary])
+def read_departures(
+    db: Session = Depends(deps.get_db),
+    on: Optional[date] = Query(None, alias="date", description="Business date, defaults to today"),
+    status: Optional[List[BookingStatus]] = Query(None, description="Defaults to every status except cancelled and no_show"),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bookings checking out on the given date.
+    """
+    on = on or date.today()
+    return booking.get_summaries(
+        db, filters=[BookingModel.check_out_date == on], statuses=status, skip=skip, limit=limit
+    )
+
+@router.get("/in-house", response_model=List[BookingSummary])
+def read_in_house(
+    db: Session = Depends(deps.get_db),
+    on: Optional[date] = Query(None, alias="date", description="Business date, defaults to today"),
+    status: Optional[List[BookingStatus]] = Query(None, description="Defaults to every status except cancelled and no_show"),
+    skip: int = 0,
+    limit: int = 100,
+    current_user: User = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Bookings staying the night of the given date: checked in on or before it
+    and checking out after it. Pass status=checked_in for guests actually in
+    the hotel.
+    """
+    on = on or date.today()
+    return booking.get_summaries(
+        db,
+        filters=[BookingModel.check_in_date <= on, BookingModel.check_out_date > on],
+        statuses=status,
+        skip=skip,
+        limit=limit,
+    )
+
 @router.post("/", response_model=Booking)
 def create_booking(
     *,
@@ -41,122 +162,173 @@ def create_booking(
     booking_in: BookingCreate,
 ):
     """
-    Create new booking.
+    Create new booking, for a room (room_id) or for a room type (room_type
+    only, assigned to a room later). Either way a room of the type must be
+    left in the inventory for every night.
     """
     # Check if guest exists
-    guest_obj = guest.get(db, id=booking_in.guest_id)
+    with tracing.span("guest lookup"):
+        guest_obj = guest.get(db, id=booking_in.guest_id)
     if not guest_obj:
         raise HTTPException(
             status_code=404,
             detail="Guest not found",
         )
 
-    # Check if room exists and is available
-    room_obj = room.get(db, id=booking_in.room_id)
-    if not room_obj:
-        raise HTTPException(
-            status_code=404,
-            detail="Room not found",
-        )
-    if not room_obj.is_available:
-        raise HTTPException(
-            status_code=400,
-            detail="Room is not available",
-        )
-
-    # Check if room is already booked for the given dates
-    existing_bookings = booking.get_by_room(
-        db,
-        room_id=booking_in.room_id,
-        skip=0,
-        limit=100,
-    )
-    for existing_booking in existing_bookings:
-        if (
-            existing_booking.status != BookingStatus.cancelled
-            and (
-                (booking_in.check_in_date <= existing_booking.check_out_date)
-                and (booking_in.check_out_date >= existing_booking.check_in_date)
+    room_obj = None
+    room_type = booking_in.room_type
+    if booking_in.room_id is not None:
+        # Check if room exists and is available
+        with tracing.span("room lookup"):
+            room_obj = room.get(db, id=booking_in.room_id)
+        if not room_obj:
+            raise HTTPException(
+                status_code=404,
+                detail="Room not found",
+            )
+        if not room_obj.is_available:
+            raise HTTPException(
+                status_code=400,
+                detail="Room is not available",
+            )
+        if room_type is not None and room_type != room_obj.type:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Room {room_obj.number} is not a {room_type.value} room",
             )
-        ):
+        if booking_in.party_size and room_obj.capacity and booking_in.party_size > room_obj.capacity:
             raise HTTPException(
                 status_code=400,
-                detail="Room is already booked for these dates",
+                detail=f"Room {room_obj.number} sleeps at most {room_obj.capacity}",
+            )
+        room_type = room_obj.type
+
+        # Check if room is already booked for the given dates
+        with tracing.span("overlap check"):
+            existing_bookings = booking.get_by_room(
+                db,
+                room_id=booking_in.room_id,
+                skip=0,
+                limit=100,
             )
+            if find_overlapping_booking(
+                existing_bookings, booking_in.check_in_date, booking_in.check_out_date
+            ) or room_hold.get_overlapping(
+                db, room_ids=[booking_in.room_id],
+                check_in_date=booking_in.check_in_date, check_out_date=booking_in.check_out_date,
+            ):
+                raise HTTPException(
+                    status_code=400,
+                    detail="Room is already booked for these dates",
+                )
 
     # Calculate number of nights
     nights = (booking_in.check_out_date - booking_in.check_in_date).days
 
     # Fetch all tariffs for the room type and check-in date
-    tariffs = db.query(RoomTariff).filter(
-        RoomTariff.room_type == room_obj.type,
-        RoomTariff.start_date <= booking_in.check_in_date,
-        RoomTariff.end_date >= booking_in.check_in_date
-    ).order_by(RoomTariff.min_nights.desc()).all()
+    with tracing.span("tariff fetch"):
+        tariffs = crud.get_booking_tariffs(db, room_type, booking_in.check_in_date)
 
     if not tariffs:
+        metrics.PRICING_FAILURES.labels("no_tariff_for_date").inc()
         raise HTTPException(
             status_code=400,
             detail="No tariff found for this room type and date"
         )
 
     # Find the appropriate tariff based on stay duration
-    selected_tariff = None
-    for tariff in tariffs:
-        if nights >= tariff.min_nights:
-            selected_tariff = tariff
-            break
+    with tracing.span("pricing"):
+        selected_tariff = select_tariff(tariffs, nights)
 
-    if not selected_tariff:
-        raise HTTPException(
-            status_code=400,
-            detail=f"No tariff found for {nights} nights stay"
-        )
+        if not selected_tariff:
+            metrics.PRICING_FAILURES.labels("no_tariff_for_length_of_stay").inc()
+            raise HTTPException(
+                status_code=400,
+                detail=f"No tariff found for {nights} nights stay"
+            )
+
+        # Calculate total price based on selected tariff
+        total_price = price_stay(selected_tariff, booking_in.check_in_date, booking_in.check_out_date)
 
-    # Calculate total price based on selected tariff
-    total_price = 0
-    current_date = booking_in.check_in_date
-    while current_date < booking_in.check_out_date:
-        # Check if it's a weekend night (Friday or Saturday)
-        is_weekend = current_date.weekday() in [4, 5]  # 4 is Friday, 5 is Saturday
-        logger.info(f"Date: {current_date}, is_weekend: {is_weekend}, weekday: {current_date.weekday()}")
-        logger.info(f"Weekend price: {selected_tariff.weekend_price_per_night}, Regular price: {selected_tariff.price_per_night}")
-        
-        if is_weekend and selected_tariff.weekend_price_per_night is not None:
-            logger.info(f"Using weekend price: {selected_tariff.weekend_price_per_night}")
-            total_price += selected_tariff.weekend_price_per_night
-        else:
-            logger.info(f"Using regular price: {selected_tariff.price_per_night}")
-            total_price += selected_tariff.price_per_night
-        # Use timedelta to correctly increment the date
-        current_date = current_date + timedelta(days=1)
-
-    logger.info(f"Final total price: {total_price}")
+    logger.info("Final total price: %s", total_price)
 
     # Add total_price to booking data
     booking_data = booking_in.model_dump()
     booking_data["total_price"] = total_price
+    booking_data["room_type"] = room_type
+
+    # Count the nights as sold; committed together with the booking
+    with tracing.span("inventory"):
+        try:
+            inventory.take(db, room_type, booking_in.check_in_date, booking_in.check_out_date)
+        except inventory.SoldOut as e:
+            db.rollback()
+            raise HTTPException(status_code=400, detail=str(e))
 
     # Create booking
-    booking_obj = booking.create(db, obj_in=BookingCreate(**booking_data))
+    with tracing.span("insert"):
+        booking_obj = booking.create(db, obj_in=BookingCreate(**booking_data), commit=False)
     
-    # Update room availability
-    room.update(
-        db,
-        db_obj=room_obj,
-        obj_in={"is_available": False},
-    )
+    # Update room availability; a room changed meanwhile rolls the booking back (412)
+    if room_obj is not None:
+        with tracing.span("room update"):
+            room.update(
+                db,
+                db_obj=room_obj,
+                obj_in={"is_available": False},
+                commit=False,
+            )
+    db.commit()
+    metrics.BOOKINGS_CREATED.inc()
 
     return booking_obj
 
+@router.post("/batch", response_model=BookingBatchResult)
+def create_booking_batch(
+    *,
+    db: Session = Depends(deps.get_db),
+    batch_in: BookingBatchCreate,
+):
+    """
+    Create several bookings (e.g. a tour group) in one transaction.
+    With all_or_nothing (the default) any invalid item rejects the whole batch
+    with 409; otherwise valid items are created and invalid ones reported.
+    """
+    results, created = create_bookings(db, batch_in.items, all_or_nothing=batch_in.all_or_nothing)
+    body = {
+        "created": len(created),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "results": results,
+    }
+    if batch_in.all_or_nothing and body["failed"]:
+        # Nothing was created, so the results hold no ORM objects and serialise as-is
+        raise HTTPException(status_code=409, detail=body)
+    return body
+
+@router.post("/import", response_model=BookingImportReport)
+def import_bookings(
+    *,
+    db: Session = Depends(deps.get_db),
+    rows: Iterator[RawRow] = Depends(deps.get_import_rows),
+    dry_run: bool = False,
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Bulk import bookings from a CSV or NDJSON body (migrations from another PMS).
+    Rooms with overlapping or invalid rows are rejected whole and reported;
+    with dry_run nothing is written and the counts show what would be imported.
+    """
+    return BookingImporter().run(db, rows, dry_run=dry_run)
+
 @router.get("/{booking_id}", response_model=Booking)
 def read_booking(
     *,
     db: Session = Depends(deps.get_db),
     booking_id: int,
+    response: Response,
 ):
     """
-    Get booking by ID.
+    Get booking by ID. The ETag header carries its version.
     """
     booking_obj = booking.get(db, id=booking_id)
     if not booking_obj:
@@ -164,6 +336,7 @@ def read_booking(
             status_code=404,
             detail="Booking not found",
         )
+    deps.set_etag(response, booking_obj)
     return booking_obj
 
 @router.put("/{booking_id}", response_model=Booking)
@@ -172,94 +345,178 @@ def update_booking(
     db: Session = Depends(deps.get_db),
     booking_id: int,
     booking_in: BookingUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(deps.get_if_match),
 ):
     """
-    Update booking.
+    Update booking. Status side effects on the room, the field updates and
+    the payment transaction are committed together. With If-Match, a booking
+    changed since that version gets 412; so does one changed by another
+    request while this one runs.
     """
-    booking_obj = booking.get(db, id=booking_id)
+    booking_obj = booking.get_with_relations(db, id=booking_id)
     if not booking_obj:
         raise HTTPException(
             status_code=404,
             detail="Booking not found",
         )
+    deps.check_version(booking_obj, expected_version)
+    try:
+        booking_obj = booking_updates.update_booking(db, booking_obj, booking_in)
+    except inventory.SoldOut as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    deps.set_etag(response, booking_obj)
+    return booking_obj
 
-    # Get the room
-    room_obj = room.get(db, id=booking_obj.room_id)
+@router.post("/{booking_id}/assign", response_model=Booking)
+def assign_booking_room(
+    *,
+    db: Session = Depends(deps.get_db),
+    booking_id: int,
+    assign_in: BookingAssign,
+    response: Response,
+    expected_version: Optional[int] = Depends(deps.get_if_match),
+):
+    """
+    Assign a room to a booking, typically one made for a room type. The room
+    must be of the booking's type and free for its dates; a booking that
+    already has a room is moved.
+    """
+    booking_obj = booking.get_with_relations(db, id=booking_id)
+    if not booking_obj:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    room_obj = room.get(db, id=assign_in.room_id)
     if not room_obj:
+        raise HTTPException(status_code=404, detail="Room not found")
+    deps.check_version(booking_obj, expected_version)
+    try:
+        booking_obj = booking_updates.assign_room(db, booking_obj, room_obj)
+    except booking_updates.AssignmentError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    deps.set_etag(response, booking_obj)
+    return booking_obj
+
+@router.post("/{booking_id}/modify", response_model=Booking)
+def modify_booking(
+    *,
+    db: Session = Depends(deps.get_db),
+    booking_id: int,
+    modify_in: BookingModify,
+    response: Response,
+    expected_version: Optional[int] = Depends(deps.get_if_match),
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Change a booking's dates and/or move it to another room, instead of
+    deleting and re-creating it. Only the added nights are checked for
+    conflicts and only the added and removed nights are repriced, unless the
+    stay now falls under another tariff. The inventory and the change
+    history (GET /bookings/{id}/changes) are updated in the same
+    transaction. A checked-in booking can only change its check-out date
+    and room.
+    """
+    booking_obj = booking.get_with_relations(db, id=booking_id)
+    if not booking_obj:
+        raise HTTPException(status_code=404, detail="Booking not found")
+    room_obj = None
+    if modify_in.room_id is not None:
+        room_obj = room.get(db, id=modify_in.room_id)
+        if not room_obj:
+            raise HTTPException(status_code=404, detail="Room not found")
+    deps.check_version(booking_obj, expected_version)
+    try:
+        booking_obj = booking_updates.modify_booking(
+            db, booking_obj, modify_in, room=room_obj, changed_by=current_user.id
+        )
+    except (booking_updates.ModificationError, inventory.SoldOut) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    deps.set_etag(response, booking_obj)
+    return booking_obj
+
+@router.get("/{booking_id}/changes", response_model=List[BookingChange])
+def read_booking_changes(
+    *,
+    db: Session = Depends(deps.get_db),
+    booking_id: int,
+    current_user: User = Depends(deps.get_current_active_user),
+):
+    """
+    Date changes and room moves made to a booking, oldest first.
+    """
+    if not booking.get(db, id=booking_id):
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return booking.get_changes(db, booking_id=booking_id)
+
+@router.delete("/", response_model=BookingBulkDeleteResult)
+def delete_bookings(
+    *,
+    db: Session = Depends(deps.get_db),
+    ids: str = Query(..., description="Comma-separated booking ids"),
+    archive: bool = False,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Delete (or with archive=true, archive) many bookings with one statement.
+    Their financial transactions are removed by ON DELETE CASCADE. Room
+    availability is left as it is, as for a single delete.
+    """
+    try:
+        booking_ids = sorted({int(i) for i in ids.split(",") if i.strip()})
+    except ValueError:
+        raise HTTPException(status_code=422, detail="ids must be a comma-separated list of integers")
+    if not booking_ids:
+        raise HTTPException(status_code=422, detail="No booking ids given")
+    if len(booking_ids) > settings.BULK_DELETE_MAX_IDS:
         raise HTTPException(
-            status_code=404,
-            detail="Room not found",
+            status_code=422,
+            detail=f"At most {settings.BULK_DELETE_MAX_IDS} bookings can be deleted at once",
         )
 
-    # Create update data
-    update_data = booking_in.model_dump(exclude_unset=True)
-    
-    # Update room availability based on booking status
-    if "status" in update_data:
-        new_status = update_data["status"]
-        if new_status == BookingStatus.cancelled:
-            room.update(
-                db,
-                db_obj=room_obj,
-                obj_in={"is_available": True},
-            )
-        elif new_status == BookingStatus.checked_in:
-            room.update(
-                db,
-                db_obj=room_obj,
-                obj_in={"is_available": False},
-            )
-        elif new_status == BookingStatus.checked_out:
-            room.update(
-                db,
-                db_obj=room_obj,
-                obj_in={"is_available": True},
-            )
-        # Directly update the status
-        booking_obj.status = new_status
-        db.add(booking_obj)
+    if archive:
+        affected = booking.archive_many(db, ids=booking_ids)
+    else:
+        stays = (
+            db.query(BookingModel.room_type, func.min(BookingModel.check_in_date), func.max(BookingModel.check_out_date))
+            .filter(BookingModel.id.in_(booking_ids), BookingModel.room_type.isnot(None))
+            .group_by(BookingModel.room_type)
+            .all()
+        )
+        # Archived bookings still hold their nights; deleted ones give them back, in the same commit
+        affected = booking.remove_many(db, ids=booking_ids, commit=False)
+        for room_type, start, end in stays:
+            inventory.recount(db, room_types=[room_type], start=start, end=end)
         db.commit()
-        db.refresh(booking_obj)
-
-    # Update other fields if present
-    if len(update_data) > 1 or "status" not in update_data:
-        other_updates = {k: v for k, v in update_data.items() if k != "status"}
-        if other_updates:
-            booking_obj = booking.update(db, db_obj=booking_obj, obj_in=BookingUpdate(**other_updates))
-
-    # Create a financial transaction if payment_status is updated to 'paid'
-    if update_data.get("payment_status") == "paid":
-        # Check if a transaction already exists for this booking
-        existing_transaction = db.query(FinancialTransaction).filter(
-            FinancialTransaction.booking_id == booking_obj.id,
-            FinancialTransaction.transaction_type == "income",
-            FinancialTransaction.category == "оплата_бронирования"
-        ).first()
-        
-        if not existing_transaction:
-            transaction_in = FinancialTransactionCreate(
-                booking_id=booking_obj.id,
-                amount=booking_obj.total_price,
-                transaction_type="income",
-                category="оплата_бронирования",
-                description=f"Оплата за бронирование #{booking_obj.id}",
-                payment_method="cash",  # or whatever is appropriate
-                transaction_date=date.today()
-            )
-            financial_transaction.create(db, obj_in=transaction_in)
-
-    return booking_obj
+    logger.info("%s %d bookings by user %s", "Archived" if archive else "Deleted", len(affected), current_user.id)
+    return {
+        "archived": archive,
+        "booking_ids": affected,
+        "not_found": sorted(set(booking_ids) - set(affected)),
+    }
 
 @router.delete("/{booking_id}", response_model=dict)
 def delete_booking(
     booking_id: int,
-    db: Session = Depends(deps.get_db)
+    db: Session = Depends(deps.get_db),
+    archive: bool = False,
 ):
-    booking_obj = booking.get(db, id=booking_id)
+    if archive:
+        booking_obj = booking.archive(db, id=booking_id)
+    else:
+        # The delete and the inventory change are committed together
+        booking_obj = booking.remove(db, id=booking_id, commit=False)
     if not booking_obj:
         raise HTTPException(status_code=404, detail="Booking not found")
-    booking.remove(db, id=booking_id)
-    return {"message": "Booking deleted", "booking_id": booking_id}
+    if not archive:
+        if booking_obj.allotment_id is not None:
+            # Back to the allotment or on sale, depending on whether it's released
+            inventory.recount(
+                db, room_types=[booking_obj.room_type], start=booking_obj.check_in_date,
+                end=booking_obj.check_out_date,
+            )
+        elif booking_obj.room_type is not None and booking_obj.status not in RELEASED_STATUSES:
+            inventory.release(db, booking_obj.room_type, booking_obj.check_in_date, booking_obj.check_out_date)
+        db.commit()
+    return {"message": "Booking archived" if archive else "Booking deleted", "booking_id": booking_id}
 
 @router.post("/{booking_id}/checkin", response_model=Booking)
 def check_in_booking(
@@ -274,6 +531,7 @@ def check_in_booking(
         booking_obj = booking.check_in(db, booking_id=booking_id)
         if not booking_obj:
             raise HTTPException(status_code=404, detail="Booking not found")
+        metrics.BOOKING_CHECKINS.inc()
         return booking_obj
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
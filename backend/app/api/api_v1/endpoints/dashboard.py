@@ -6,8 +6,9 @@ from app.db.session import get_db
 from app.crud import room as room_crud
 from app.crud import booking as booking_crud
 from app.crud import guest as guest_crud
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/stats")
 def get_dashboard_stats(db: Session = Depends(get_db)) -> Dict:
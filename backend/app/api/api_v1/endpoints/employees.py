@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud.hotel import employee
 from app.schemas.hotel import Employee, EmployeeCreate, EmployeeUpdate
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[Employee])
 def read_employees(
@@ -4,8 +4,9 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud.hotel import financial_transaction, booking
 from app.schemas.hotel import FinancialTransaction, FinancialTransactionCreate, FinancialTransactionUpdate
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[FinancialTransaction])
 def read_transactions(
@@ -1,22 +1,30 @@
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud.hotel import guest
+from app.models.hotel import RELEASED_STATUSES, Booking as BookingModel, Room as RoomModel, RoomHold as RoomHoldModel
 from app.schemas.hotel import Guest, GuestCreate, GuestUpdate
+from app.core.profiling import ProfilingRoute
+from app.models.user import User
+from app.schemas.imports import ImportReport
+from app.services import inventory
+from app.services.importer import RawRow, get_importer
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[Guest])
 def read_guests(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    include_archived: bool = False,
 ):
     """
     Retrieve guests.
     """
-    guests = guest.get_multi(db, skip=skip, limit=limit)
+    guests = guest.get_multi(db, skip=skip, limit=limit, include_archived=include_archived)
     return guests
 
 @router.post("/", response_model=Guest)
@@ -37,6 +45,19 @@ def create_guest(
     guest_obj = guest.create(db, obj_in=guest_in)
     return guest_obj
 
+@router.post("/import", response_model=ImportReport)
+def import_guests(
+    *,
+    db: Session = Depends(deps.get_db),
+    rows: Iterator[RawRow] = Depends(deps.get_import_rows),
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Bulk import guests from a CSV or NDJSON body. Rows whose email
+    already exists, or that fail validation, are skipped and listed in the report.
+    """
+    return get_importer("guests").run(db, rows)
+
 @router.get("/{guest_id}", response_model=Guest)
 def read_guest(
     *,
@@ -78,15 +99,36 @@ def delete_guest(
     *,
     db: Session = Depends(deps.get_db),
     guest_id: int,
+    archive: bool = False,
 ):
     """
-    Delete guest.
+    Delete guest, together with its bookings (ON DELETE CASCADE).
+    With archive=true the guest is only hidden from listings.
     """
-    guest_obj = guest.get(db, id=guest_id)
+    if archive:
+        guest_obj = guest.archive(db, id=guest_id)
+    else:
+        # The days of its live bookings and holds, given back in the same commit
+        stays = db.query(
+            BookingModel.room_type, func.min(BookingModel.check_in_date), func.max(BookingModel.check_out_date)
+        ).filter(
+            BookingModel.guest_id == guest_id,
+            BookingModel.room_type.isnot(None),
+            BookingModel.status.notin_(RELEASED_STATUSES),
+        ).group_by(BookingModel.room_type).all()
+        stays += db.query(
+            RoomModel.type, func.min(RoomHoldModel.check_in_date), func.max(RoomHoldModel.check_out_date)
+        ).join(RoomModel, RoomModel.id == RoomHoldModel.room_id).filter(
+            RoomHoldModel.guest_id == guest_id
+        ).group_by(RoomModel.type).all()
+        guest_obj = guest.remove(db, id=guest_id, commit=False)
     if not guest_obj:
         raise HTTPException(
             status_code=404,
             detail="Guest not found",
         )
-    guest_obj = guest.remove(db, id=guest_id)
+    if not archive:
+        for room_type, start, end in stays:
+            inventory.recount(db, room_types=[room_type], start=start, end=end)
+        db.commit()
     return guest_obj 
\ No newline at end of file
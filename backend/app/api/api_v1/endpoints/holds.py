@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.profiling import ProfilingRoute
+from app.crud.hotel import room_hold
+from app.schemas.hotel import Booking, RoomHold, RoomHoldConfirm, RoomHoldCreate
+from app.services import room_holds
+
+router = APIRouter(route_class=ProfilingRoute)
+
+@router.post("/", response_model=RoomHold)
+def create_hold(
+    *,
+    db: Session = Depends(deps.get_db),
+    hold_in: RoomHoldCreate,
+) -> Any:
+    """
+    Hold a room for the given dates for `minutes` minutes (ROOM_HOLD_MINUTES
+    by default). The hold is checked like a new booking and carries its
+    quoted total price; until it expires nobody else can book those dates.
+    """
+    try:
+        return room_holds.place_hold(db, hold_in)
+    except room_holds.HoldError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@router.get("/{hold_id}", response_model=RoomHold)
+def read_hold(
+    *,
+    db: Session = Depends(deps.get_db),
+    hold_id: int,
+) -> Any:
+    """
+    Get hold by ID. Expired holds are gone, even if not yet reaped.
+    """
+    hold = room_hold.get(db, id=hold_id)
+    if not hold or hold.expires_at <= datetime.utcnow():
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return hold
+
+@router.post("/{hold_id}/confirm", response_model=Booking)
+def confirm_hold(
+    *,
+    db: Session = Depends(deps.get_db),
+    hold_id: int,
+    confirm_in: Optional[RoomHoldConfirm] = None,
+) -> Any:
+    """
+    Turn a hold into a booking, priced again at the current tariff. An
+    expired hold gets 410; if the booking can't be made the hold is kept and
+    the reason comes back with 409.
+    """
+    try:
+        return room_holds.confirm_hold(
+            db, hold_id, payment_status=confirm_in.payment_status if confirm_in else None
+        )
+    except room_holds.HoldError as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e))
+
+@router.delete("/{hold_id}", response_model=dict)
+def release_hold(
+    hold_id: int,
+    db: Session = Depends(deps.get_db),
+):
+    """
+    Release a hold before it expires (the guest left the checkout).
+    """
+    if not room_holds.release_hold(db, hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found")
+    return {"message": "Hold released", "hold_id": hold_id}
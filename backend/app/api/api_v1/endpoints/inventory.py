@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.api import deps
+from app.core.config import settings
+from app.core.profiling import ProfilingRoute
+from app.models.hotel import RoomType
+from app.schemas.hotel import InventoryNight
+from app.services import inventory
+
+router = APIRouter(route_class=ProfilingRoute)
+
+@router.get("/", response_model=List[InventoryNight])
+def read_inventory(
+    db: Session = Depends(deps.get_db),
+    start: Optional[date] = Query(None, description="First night, defaults to today"),
+    end: Optional[date] = Query(None, description="Day after the last night, defaults to 30 nights after start"),
+    room_type: Optional[List[RoomType]] = Query(None, description="Defaults to every room type"),
+) -> Any:
+    """
+    Rooms per type and night: total, sold, held and available. One indexed
+    row per night, whatever the number of bookings.
+    """
+    start = start or date.today()
+    end = end or start + timedelta(days=30)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if (end - start).days > settings.INVENTORY_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.INVENTORY_MAX_NIGHTS} nights can be requested at once",
+        )
+    return inventory.availability(db, start, end, room_type)
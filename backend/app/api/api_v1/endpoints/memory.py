@@ -0,0 +1,76 @@
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api import deps
+from app.core import memory
+from app.core.profiling import ProfilingRoute
+from app.models.user import User
+
+router = APIRouter(route_class=ProfilingRoute)
+
+@router.get("/")
+def read_memory_status(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Get tracemalloc status and traced memory totals.
+    """
+    return memory.status()
+
+@router.post("/start")
+def start_memory_tracing(
+    frames: int = Query(1, ge=1, le=64),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Start tracing allocations, keeping `frames` frames per traceback.
+    """
+    memory.start_tracing(frames)
+    return memory.status()
+
+@router.post("/stop")
+def stop_memory_tracing(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Stop tracing and drop stored snapshots.
+    """
+    memory.stop_tracing()
+    return memory.status()
+
+@router.get("/snapshots")
+def read_snapshots(
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> List[dict]:
+    """
+    List stored snapshots.
+    """
+    return memory.list_snapshots()
+
+@router.post("/snapshots")
+def create_snapshot(
+    label: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Take a snapshot and return its top allocation sites.
+    """
+    try:
+        return memory.take_snapshot(label=label, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/snapshots/{old_id}/diff/{new_id}")
+def diff_snapshots(
+    old_id: int,
+    new_id: int,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> List[dict]:
+    """
+    Compare two snapshots, largest growth first.
+    """
+    try:
+        return memory.diff_snapshots(old_id, new_id, limit=limit)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Snapshot not found")
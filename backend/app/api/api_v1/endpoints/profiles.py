@@ -0,0 +1,33 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from app.api import deps
+from app.core.profiling import ProfilingRoute, list_profiles, profile_path
+from app.models.user import User
+
+router = APIRouter(route_class=ProfilingRoute)
+
+@router.get("/", response_model=List[str])
+def read_profiles(
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    List stored request profiles, newest first.
+    """
+    return list_profiles()
+
+@router.get("/{name}")
+def download_profile(
+    name: str,
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Download a stored profile as a pstats file.
+    """
+    path = profile_path(name)
+    if not path:
+        raise HTTPException(
+            status_code=404,
+            detail="Profile not found",
+        )
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,11 +1,19 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from datetime import date, timedelta
+from typing import Any, Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud.hotel import room
-from app.schemas.hotel import Room, RoomCreate, RoomUpdate
+from app.models.hotel import RoomType
+from app.schemas.hotel import Room, RoomAssignmentResult, RoomCreate, RoomUpdate
+from app.core.config import settings
+from app.core.profiling import ProfilingRoute
+from app.models.user import User
+from app.schemas.imports import ImportReport
+from app.services import inventory, room_assignment
+from app.services.importer import RawRow, get_importer
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[Room])
 def read_rooms(
@@ -13,6 +21,7 @@ def read_rooms(
     skip: int = 0,
     limit: int = 100,
     available_only: bool = False,
+    include_archived: bool = False,
 ):
     """
     Retrieve rooms.
@@ -20,7 +29,7 @@ def read_rooms(
     if available_only:
         rooms = room.get_available_rooms(db, skip=skip, limit=limit)
     else:
-        rooms = room.get_multi(db, skip=skip, limit=limit)
+        rooms = room.get_multi(db, skip=skip, limit=limit, include_archived=include_archived)
     return rooms
 
 @router.post("/", response_model=Room)
@@ -39,16 +48,64 @@ def create_room(
             detail="A room with this number already exists",
         )
     room_obj = room.create(db, obj_in=room_in)
+    inventory.refresh_totals(db, [room_obj.type])
+    db.commit()
     return room_obj
 
+@router.post("/import", response_model=ImportReport)
+def import_rooms(
+    *,
+    db: Session = Depends(deps.get_db),
+    rows: Iterator[RawRow] = Depends(deps.get_import_rows),
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Bulk import rooms from a CSV or NDJSON body. Rows whose number
+    already exists, or that fail validation, are skipped and listed in the report.
+    """
+    report = get_importer("rooms").run(db, rows)
+    inventory.refresh_totals(db, RoomType)
+    db.commit()
+    return report
+
+@router.post("/assign", response_model=List[RoomAssignmentResult])
+def assign_rooms(
+    db: Session = Depends(deps.get_db),
+    start: Optional[date] = Query(None, description="First arrival date, defaults to today"),
+    end: Optional[date] = Query(None, description="Day after the last arrival date, defaults to 90 days after start"),
+    room_type: Optional[List[RoomType]] = Query(None, description="Defaults to every room type"),
+    min_nights: int = Query(1, ge=1, description="Shortest stay worth selling; shorter gaps are orphan nights"),
+    dry_run: bool = False,
+    current_user: User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Give rooms to the type-level bookings arriving in [start, end), placing
+    them so that as few nights as possible are stranded between stays.
+    Rooms chosen by the guest or by hand are kept; rooms chosen by an
+    earlier run may be changed. With dry_run nothing is saved.
+    """
+    start = start or date.today()
+    end = end or start + timedelta(days=90)
+    if end <= start:
+        raise HTTPException(status_code=400, detail="end must be after start")
+    if (end - start).days > settings.ROOM_ASSIGNMENT_MAX_NIGHTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.ROOM_ASSIGNMENT_MAX_NIGHTS} days can be assigned at once",
+        )
+    return room_assignment.assign_rooms(
+        db, start=start, end=end, room_types=room_type, min_nights=min_nights, dry_run=dry_run
+    )
+
 @router.get("/{room_id}", response_model=Room)
 def read_room(
     *,
     db: Session = Depends(deps.get_db),
     room_id: int,
+    response: Response,
 ):
     """
-    Get room by ID.
+    Get room by ID. The ETag header carries its version.
     """
     room_obj = room.get(db, id=room_id)
     if not room_obj:
@@ -56,6 +113,7 @@ def read_room(
             status_code=404,
             detail="Room not found",
         )
+    deps.set_etag(response, room_obj)
     return room_obj
 
 @router.put("/{room_id}", response_model=Room)
@@ -64,9 +122,11 @@ def update_room(
     db: Session = Depends(deps.get_db),
     room_id: int,
     room_in: RoomUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(deps.get_if_match),
 ):
     """
-    Update room.
+    Update room. With If-Match, a room changed since that version gets 412.
     """
     room_obj = room.get(db, id=room_id)
     if not room_obj:
@@ -74,7 +134,13 @@ def update_room(
             status_code=404,
             detail="Room not found",
         )
+    deps.check_version(room_obj, expected_version)
+    old_type = room_obj.type
     room_obj = room.update(db, db_obj=room_obj, obj_in=room_in)
+    if room_obj.type != old_type:
+        inventory.refresh_totals(db, [old_type, room_obj.type])
+        db.commit()
+    deps.set_etag(response, room_obj)
     return room_obj
 
 @router.delete("/{room_id}", response_model=Room)
@@ -82,15 +148,22 @@ def delete_room(
     *,
     db: Session = Depends(deps.get_db),
     room_id: int,
+    archive: bool = False,
 ):
     """
-    Delete room.
+    Delete room, together with its bookings and tariffs (ON DELETE CASCADE).
+    With archive=true the room is only hidden from listings and can no longer be booked.
     """
-    room_obj = room.get(db, id=room_id)
+    room_obj = room.archive(db, id=room_id) if archive else room.remove(db, id=room_id)
     if not room_obj:
         raise HTTPException(
             status_code=404,
             detail="Room not found",
         )
-    room_obj = room.remove(db, id=room_id)
+    if archive:
+        inventory.refresh_totals(db, [room_obj.type])
+    else:
+        # Its bookings went with it
+        inventory.recount(db, room_types=[room_obj.type])
+    db.commit()
     return room_obj 
\ No newline at end of file
@@ -1,13 +1,17 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from app.api import deps
 from app.crud.hotel import get_tariff, get_tariffs, create_tariff, update_tariff, remove_tariff, get_current_tariff
 from app.schemas.hotel import RoomTariff, RoomTariffCreate, RoomTariffUpdate
 from app.models.hotel import RoomType
 from datetime import date as date_cls
+from app.core.profiling import ProfilingRoute
+from app.models.user import User
+from app.schemas.imports import ImportReport
+from app.services.importer import RawRow, get_importer
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/", response_model=List[RoomTariff])
 def read_tariffs(
@@ -46,6 +50,20 @@ def create_room_tariff(
     tariff = create_tariff(db, obj_in=tariff_in)
     return tariff
 
+@router.post("/import", response_model=ImportReport)
+def import_tariffs(
+    *,
+    db: Session = Depends(deps.get_db),
+    rows: Iterator[RawRow] = Depends(deps.get_import_rows),
+    current_user: User = Depends(deps.get_current_active_superuser),
+):
+    """
+    Bulk import room tariffs from a CSV or NDJSON body. Rows duplicating an
+    existing tariff (same room type, minimum stay and period), or that fail
+    validation, are skipped and listed in the report.
+    """
+    return get_importer("tariffs").run(db, rows)
+
 @router.get("/current", response_model=RoomTariff)
 def get_current_tariff_endpoint(
     room_type: str = Query(...),
@@ -62,6 +80,7 @@ def get_current_tariff_endpoint(
 @router.get("/{tariff_id}", response_model=RoomTariff)
 def read_tariff(
     tariff_id: int,
+    response: Response,
     db: Session = Depends(deps.get_db)
 ):
     tariff = get_tariff(db, id=tariff_id)
@@ -70,6 +89,7 @@ def read_tariff(
             status_code=404,
             detail="Room tariff not found",
         )
+    deps.set_etag(response, tariff)
     return tariff
 
 @router.put("/{tariff_id}", response_model=RoomTariff)
@@ -78,9 +98,12 @@ def update_room_tariff(
     db: Session = Depends(deps.get_db),
     tariff_id: int,
     tariff_in: RoomTariffUpdate,
+    response: Response,
+    expected_version: Optional[int] = Depends(deps.get_if_match),
 ):
     """
-    Update room tariff.
+    Update room tariff. With If-Match, a tariff changed since that version
+    gets 412.
     """
     tariff = get_tariff(db, id=tariff_id)
     if not tariff:
@@ -88,6 +111,7 @@ def update_room_tariff(
             status_code=404,
             detail="Room tariff not found",
         )
+    deps.check_version(tariff, expected_version)
     
     if tariff_in.start_date and tariff_in.end_date and tariff_in.start_date >= tariff_in.end_date:
         raise HTTPException(
@@ -96,6 +120,7 @@ def update_room_tariff(
         )
     
     tariff = update_tariff(db, db_obj=tariff, obj_in=tariff_in)
+    deps.set_etag(response, tariff)
     return tariff
 
 @router.delete("/{tariff_id}", response_model=RoomTariff)
@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from app.api import deps
 from app.models.user import User
 from app.schemas.user import User as UserSchema
+from app.core.profiling import ProfilingRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ProfilingRoute)
 
 @router.get("/me", response_model=UserSchema)
 def read_current_user(
@@ -1,16 +1,20 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import Any, AsyncGenerator, Generator, Iterator, Optional
+from fastapi import Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+import io
 import logging
+import tempfile
 
 from app.core.config import settings
-from app.core.security import verify_password
+from app.core.security import verify_password_pooled
 from app.db.session import SessionLocal
 from app.models.user import User
 from app.schemas.user import TokenPayload
+from app.services.importer import FORMATS, RawRow, detect_format, read_rows
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -41,7 +45,7 @@ def get_current_user(
         )
         token_data = TokenPayload(**payload)
     except (JWTError, ValidationError) as e:
-        logger.error(f"Token validation failed: {str(e)}")
+        logger.error("Token validation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
@@ -50,7 +54,7 @@ def get_current_user(
     
     user = db.query(User).filter(User.id == token_data.sub).first()
     if not user:
-        logger.warning(f"User not found for token sub: {token_data.sub}")
+        logger.warning("User not found for token sub: %s", token_data.sub)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, 
             detail="User not found"
@@ -61,7 +65,7 @@ def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_active:
-        logger.warning(f"Inactive user attempted access: {current_user.id}")
+        logger.warning("Inactive user attempted access: %s", current_user.id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="Inactive user"
@@ -72,21 +76,89 @@ def get_current_active_superuser(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_superuser:
-        logger.warning(f"Non-superuser attempted superuser access: {current_user.id}")
+        logger.warning("Non-superuser attempted superuser access: %s", current_user.id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail="The user doesn't have enough privileges"
         )
     return current_user
 
-def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-    logger.info(f"Authenticating user: {email}")
-    user = db.query(User).filter(User.email == email).first()
+async def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
+    """
+    Look the user up on the threadpool, then verify the password in the bcrypt
+    process pool so concurrent logins don't tie up request threads.
+    Raises PasswordHasherBusy when the pool queue is full.
+    """
+    logger.info("Authenticating user: %s", email)
+    user = await run_in_threadpool(
+        lambda: db.query(User).filter(User.email == email).first()
+    )
     if not user:
-        logger.warning(f"User not found: {email}")
+        logger.warning("User not found: %s", email)
         return None
-    if not verify_password(password, user.hashed_password):
-        logger.warning(f"Invalid password for user: {email}")
+    verified, new_hash = await verify_password_pooled(password, user.hashed_password)
+    if not verified:
+        logger.warning("Invalid password for user: %s", email)
         return None
-    logger.info(f"User authenticated successfully: {email}")
-    return user 
\ No newline at end of file
+    if new_hash:
+        # Cost factor changed since this hash was created; store the upgraded hash
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
+        logger.info("Rehashed password for user: %s", email)
+    logger.info("User authenticated successfully: %s", email)
+    return user
+
+async def get_import_rows(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson; defaults to the Content-Type"),
+) -> AsyncGenerator[Iterator[RawRow], None]:
+    """
+    Spool a CSV/NDJSON request body (to disk past IMPORT_SPOOL_BYTES) and yield
+    its rows lazily for the importer.
+    """
+    fmt = detect_format(format, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Import body must be one of: {', '.join(FORMATS)}",
+        )
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.IMPORT_SPOOL_BYTES)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.IMPORT_MAX_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Import file is too large",
+                )
+            spool.write(chunk)
+        spool.seek(0)
+        yield read_rows(io.TextIOWrapper(spool, encoding="utf-8-sig", newline=""), fmt)
+    finally:
+        spool.close()
+
+def get_if_match(if_match: Optional[str] = Header(None)) -> Optional[int]:
+    """
+    The version a PUT was based on, from an If-Match header holding the
+    ETag of an earlier response ("3", or W/"3"). None if absent or "*".
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    if not tag.isdigit():
+        raise HTTPException(status_code=400, detail='If-Match must hold a version ETag such as "3"')
+    return int(tag)
+
+def check_version(obj: Any, expected: Optional[int]) -> None:
+    if expected is not None and obj.version != expected:
+        raise HTTPException(
+            status_code=412,
+            detail=f"Modified by another request; current version is {obj.version}",
+        )
+
+def set_etag(response: Response, obj: Any) -> None:
+    response.headers["ETag"] = f'"{obj.version}"'
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, field_validator
 
@@ -34,11 +34,74 @@ class Settings(BaseSettings):
         data = info.data
         return f"postgresql://{data['POSTGRES_USER']}:{data['POSTGRES_PASSWORD']}@{data['POSTGRES_SERVER']}:{data['POSTGRES_PORT']}/{data['POSTGRES_DB']}?options=-c%20search_path%3Dpublic"
 
+    # Logging settings
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_SAMPLING: Dict[str, float] = {}  # logger name prefix -> fraction of sub-WARNING records kept
+
+    # SQL instrumentation settings
+    SQL_INSTRUMENTATION_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_FILE: str | None = None
+
+    # Profiling settings
+    PROFILE_DIR: str = "profiles"
+    PROFILE_SAMPLE_RATE: float = 0.0  # Fraction of requests profiled without X-Profile
+
+    # Memory diagnostics settings
+    MEMORY_TRACE_ROUTES: List[str] = []  # Path prefixes that get per-request peak reporting
+
+    # Tracing settings
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0  # Fraction of requests traced when tracing is enabled
+    TRACING_FILE: str = "traces/traces.jsonl"
+    TRACING_MAX_BYTES: int = 10 * 1024 * 1024
+    TRACING_BACKUP_COUNT: int = 5
+
+    # Bulk import settings
+    IMPORT_CHUNK_SIZE: int = 1000  # Rows validated, checked and committed together
+    IMPORT_MAX_BYTES: int = 50 * 1024 * 1024
+    IMPORT_SPOOL_BYTES: int = 1024 * 1024  # Uploads larger than this are spooled to disk
+
+    # Bulk delete settings
+    BULK_DELETE_MAX_IDS: int = 1000
+
+    # Night audit settings
+    NIGHT_AUDIT_SCHEDULER_ENABLED: bool = False  # Enable in one process only, not in every worker
+    NIGHT_AUDIT_TIME: str = "03:00"  # Local time; the run closes the previous business date
+    NIGHT_AUDIT_CHUNK_SIZE: int = 1000  # Rows updated and committed together
+
+    # Room hold settings
+    ROOM_HOLD_MINUTES: int = 15
+    ROOM_HOLD_MAX_MINUTES: int = 60
+    ROOM_HOLD_REAPER_ENABLED: bool = True  # Safe in every worker; a reap is one DELETE
+    ROOM_HOLD_REAP_INTERVAL_SECONDS: int = 60
+
+    # Inventory settings
+    INVENTORY_MAX_NIGHTS: int = 366  # Longest range GET /inventory returns
+
+    # Room assignment settings
+    ROOM_ASSIGNMENT_MAX_NIGHTS: int = 366  # Longest arrival window POST /rooms/assign accepts
+    ROOM_ASSIGNMENT_MAX_PASSES: int = 5  # Local search passes after the greedy one
+    ROOM_ASSIGNMENT_TIME_LIMIT_SECONDS: float = 10.0  # Per room type; the local search stops early
+
+    # Idempotency settings
+    IDEMPOTENCY_ROUTES: List[str] = ["/api/v1/bookings/", "/api/v1/financial/", "/api/v1/holds/"]  # POST paths honouring Idempotency-Key
+    IDEMPOTENCY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_CACHE_SIZE: int = 1000  # Stored responses also kept in memory, per process
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # How long a duplicate waits for the first request to finish
+    IDEMPOTENCY_LOCK_SECONDS: int = 60  # A pending key older than this is treated as abandoned
+
     # JWT settings
     SECRET_KEY: str = "your-secret-key-here"  # Change this in production
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Password hashing settings
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # Size of the dedicated bcrypt process pool
+    PASSWORD_HASH_MAX_PENDING: int = 32  # Logins queued beyond this get a 429
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,278 @@
+"""
+Idempotency-Key support for retried POSTs (the routes in IDEMPOTENCY_ROUTES).
+
+The first request with a key claims it by inserting a pending row into
+idempotency_keys. Its response is then stored in that row and in a
+per-process LRU cache for IDEMPOTENCY_TTL_SECONDS; 5xx responses,
+redirects and 412 (a row changed by a concurrent request, with nothing
+written) aren't stored, and the key is released so a retry runs again.
+A retry gets the stored response back, with `Idempotent-Replayed: true`,
+from memory or from one lookup on the unique key, without reaching the
+endpoint.
+
+A duplicate that arrives while the first request is still running waits for
+it, up to IDEMPOTENCY_WAIT_SECONDS: on an event when both are in the same
+process, otherwise by polling the row. It gets 409 if the first request is
+still running after that. Reusing a key with a different body gets 422.
+
+Keys are scoped to the route and the caller's Authorization header, so
+clients can't replay each other's responses.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.1  # Seconds between checks on a key another process is working on
+
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status: int
+    content_type: Optional[str]
+    body: bytes
+    expires_at: datetime
+
+# Only touched from the event loop, so no locking
+_cache: "OrderedDict[str, StoredResponse]" = OrderedDict()
+_in_flight: Dict[str, asyncio.Event] = {}
+
+def _cache_get(key: str) -> Optional[StoredResponse]:
+    stored = _cache.get(key)
+    if stored is None:
+        return None
+    if stored.expires_at <= datetime.utcnow():
+        del _cache[key]
+        return None
+    _cache.move_to_end(key)
+    return stored
+
+def _cache_put(key: str, stored: StoredResponse) -> None:
+    _cache[key] = stored
+    _cache.move_to_end(key)
+    while len(_cache) > settings.IDEMPOTENCY_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+def _stored(row: IdempotencyKey) -> StoredResponse:
+    return StoredResponse(
+        request_hash=row.request_hash,
+        status=row.response_status,
+        content_type=row.response_content_type,
+        body=row.response_body or b"",
+        expires_at=row.expires_at,
+    )
+
+def _claim(key: str, request_hash: str) -> Tuple[str, Optional[str], Optional[StoredResponse]]:
+    """
+    Look the key up and claim it if it's free. Returns ("claimed", None, None),
+    ("pending", request_hash, None) while another request holds it, or
+    ("completed", request_hash, response).
+    """
+    db = SessionLocal()
+    try:
+        for _ in range(3):
+            now = datetime.utcnow()
+            row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).one_or_none()
+            if row is not None:
+                abandoned = (
+                    row.status == "pending"
+                    and row.created_at <= now - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+                )
+                if row.expires_at > now and not abandoned:
+                    if row.status == "completed":
+                        return "completed", row.request_hash, _stored(row)
+                    return "pending", row.request_hash, None
+                db.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row.id))
+                db.commit()
+                continue
+            db.add(IdempotencyKey(
+                key=key,
+                request_hash=request_hash,
+                status="pending",
+                expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            ))
+            try:
+                db.commit()
+                return "claimed", None, None
+            except IntegrityError:
+                # Another process claimed it between our lookup and insert
+                db.rollback()
+        return "pending", request_hash, None
+    finally:
+        db.close()
+
+def _complete(key: str, status: int, content_type: Optional[str], body: bytes) -> StoredResponse:
+    db = SessionLocal()
+    try:
+        row = db.query(IdempotencyKey).filter(IdempotencyKey.key == key).one()
+        row.status = "completed"
+        row.response_status = status
+        row.response_content_type = content_type
+        row.response_body = body
+        db.commit()
+        return _stored(row)
+    finally:
+        db.close()
+
+def _release(key: str) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == "pending"))
+        db.commit()
+    finally:
+        db.close()
+
+def purge_expired(db: Session) -> int:
+    """Delete keys past their TTL; returns how many were removed."""
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+class IdempotencyMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.routes = {route.rstrip("/") for route in settings.IDEMPOTENCY_ROUTES}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"].rstrip("/") not in self.routes:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        raw_key = headers.get(b"idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key.strip() or len(raw_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                {"detail": f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        key = hashlib.sha256(
+            b"\n".join([scope["path"].rstrip("/").encode(), headers.get(b"authorization", b""), raw_key])
+        ).hexdigest()
+        request_hash = hashlib.sha256(body).hexdigest()
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        # Same-process duplicates wait here for the first request to finish
+        while True:
+            stored = _cache_get(key)
+            if stored is not None:
+                await self._replay(stored, request_hash, scope, receive_body, send)
+                return
+            event = _in_flight.get(key)
+            if event is None:
+                break
+            try:
+                await asyncio.wait_for(event.wait(), timeout=max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                await self._in_progress(scope, receive_body, send)
+                return
+
+        event = _in_flight[key] = asyncio.Event()
+        try:
+            await self._handle(key, request_hash, deadline, scope, receive_body, send)
+        finally:
+            event.set()
+            if _in_flight.get(key) is event:
+                del _in_flight[key]
+
+    async def _handle(self, key, request_hash, deadline, scope, receive, send):
+        while True:
+            state, stored_hash, stored = await run_in_threadpool(_claim, key, request_hash)
+            if state == "claimed":
+                break
+            if stored_hash != request_hash:
+                await self._mismatch(scope, receive, send)
+                return
+            if state == "completed":
+                _cache_put(key, stored)
+                await self._replay(stored, request_hash, scope, receive, send)
+                return
+            # Another process is working on this key
+            if time.monotonic() >= deadline:
+                await self._in_progress(scope, receive, send)
+                return
+            await asyncio.sleep(POLL_INTERVAL)
+
+        status, content_type, chunks = 500, None, []
+
+        async def send_wrapper(message):
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                raw_type = dict(message.get("headers", [])).get(b"content-type")
+                content_type = raw_type.decode("latin-1") if raw_type else None
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            await run_in_threadpool(_release, key)
+            raise
+        if status >= 500 or 300 <= status < 400 or status == 412:
+            await run_in_threadpool(_release, key)
+            return
+        _cache_put(key, await run_in_threadpool(_complete, key, status, content_type, b"".join(chunks)))
+
+    async def _replay(self, stored: StoredResponse, request_hash: str, scope, receive, send):
+        if stored.request_hash != request_hash:
+            await self._mismatch(scope, receive, send)
+            return
+        logger.info("Replayed stored response for %s %s", scope["method"], scope["path"])
+        response = Response(
+            content=stored.body,
+            status_code=stored.status,
+            media_type=stored.content_type,
+            headers={"Idempotent-Replayed": "true"},
+        )
+        await response(scope, receive, send)
+
+    async def _mismatch(self, scope, receive, send):
+        response = JSONResponse(
+            {"detail": "Idempotency-Key was already used with a different request body"}, status_code=422
+        )
+        await response(scope, receive, send)
+
+    async def _in_progress(self, scope, receive, send):
+        response = JSONResponse(
+            {"detail": "A request with this Idempotency-Key is still being processed"}, status_code=409
+        )
+        await response(scope, receive, send)
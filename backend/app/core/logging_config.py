@@ -0,0 +1,154 @@
+"""
+Logging setup for the API.
+
+Request threads only enqueue records: a QueueHandler hands them to a
+background QueueListener that formats them as JSON lines and writes them to
+the stream in batches. Message interpolation is deferred to the writer
+thread, so hot paths should log with %-style arguments rather than f-strings.
+
+Per-logger sampling (LOG_SAMPLING, e.g. {"app.api.deps": 0.1}) drops a
+fraction of sub-WARNING records before they are queued; the longest matching
+logger-name prefix wins.
+"""
+from datetime import date, datetime
+from typing import Dict, Optional
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+
+from app.core.config import settings
+
+# Arguments of these types are immutable, so formatting can safely wait until
+# the writer thread picks the record up.
+_LAZY_SAFE_TYPES = (str, int, float, bool, type(None), date, datetime)
+
+# Attributes every LogRecord has; anything else came in through `extra=`.
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_text:
+            payload["exc_info"] = record.exc_text
+        elif record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Longest prefix first so the most specific logger rule is found first
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        for prefix, rate in self.rates:
+            if name == prefix or name.startswith(prefix + "."):
+                return rate
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        return rate is None or random.random() < rate
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves %-formatting to the listener thread when safe."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            # Tracebacks reference live frames; render them before crossing threads
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if record.args:
+            args = record.args.values() if isinstance(record.args, dict) else record.args
+            if not all(isinstance(arg, _LAZY_SAFE_TYPES) for arg in args):
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    """Drains up to `batch_size` queued records per wake-up and writes them at once."""
+
+    def __init__(self, log_queue, stream, formatter: logging.Formatter, batch_size: int = 256):
+        super().__init__(log_queue)
+        self.stream = stream
+        self.formatter = formatter
+        self.batch_size = batch_size
+
+    def _write(self, records) -> None:
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(f"<unformattable log record from {record.name}>")
+        if lines:
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+
+    def _monitor(self) -> None:
+        while True:
+            record = self.dequeue(True)
+            batch = []
+            stop = record is self._sentinel
+            if not stop:
+                batch.append(record)
+                while len(batch) < self.batch_size:
+                    try:
+                        record = self.dequeue(False)
+                    except queue.Empty:
+                        break
+                    if record is self._sentinel:
+                        stop = True
+                        break
+                    batch.append(record)
+            self._write(batch)
+            if stop:
+                return
+
+_listener: Optional[BatchingQueueListener] = None
+
+def setup_logging(stream=None) -> None:
+    global _listener
+    if _listener is not None:
+        return
+
+    if settings.LOG_JSON:
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    handler = LazyQueueHandler(log_queue)
+    if settings.LOG_SAMPLING:
+        handler.addFilter(SamplingFilter(settings.LOG_SAMPLING))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.LOG_LEVEL)
+
+    _listener = BatchingQueueListener(log_queue, stream or sys.stderr, formatter)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
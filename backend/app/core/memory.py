@@ -0,0 +1,139 @@
+"""
+tracemalloc-based memory diagnostics.
+
+Tracing is started and stopped from the admin endpoints; while it is on,
+snapshots can be taken and diffed to find the allocation sites that grew.
+MemoryPeakMiddleware reports the traced peak of requests whose path starts
+with one of MEMORY_TRACE_ROUTES (X-Memory-Peak-KB header and a log line).
+The peak counter is process-wide, so concurrent requests in the same worker
+are included in each other's numbers.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+import itertools
+import logging
+import threading
+import tracemalloc
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAX_SNAPSHOTS = 10
+
+_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+]
+
+_snapshots: Dict[int, dict] = {}
+_snapshot_ids = itertools.count(1)
+_lock = threading.Lock()
+
+def start_tracing(frames: int = 1) -> None:
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+
+def stop_tracing() -> None:
+    tracemalloc.stop()
+    with _lock:
+        _snapshots.clear()
+
+def status() -> dict:
+    tracing = tracemalloc.is_tracing()
+    current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+    return {
+        "tracing": tracing,
+        "frames": tracemalloc.get_traceback_limit() if tracing else 0,
+        "current_kb": current // 1024,
+        "peak_kb": peak // 1024,
+        "snapshots": sorted(_snapshots),
+    }
+
+def _stat_to_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "file": frame.filename,
+        "line": frame.lineno,
+        "size_kb": round(stat.size / 1024, 1),
+        "count": stat.count,
+    }
+
+def _diff_to_dict(stat) -> dict:
+    result = _stat_to_dict(stat)
+    result["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+    result["count_diff"] = stat.count_diff
+    return result
+
+def take_snapshot(label: Optional[str] = None, limit: int = 10) -> dict:
+    """Store a filtered snapshot and return its id with the top allocation sites."""
+    if not tracemalloc.is_tracing():
+        raise ValueError("Memory tracing is not running")
+    snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+    with _lock:
+        snapshot_id = next(_snapshot_ids)
+        _snapshots[snapshot_id] = {
+            "snapshot": snapshot,
+            "label": label,
+            "taken_at": datetime.utcnow(),
+        }
+        # Snapshots hold every traced block; keep only the most recent few
+        for old_id in sorted(_snapshots)[:-MAX_SNAPSHOTS]:
+            del _snapshots[old_id]
+    return {
+        "id": snapshot_id,
+        "label": label,
+        "top": [_stat_to_dict(stat) for stat in snapshot.statistics("lineno")[:limit]],
+    }
+
+def list_snapshots() -> List[dict]:
+    with _lock:
+        return [
+            {"id": snapshot_id, "label": entry["label"], "taken_at": entry["taken_at"]}
+            for snapshot_id, entry in sorted(_snapshots.items())
+        ]
+
+def diff_snapshots(old_id: int, new_id: int, limit: int = 10) -> List[dict]:
+    with _lock:
+        old = _snapshots.get(old_id)
+        new = _snapshots.get(new_id)
+    if old is None or new is None:
+        raise KeyError("Snapshot not found")
+    stats = new["snapshot"].compare_to(old["snapshot"], "lineno")
+    return [_diff_to_dict(stat) for stat in stats[:limit]]
+
+class MemoryPeakMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.MEMORY_TRACE_ROUTES
+            or not tracemalloc.is_tracing()
+            or not scope["path"].startswith(tuple(settings.MEMORY_TRACE_ROUTES))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                _, peak = tracemalloc.get_traced_memory()
+                headers = list(message.get("headers", []))
+                headers.append((b"x-memory-peak-kb", str((peak - baseline) // 1024).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _, peak = tracemalloc.get_traced_memory()
+            logger.info(
+                "Request memory peak %s %s: %d KB",
+                scope["method"], scope["path"], (peak - baseline) // 1024,
+            )
@@ -0,0 +1,105 @@
+"""
+Prometheus metrics for the API.
+
+Request metrics are recorded by MetricsMiddleware and labelled by route
+template (e.g. /api/v1/bookings/{booking_id}) rather than the raw path.
+Domain counters are incremented from the endpoints.
+
+For several uvicorn workers, point the PROMETHEUS_MULTIPROC_DIR environment
+variable at an empty directory before starting the server; each worker then
+writes its samples to memory-mapped files there and /metrics aggregates them.
+"""
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+BOOKINGS_CREATED = Counter("bookings_created_total", "Bookings created")
+BOOKING_CHECKINS = Counter("booking_checkins_total", "Bookings checked in")
+PRICING_FAILURES = Counter(
+    "booking_pricing_failures_total",
+    "Bookings rejected because no tariff matched",
+    ["reason"],
+)
+LOGIN_FAILURES = Counter(
+    "login_failures_total",
+    "Failed login attempts",
+    ["reason"],
+)
+
+def render_metrics() -> bytes:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauge samples on shutdown."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, in-flight gauge and latency."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # The router stores the matched route in the scope; fall back to a
+            # fixed label so unknown paths can't blow up label cardinality.
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            labels = (method, route_path, str(status_code))
+            REQUEST_COUNT.labels(*labels).inc()
+            REQUEST_LATENCY.labels(*labels).observe(elapsed)
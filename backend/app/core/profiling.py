@@ -0,0 +1,152 @@
+"""
+On-demand request profiling.
+
+A request is profiled when a superuser sends `X-Profile: 1`, or when it is
+picked by PROFILE_SAMPLE_RATE. ProfilingMiddleware makes that decision and
+stores a cProfile.Profile in a contextvar; ProfilingRoute wraps endpoint
+functions so the profiler is enabled inside the thread that actually runs the
+endpoint (sync endpoints run on the threadpool, which cProfile can't follow
+from the event loop). Profiles are written as pstats files to PROFILE_DIR.
+
+Requests that don't opt in only pay for a header scan and a contextvar lookup.
+"""
+from contextvars import ContextVar
+from datetime import datetime
+from typing import List, Optional
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import random
+import re
+
+from fastapi.routing import APIRoute
+from jose import JWTError, jwt
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_active_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar("active_profile", default=None)
+
+def _profiled(endpoint):
+    if getattr(endpoint, "__profiled__", False):
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            profile = _active_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            # Other tasks on the event loop may show up while this one awaits
+            profile.enable()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.disable()
+
+        async_wrapper.__profiled__ = True
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        profile = _active_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        profile.enable()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+class ProfilingRoute(APIRoute):
+    """APIRoute whose endpoint can be profiled on demand."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+def _is_superuser_token(authorization: str) -> bool:
+    """True for a signed, unexpired bearer token of an active superuser."""
+    from app.db.session import SessionLocal
+    from app.models.user import User
+
+    if not authorization.startswith("Bearer "):
+        return False
+    try:
+        payload = jwt.decode(
+            authorization[len("Bearer "):],
+            settings.SECRET_KEY,
+            algorithms=[settings.ALGORITHM],
+        )
+    except JWTError:
+        return False
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.id == payload.get("sub")).first()
+        return bool(user and user.is_active and user.is_superuser)
+    finally:
+        db.close()
+
+def _profile_filename(method: str, path: str) -> str:
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_") or "root"
+    return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{slug}.prof"
+
+def list_profiles() -> List[str]:
+    if not os.path.isdir(settings.PROFILE_DIR):
+        return []
+    return sorted(
+        (name for name in os.listdir(settings.PROFILE_DIR) if name.endswith(".prof")),
+        reverse=True,
+    )
+
+def profile_path(name: str) -> Optional[str]:
+    """Return the on-disk path of a stored profile, or None for unknown names."""
+    if os.path.basename(name) != name or name not in list_profiles():
+        return None
+    return os.path.join(settings.PROFILE_DIR, name)
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def _wants_profile(self, scope) -> bool:
+        requested = False
+        authorization = ""
+        for key, value in scope["headers"]:
+            if key == b"x-profile":
+                requested = value == b"1"
+            elif key == b"authorization":
+                authorization = value.decode("latin-1")
+        if requested and await run_in_threadpool(_is_superuser_token, authorization):
+            return True
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not await self._wants_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = cProfile.Profile()
+        filename = _profile_filename(scope["method"], scope["path"])
+        token = _active_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", filename.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _active_profile.reset(token)
+            os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+            profile.dump_stats(os.path.join(settings.PROFILE_DIR, filename))
+            logger.info("Stored request profile %s", filename)
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import threading
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
@@ -7,7 +10,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max rounds to the configured cost makes needs_update() flag any
+# hash created under a different BCRYPT_ROUNDS, so it gets rehashed on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+class PasswordHasherBusy(Exception):
+    """Raised when the password hashing pool already has too many pending jobs."""
 
 def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
     try:
@@ -23,7 +37,7 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
             "type": "access"
         }
         
-        logger.info(f"Creating access token for user {subject}")
+        logger.info("Creating access token for user %s", subject)
         encoded_jwt = jwt.encode(
             to_encode, 
             settings.SECRET_KEY, 
@@ -31,11 +45,63 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
         )
         return encoded_jwt
     except Exception as e:
-        logger.error(f"Error creating access token: {str(e)}")
+        logger.error("Error creating access token: %s", e)
         raise
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return pwd_context.hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+_hash_pool: Optional[ProcessPoolExecutor] = None
+_hash_pool_lock = threading.Lock()
+_hash_pending = 0
+
+def _get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+    if _hash_pool is None:
+        with _hash_pool_lock:
+            if _hash_pool is None:
+                _hash_pool = ProcessPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS)
+    return _hash_pool
+
+def _release_slot(_future) -> None:
+    global _hash_pending
+    with _hash_pool_lock:
+        _hash_pending -= 1
+
+async def _run_in_hash_pool(fn, *args):
+    global _hash_pending
+    with _hash_pool_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise PasswordHasherBusy()
+        _hash_pending += 1
+    try:
+        future = _get_hash_pool().submit(fn, *args)
+    except Exception:
+        _release_slot(None)
+        raise
+    future.add_done_callback(_release_slot)
+    return await asyncio.wrap_future(future)
+
+async def verify_password_pooled(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the bcrypt process pool without holding a request thread.
+    Returns (verified, new_hash); new_hash is set when the stored hash uses an
+    outdated cost factor and should be persisted.
+    """
+    return await _run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+async def get_password_hash_pooled(password: str) -> str:
+    return await _run_in_hash_pool(get_password_hash, password)
+
+def shutdown_password_pool() -> None:
+    global _hash_pool
+    with _hash_pool_lock:
+        if _hash_pool is not None:
+            _hash_pool.shutdown(wait=False, cancel_futures=True)
+            _hash_pool = None
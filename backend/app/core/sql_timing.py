@@ -0,0 +1,107 @@
+"""
+Per-request SQL instrumentation.
+
+When SQL_INSTRUMENTATION_ENABLED is set, cursor execution hooks on the engine
+record the query count, total DB time and the slowest statement of every
+request. The totals are returned in a Server-Timing header, and statements
+slower than SLOW_QUERY_THRESHOLD_MS go to the "app.slow_query" logger.
+Nothing is registered when the setting is off.
+"""
+from contextvars import ContextVar
+from typing import Optional
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+slow_query_logger = logging.getLogger("app.slow_query")
+
+class QueryStats:
+    __slots__ = ("path", "count", "total", "slowest", "slowest_statement")
+
+    def __init__(self, path: str = ""):
+        self.path = path
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        if elapsed > self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        return (
+            f'db;dur={self.total * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest * 1000:.2f}"
+        )
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("sql_query_stats", default=None)
+
+def get_current_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        slow_query_logger.warning(
+            "slow query %.2fms path=%s: %s",
+            elapsed * 1000,
+            stats.path if stats is not None else "-",
+            statement,
+        )
+
+def _handle_error(exception_context):
+    # after_cursor_execute doesn't run for a failed statement; drop its start time
+    # so the list on the pooled connection doesn't grow
+    conn = exception_context.connection
+    start_times = conn.info.get("query_start_time") if conn is not None else None
+    if start_times:
+        start_times.pop()
+
+def instrument_engine(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    if settings.SLOW_QUERY_LOG_FILE:
+        handler = logging.FileHandler(settings.SLOW_QUERY_LOG_FILE)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+        slow_query_logger.addHandler(handler)
+
+class SQLTimingMiddleware:
+    """ASGI middleware that collects QueryStats for each HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope.get("path", ""))
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
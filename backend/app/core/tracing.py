@@ -0,0 +1,261 @@
+"""
+Lightweight in-process tracing.
+
+TracingMiddleware opens a root span per sampled request (TRACING_SAMPLE_RATE);
+`span()` opens child spans, CRUDBase methods are wrapped with `trace_crud`,
+and SQL statements get spans from the engine's cursor hooks. The current span
+lives in a contextvar, so spans opened on threadpool workers nest under the
+request that dispatched them.
+
+Finished traces are written by a background thread to TRACING_FILE (rotated
+at TRACING_MAX_BYTES), one OTLP/JSON `ExportTraceServiceRequest` per line.
+
+With tracing disabled, or for requests that weren't sampled, `span()` and
+`trace_crud` cost one contextvar lookup and the SQL hooks aren't registered.
+"""
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+MAX_STATEMENT_LENGTH = 1000
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "name", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, trace: "Trace", name: str, kind: int, parent_id: Optional[str] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.trace = trace
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = 0
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.end = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.trace.spans.append(self)
+
+class Trace:
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self):
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+_NOOP_SPAN = _NoopSpan()
+
+class _ActiveSpan:
+    __slots__ = ("span", "token")
+
+    def __init__(self, parent: Span, name: str, kind: int, attributes: Dict[str, Any]):
+        self.span = Span(parent.trace, name, kind, parent.span_id, attributes)
+
+    def __enter__(self) -> Span:
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self.token)
+        self.span.finish(exc)
+        return False
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """Open a child span of the current span; a no-op outside a sampled trace."""
+    parent = _current_span.get()
+    if parent is None:
+        return _NOOP_SPAN
+    return _ActiveSpan(parent, name, kind, attributes)
+
+def trace_crud(method):
+    """Wrap a CRUDBase method in a `<Model>.<method>` span."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if _current_span.get() is None:
+            return method(self, *args, **kwargs)
+        with span(f"{self.model.__name__}.{method.__name__}"):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    stack = conn.info.setdefault("trace_spans", [])
+    if parent is None:
+        stack.append(None)
+        return
+    stack.append(Span(
+        parent.trace,
+        statement.split(None, 1)[0].upper() if statement else "SQL",
+        SPAN_KIND_CLIENT,
+        parent.span_id,
+        {
+            "db.system": conn.dialect.name,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+        },
+    ))
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    sql_span = conn.info["trace_spans"].pop()
+    if sql_span is not None:
+        sql_span.finish()
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    stack = conn.info.get("trace_spans") if conn is not None else None
+    if stack:
+        sql_span = stack.pop()
+        if sql_span is not None:
+            sql_span.finish(exception_context.original_exception)
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _attribute_value(value)} for key, value in attributes.items()]
+
+def to_otlp(trace: Trace) -> Dict[str, Any]:
+    spans = []
+    for s in trace.spans:
+        otlp_span = {
+            "traceId": trace.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": s.kind,
+            "startTimeUnixNano": str(s.start),
+            "endTimeUnixNano": str(s.end),
+            "attributes": _attributes(s.attributes),
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": _attributes({"service.name": settings.PROJECT_NAME})},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]
+    }
+
+class OTLPFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        # RotatingFileHandler formats once to check the size and again to write
+        encoded = record.__dict__.get("_otlp_json")
+        if encoded is None:
+            encoded = record._otlp_json = json.dumps(to_otlp(record.msg), separators=(",", ":"))
+        return encoded
+
+_export_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def export_trace(trace: Trace) -> None:
+    # Serialisation happens on the listener thread; the request only enqueues
+    _export_queue.put_nowait(logging.makeLogRecord({"msg": trace}))
+
+def setup_tracing(engine: Engine) -> None:
+    global _listener
+    if _listener is not None:
+        return
+    directory = os.path.dirname(settings.TRACING_FILE)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        settings.TRACING_FILE,
+        maxBytes=settings.TRACING_MAX_BYTES,
+        backupCount=settings.TRACING_BACKUP_COUNT,
+    )
+    handler.setFormatter(OTLPFormatter())
+    _listener = logging.handlers.QueueListener(_export_queue, handler)
+    _listener.start()
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+def shutdown_tracing() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+class TracingMiddleware:
+    """Opens a SERVER root span for each sampled HTTP request and exports the trace."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= settings.TRACING_SAMPLE_RATE:
+            await self.app(scope, receive, send)
+            return
+
+        trace = Trace()
+        root = Span(trace, scope["method"], SPAN_KIND_SERVER, attributes={
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        token = _current_span.set(root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                root.set_attribute("http.status_code", message["status"])
+                headers = list(message.get("headers", []))
+                headers.append((b"traceparent", f"00-{trace.trace_id}-{root.span_id}-01".encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route:
+                root.name = f"{scope['method']} {route}"
+                root.set_attribute("http.route", route)
+            root.finish(error)
+            export_trace(trace)
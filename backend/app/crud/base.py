@@ -1,15 +1,20 @@
-from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
-from fastapi.encoders import jsonable_encoder
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Generic, Iterable, List, Optional, Type, TypeVar, Union
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm.exc import StaleDataError
+from sqlalchemy import delete, func, inspect, insert, update
 from app.models.base import Base
+from app.core.tracing import trace_crud
 
 ModelType = TypeVar("ModelType", bound=Base) # type: ignore
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
 class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Extra column values set when a row is archived
+    archive_values: Dict[str, Any] = {}
+
     def __init__(self, model: Type[ModelType]):
         """
         CRUD object with default methods to Create, Read, Update, Delete (CRUD).
@@ -18,49 +23,117 @@ class CRUDBase(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         * `schema`: A Pydantic model (schema) class
         """
         self.model = model
+        mapper = inspect(model)
+        self.columns: FrozenSet[str] = frozenset(attr.key for attr in mapper.column_attrs)
+        # Models mapped with version_id_col get the same check in the set-based writes below
+        # (the mapped attribute, not the Table column, so RETURNING refreshes the instance)
+        self.version_key = (
+            mapper.get_property_by_column(mapper.version_id_col).key if mapper.version_id_col is not None else None
+        )
+        self.version_column = getattr(model, self.version_key) if self.version_key else None
+
+    def _bump_version(self, statement):
+        if self.version_column is None:
+            return statement
+        return statement.values({self.version_key: self.version_column + 1})
+
+    def _column_values(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: value for field, value in data.items() if field in self.columns}
 
+    @trace_crud
     def get(self, db: Session, id: Any) -> Optional[ModelType]:
         return db.query(self.model).filter(self.model.id == id).first()
 
+    @trace_crud
     def get_multi(
-        self, db: Session, *, skip: int = 0, limit: int = 100
+        self, db: Session, *, skip: int = 0, limit: int = 100, include_archived: bool = False
     ) -> List[ModelType]:
-        return db.query(self.model).offset(skip).limit(limit).all()
+        query = db.query(self.model)
+        if not include_archived and "archived_at" in self.columns:
+            query = query.filter(self.model.archived_at.is_(None))
+        return query.offset(skip).limit(limit).all()
 
-    def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
-        obj_in_data = jsonable_encoder(obj_in)
-        db_obj = self.model(**obj_in_data)
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
+    @trace_crud
+    def create(self, db: Session, *, obj_in: CreateSchemaType, commit: bool = True) -> ModelType:
+        # One INSERT ... RETURNING gives back server defaults; no refresh SELECT.
+        # With commit=False the caller commits it together with its other writes.
+        values = self._column_values(obj_in.model_dump())
+        db_obj = db.scalars(insert(self.model).values(**values).returning(self.model)).one()
+        if commit:
+            db.commit()
         return db_obj
 
+    @trace_crud
     def update(
         self,
         db: Session,
         *,
         db_obj: ModelType,
-        obj_in: Union[UpdateSchemaType, Dict[str, Any]]
+        obj_in: Union[UpdateSchemaType, Dict[str, Any]],
+        commit: bool = True,
     ) -> ModelType:
-        obj_data = jsonable_encoder(db_obj)
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
             update_data = obj_in.model_dump(exclude_unset=True)
-        for field in obj_data:
-            if field in update_data:
-                setattr(db_obj, field, update_data[field])
-        db.add(db_obj)
-        db.commit()
-        db.refresh(db_obj)
-        return db_obj
+        values = self._column_values(update_data)
+        if not values:
+            return db_obj
+        statement = update(self.model).where(self.model.id == db_obj.id)
+        if self.version_column is not None:
+            # Only the version that was read may be updated, as in an ORM flush
+            statement = self._bump_version(statement.where(self.version_column == getattr(db_obj, self.version_key)))
+        # UPDATE ... RETURNING refreshes db_obj in place (including onupdate columns)
+        updated = db.scalars(
+            statement.values(**values).returning(self.model).execution_options(populate_existing=True)
+        ).one_or_none()
+        if updated is None:
+            db.rollback()
+            raise StaleDataError(f"{self.model.__name__} {db_obj.id} was modified by another request")
+        if commit:
+            db.commit()
+        return updated
 
-    def remove(self, db: Session, *, id: int) -> ModelType:
-        obj = db.query(self.model).get(id)
-        db.delete(obj)
+    @trace_crud
+    def remove(self, db: Session, *, id: int, commit: bool = True) -> Optional[ModelType]:
+        # Children go with ON DELETE CASCADE in the database (relationships use
+        # passive_deletes), so nothing is loaded into the session first
+        obj = db.scalars(delete(self.model).where(self.model.id == id).returning(self.model)).one_or_none()
+        if commit:
+            db.commit()
+        return obj
+
+    @trace_crud
+    def remove_many(self, db: Session, *, ids: Iterable[int], commit: bool = True) -> List[int]:
+        """Delete the rows with these ids in one statement; returns the ids that existed."""
+        deleted = db.scalars(delete(self.model).where(self.model.id.in_(list(ids))).returning(self.model.id)).all()
+        if commit:
+            db.commit()
+        return sorted(deleted)
+
+    def _archive_statement(self, ids: List[int]):
+        # Rows archived earlier keep their original archived_at
+        return self._bump_version(
+            update(self.model)
+            .where(self.model.id.in_(ids))
+            .values(archived_at=func.coalesce(self.model.archived_at, datetime.utcnow()), **self.archive_values)
+        )
+
+    @trace_crud
+    def archive(self, db: Session, *, id: int) -> Optional[ModelType]:
+        """Soft delete: set archived_at, hiding the row from listings."""
+        obj = db.scalars(
+            self._archive_statement([id]).returning(self.model).execution_options(populate_existing=True)
+        ).one_or_none()
         db.commit()
         return obj
 
+    @trace_crud
+    def archive_many(self, db: Session, *, ids: Iterable[int]) -> List[int]:
+        archived = db.scalars(self._archive_statement(list(ids)).returning(self.model.id)).all()
+        db.commit()
+        return sorted(archived)
+
     def get_count(self, db: Session) -> int:
         return db.query(func.count(self.model.id)).scalar()
 
@@ -1,18 +1,24 @@
-from typing import List, Optional, Union, Dict, Any
-from sqlalchemy.orm import Session
+from typing import Iterable, List, Optional, Sequence, Tuple, Union, Dict, Any
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
 from app.crud.base import CRUDBase
-from app.models.hotel import Room, Guest, Booking, Employee, FinancialTransaction, RoomTariff
+from app.models.hotel import ACTIVE_STATUSES, RELEASED_STATUSES, Allotment, Room, Guest, Booking, BookingChange, BookingStatus, Employee, FinancialTransaction, RoomHold, RoomTariff, RoomType
 from app.schemas.hotel import (
     RoomCreate, RoomUpdate,
     GuestCreate, GuestUpdate,
     BookingCreate, BookingUpdate,
     EmployeeCreate, EmployeeUpdate,
     FinancialTransactionCreate, FinancialTransactionUpdate,
-    RoomTariffCreate, RoomTariffUpdate
+    RoomTariffCreate, RoomTariffUpdate,
+    RoomHoldCreate,
+    AllotmentCreate,
 )
-from datetime import date
+from datetime import date, datetime
 
 class CRUDRoom(CRUDBase[Room, RoomCreate, RoomUpdate]):
+    # An archived room can't be booked
+    archive_values = {"is_available": False}
+
     def get_by_number(self, db: Session, *, number: str) -> Optional[Room]:
         return db.query(Room).filter(Room.number == number).first()
 
@@ -22,16 +28,95 @@ class CRUDRoom(CRUDBase[Room, RoomCreate, RoomUpdate]):
         return (
             db.query(Room)
             .filter(Room.is_available == True)
+            .filter(Room.archived_at.is_(None))
             .offset(skip)
             .limit(limit)
             .all()
         )
 
+    def refresh_availability(self, db: Session, *, rooms: Iterable[Room]) -> None:
+        """
+        Set is_available from the rooms' active bookings, as the night audit
+        does, e.g. for the room a booking was moved out of. Flushes first so
+        pending moves count; doesn't commit.
+        """
+        rooms = [r for r in rooms if r is not None]
+        if not rooms:
+            return
+        db.flush()
+        busy = set(db.scalars(
+            select(Booking.room_id).where(
+                Booking.room_id.in_([r.id for r in rooms]), Booking.status.in_(ACTIVE_STATUSES)
+            )
+        ))
+        for r in rooms:
+            r.is_available = r.archived_at is None and r.id not in busy
+
 class CRUDGuest(CRUDBase[Guest, GuestCreate, GuestUpdate]):
     def get_by_email(self, db: Session, *, email: str) -> Optional[Guest]:
         return db.query(Guest).filter(Guest.email == email).first()
 
 class CRUDBooking(CRUDBase[Booking, BookingCreate, BookingUpdate]):
+    def get_with_relations(self, db: Session, *, id: int) -> Optional[Booking]:
+        return (
+            db.query(Booking)
+            .options(joinedload(Booking.guest), joinedload(Booking.room))
+            .filter(Booking.id == id)
+            .first()
+        )
+
+    def get_summaries(
+        self,
+        db: Session,
+        *,
+        filters: List[Any],
+        statuses: Optional[List[BookingStatus]] = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """
+        Compact rows (guest name and room number instead of nested objects) for
+        the front desk lists, ordered by room number. Without `statuses`,
+        cancelled and no-show bookings are left out; archived bookings always
+        are.
+        """
+        status_filter = Booking.status.in_(statuses) if statuses else Booking.status.notin_(RELEASED_STATUSES)
+        rows = (
+            db.query(
+                Booking.id,
+                Booking.status,
+                Booking.check_in_date,
+                Booking.check_out_date,
+                Booking.payment_status,
+                Booking.guest_id,
+                Guest.first_name,
+                Guest.last_name,
+                Booking.room_id,
+                Booking.room_type,
+                Room.number.label("room_number"),
+            )
+            .join(Guest, Guest.id == Booking.guest_id)
+            .outerjoin(Room, Room.id == Booking.room_id)
+            .filter(*filters, status_filter, Booking.archived_at.is_(None))
+            .order_by(Room.number, Booking.id)
+            .offset(skip)
+            .limit(limit)
+        )
+        summaries = []
+        for row in rows:
+            summary = row._asdict()
+            summary["guest_name"] = " ".join(filter(None, (summary.pop("first_name"), summary.pop("last_name"))))
+            summaries.append(summary)
+        return summaries
+
+    def get_changes(self, db: Session, *, booking_id: int) -> List[BookingChange]:
+        return (
+            db.query(BookingChange)
+            .filter(BookingChange.booking_id == booking_id)
+            .order_by(BookingChange.created_at, BookingChange.id)
+            .all()
+        )
+
     def get_by_guest(
         self, db: Session, *, guest_id: int, skip: int = 0, limit: int = 100
     ) -> List[Booking]:
@@ -102,6 +187,38 @@ class CRUDFinancialTransaction(CRUDBase[FinancialTransaction, FinancialTransacti
             .all()
         )
 
+class CRUDRoomHold(CRUDBase[RoomHold, RoomHoldCreate, RoomHoldCreate]):
+    def get_overlapping(
+        self, db: Session, *, room_ids: Sequence[int], check_in_date: date, check_out_date: date
+    ) -> List[Tuple[int, date, date]]:
+        """
+        (room_id, check_in_date, check_out_date) of the unexpired holds on
+        `room_ids` overlapping the range, with the same inclusive rule as
+        bookings. Served by ix_room_holds_room_id_dates.
+        """
+        return (
+            db.query(RoomHold.room_id, RoomHold.check_in_date, RoomHold.check_out_date)
+            .filter(
+                RoomHold.room_id.in_(room_ids),
+                RoomHold.check_in_date <= check_out_date,
+                RoomHold.check_out_date >= check_in_date,
+                RoomHold.expires_at > datetime.utcnow(),
+            )
+            .all()
+        )
+
+class CRUDAllotment(CRUDBase[Allotment, AllotmentCreate, AllotmentCreate]):
+    def get_filtered(
+        self, db: Session, *, skip: int = 0, limit: int = 100,
+        room_type: Optional[RoomType] = None, include_released: bool = False,
+    ) -> List[Allotment]:
+        query = db.query(Allotment)
+        if room_type is not None:
+            query = query.filter(Allotment.room_type == room_type)
+        if not include_released:
+            query = query.filter(Allotment.released_at.is_(None))
+        return query.order_by(Allotment.start_date, Allotment.id).offset(skip).limit(limit).all()
+
 def get_tariff(db: Session, id: int):
     return db.query(RoomTariff).filter(RoomTariff.id == id).first()
 
@@ -120,6 +237,14 @@ def get_current_tariff(db: Session, room_type: str, target_date: date):
         RoomTariff.end_date >= target_date
     ).first()
 
+def get_booking_tariffs(db: Session, room_type: str, check_in_date: date) -> List[RoomTariff]:
+    """Tariffs valid on the check-in date, longest minimum stay first."""
+    return db.query(RoomTariff).filter(
+        RoomTariff.room_type == room_type,
+        RoomTariff.start_date <= check_in_date,
+        RoomTariff.end_date >= check_in_date
+    ).order_by(RoomTariff.min_nights.desc()).all()
+
 def create_tariff(db: Session, *, obj_in: RoomTariffCreate):
     db_obj = RoomTariff(
         room_type=obj_in.room_type,
@@ -157,4 +282,6 @@ room = CRUDRoom(Room)
 guest = CRUDGuest(Guest)
 booking = CRUDBooking(Booking)
 employee = CRUDEmployee(Employee)
-financial_transaction = CRUDFinancialTransaction(FinancialTransaction) 
\ No newline at end of file
+financial_transaction = CRUDFinancialTransaction(FinancialTransaction)
+room_hold = CRUDRoomHold(RoomHold)
+allotment = CRUDAllotment(Allotment) 
\ No newline at end of file
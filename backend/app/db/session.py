@@ -1,9 +1,20 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.sql_timing import instrument_engine
 
 engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    instrument_engine(engine)
+
+if engine.dialect.name == "sqlite":
+    # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on per connection
+    @event.listens_for(engine, "connect")
+    def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+# Writes return fresh rows via RETURNING, so objects needn't be reloaded after commit
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 def get_db():
     db = SessionLocal()
@@ -1,20 +1,31 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 from app.core.config import settings
 from app.api.api_v1.api import api_router
-import logging
+from app.core.security import shutdown_password_pool
+from app.core.sql_timing import SQLTimingMiddleware
+from app.core.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, mark_process_dead, render_metrics
+from app.core.profiling import ProfilingMiddleware
+from app.core.memory import MemoryPeakMiddleware
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.tracing import TracingMiddleware, setup_tracing, shutdown_tracing
+from app.db.session import engine
+from app.core.logging_config import setup_logging, shutdown_logging
+from app.services import night_audit, room_holds
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+setup_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json"
 )
 
+# Inside CORS, so replayed responses get CORS headers too
+app.add_middleware(IdempotencyMiddleware)
+
 # Set all CORS enabled origins
 app.add_middleware(
     CORSMiddleware,
@@ -25,9 +36,48 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+if settings.SQL_INSTRUMENTATION_ENABLED:
+    app.add_middleware(SQLTimingMiddleware)
+
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MemoryPeakMiddleware)
+
+if settings.TRACING_ENABLED:
+    setup_tracing(engine)
+    app.add_middleware(TracingMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.exception_handler(StaleDataError)
+async def stale_data_handler(request: Request, exc: StaleDataError):
+    # A versioned row changed between our read and our write
+    return JSONResponse(
+        status_code=412,
+        content={"detail": "Modified by another request; reload and try again"},
+    )
+
+@app.on_event("startup")
+async def startup_event():
+    if settings.NIGHT_AUDIT_SCHEDULER_ENABLED:
+        night_audit.start_scheduler()
+    if settings.ROOM_HOLD_REAPER_ENABLED:
+        room_holds.start_reaper()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    night_audit.stop_scheduler()
+    room_holds.stop_reaper()
+    shutdown_password_pool()
+    mark_process_dead()
+    shutdown_tracing()
+    shutdown_logging()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Hotel Manager API"} 
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Date, DateTime, Float, Integer, String, Text
+from .base import BaseModel
+
+class NightAuditRun(BaseModel):
+    __tablename__ = "night_audit_runs"
+
+    business_date = Column(Date, nullable=False, index=True)
+    status = Column(String, nullable=False, default="running")  # running, completed, failed
+    started_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+    duration_ms = Column(Integer)
+    # Rows touched per step
+    checked_out = Column(Integer, nullable=False, default=0)
+    no_shows = Column(Integer, nullable=False, default=0)
+    rooms_blocked = Column(Integer, nullable=False, default=0)
+    rooms_released = Column(Integer, nullable=False, default=0)
+    allotments_released = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text)
+
+class DailyRevenue(BaseModel):
+    __tablename__ = "daily_revenue"
+
+    business_date = Column(Date, nullable=False, unique=True)
+    income = Column(Float, nullable=False, default=0)
+    expenses = Column(Float, nullable=False, default=0)
+    room_revenue = Column(Float, nullable=False, default=0)  # Accrued: each stay's price spread over its nights
+    rooms_occupied = Column(Integer, nullable=False, default=0)
+    rooms_total = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, Boolean, Enum, Date, DateTime, JSON, Text
+from sqlalchemy import Column, String, Integer, Float, ForeignKey, Boolean, Enum, Date, DateTime, Index, JSON, Text, UniqueConstraint
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 import enum
 from .base import BaseModel
 from datetime import datetime
@@ -15,6 +15,12 @@ class BookingStatus(str, enum.Enum):
     checked_in = "checked_in"
     checked_out = "checked_out"
     cancelled = "cancelled"
+    no_show = "no_show"
+
+# Bookings in these states no longer hold their room
+RELEASED_STATUSES = (BookingStatus.cancelled, BookingStatus.no_show)
+# A room with a booking in one of these states isn't available
+ACTIVE_STATUSES = (BookingStatus.pending, BookingStatus.confirmed, BookingStatus.checked_in)
 
 class Room(BaseModel):
     __tablename__ = "rooms"
@@ -27,12 +33,17 @@ class Room(BaseModel):
     is_available = Column(Boolean, default=True)
     description = Column(Text)
     amenities = Column(Text)
+    archived_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Bumped on every UPDATE; a write based on an older version fails with StaleDataError
+    version = Column(Integer, nullable=False, server_default="1")
 
-    # Relationships
-    tariffs = relationship("RoomTariff", back_populates="room", cascade="all, delete-orphan")
-    bookings = relationship("Booking", back_populates="room", cascade="all, delete-orphan")
+    __mapper_args__ = {"version_id_col": version}
+
+    # Relationships; children are removed by ON DELETE CASCADE, not loaded and deleted one by one
+    tariffs = relationship("RoomTariff", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
+    bookings = relationship("Booking", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -53,24 +64,129 @@ class Guest(BaseModel):
     id_number = Column(String)
     preferences = Column(String)  # JSON string of preferences
     is_active = Column(Boolean, default=True)
+    archived_at = Column(DateTime, nullable=True)
 
-    bookings = relationship("Booking", back_populates="guest", cascade="all, delete-orphan")
+    bookings = relationship("Booking", back_populates="guest", cascade="all, delete-orphan", passive_deletes=True)
 
 class Booking(BaseModel):
     __tablename__ = "bookings"
-
-    guest_id = Column(Integer, ForeignKey("guests.id"))
-    room_id = Column(Integer, ForeignKey("rooms.id"))
+    __table_args__ = (
+        # Arrivals, departures and in-house lists for a business date
+        Index("ix_bookings_check_in_date_status", "check_in_date", "status"),
+        Index("ix_bookings_check_out_date_status", "check_out_date", "status"),
+        Index("ix_bookings_status", "status"),
+        # Overlap checks for a room; room_holds has the same index
+        Index("ix_bookings_room_id_dates", "room_id", "check_in_date", "check_out_date"),
+    )
+
+    guest_id = Column(Integer, ForeignKey("guests.id", ondelete="CASCADE"))
+    # Empty for a type-level booking until a room is assigned; room_type is always set
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"))
+    room_type = Column(Enum(RoomType))
+    # The block the booking was picked up from, if any
+    allotment_id = Column(Integer, ForeignKey("allotments.id", ondelete="SET NULL"), nullable=True, index=True)
+    # Set when POST /rooms/assign chose the room, which it may then change again
+    auto_assigned = Column(Boolean, nullable=False, default=False, server_default=false())
+    party_size = Column(Integer, nullable=True)  # Checked against the room's capacity
     check_in_date = Column(Date)
     check_out_date = Column(Date)
     status = Column(Enum(BookingStatus), default=BookingStatus.pending)
     total_price = Column(Float, nullable=True)
     special_requests = Column(String, nullable=True)
     payment_status = Column(String, nullable=True, default="pending")
+    archived_at = Column(DateTime, nullable=True)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
     guest = relationship("Guest", back_populates="bookings")
     room = relationship("Room", back_populates="bookings")
-    financial_transactions = relationship("FinancialTransaction", back_populates="booking", cascade="all, delete-orphan")
+    allotment = relationship("Allotment", back_populates="bookings")
+    financial_transactions = relationship(
+        "FinancialTransaction", back_populates="booking", cascade="all, delete-orphan", passive_deletes=True
+    )
+    changes = relationship("BookingChange", back_populates="booking", cascade="all, delete-orphan", passive_deletes=True)
+
+class BookingChange(BaseModel):
+    """
+    A date change or room move made with POST /bookings/{id}/modify: the
+    stay and price before and after.
+    """
+    __tablename__ = "booking_changes"
+
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
+    changed_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    old_check_in_date = Column(Date, nullable=False)
+    old_check_out_date = Column(Date, nullable=False)
+    new_check_in_date = Column(Date, nullable=False)
+    new_check_out_date = Column(Date, nullable=False)
+    old_room_id = Column(Integer, nullable=True)  # Rooms may be deleted later; no foreign key
+    new_room_id = Column(Integer, nullable=True)
+    old_total_price = Column(Float, nullable=True)
+    new_total_price = Column(Float, nullable=True)
+    reason = Column(String, nullable=True)
+
+    booking = relationship("Booking", back_populates="changes")
+
+class RoomHold(BaseModel):
+    """
+    A room kept for a guest for a few minutes while they check out, so the
+    booking flow needn't hold a transaction open. Unexpired holds count in
+    overlap checks like bookings; expired ones are ignored and reaped.
+    """
+    __tablename__ = "room_holds"
+    __table_args__ = (
+        Index("ix_room_holds_room_id_dates", "room_id", "check_in_date", "check_out_date"),
+    )
+
+    guest_id = Column(Integer, ForeignKey("guests.id", ondelete="CASCADE"), nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
+    check_in_date = Column(Date, nullable=False)
+    check_out_date = Column(Date, nullable=False)
+    special_requests = Column(String, nullable=True)
+    total_price = Column(Float, nullable=True)  # Quoted when the hold was placed
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+class Allotment(BaseModel):
+    """
+    A block of rooms of one type kept for a tour operator over a date range.
+    Its rooms count against availability until they are picked up (booked
+    through the block) or the block is released at release_date, when the
+    rest go back on general sale.
+    """
+    __tablename__ = "allotments"
+
+    holder = Column(String, nullable=False)  # Tour operator or group
+    room_type = Column(Enum(RoomType), nullable=False)
+    start_date = Column(Date, nullable=False)  # First night
+    end_date = Column(Date, nullable=False)  # Day after the last night
+    rooms = Column(Integer, nullable=False)  # Per night
+    release_date = Column(Date, nullable=False, index=True)
+    released_at = Column(DateTime, nullable=True)
+
+    bookings = relationship("Booking", back_populates="allotment", passive_deletes=True)
+
+class RoomInventory(BaseModel):
+    """
+    Rooms of a type per day: total (rooms not archived), sold (bookings not
+    cancelled or no-show, by their room_type), held (room holds not reaped yet)
+    and allotted (rooms of unreleased allotments not picked up yet). A stay
+    counts from its check-in to its check-out day, both included, as in the
+    overlap rule.
+    Kept up to date with conditional increments in the same transaction as
+    the booking or hold; see app/services/inventory.py.
+    """
+    __tablename__ = "inventory"
+    __table_args__ = (
+        UniqueConstraint("room_type", "night", name="uq_inventory_room_type_night"),
+    )
+
+    room_type = Column(Enum(RoomType), nullable=False)
+    night = Column(Date, nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    sold = Column(Integer, nullable=False, default=0)
+    held = Column(Integer, nullable=False, default=0)
+    allotted = Column(Integer, nullable=False, default=0, server_default="0")
 
 class Employee(BaseModel):
     __tablename__ = "employees"
@@ -88,7 +204,7 @@ class Employee(BaseModel):
 class FinancialTransaction(BaseModel):
     __tablename__ = "financial_transactions"
 
-    booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), nullable=True)
     amount = Column(Float)
     transaction_type = Column(String)  # income/expense
     category = Column(String)
@@ -102,7 +218,7 @@ class RoomTariff(BaseModel):
     __tablename__ = "room_tariffs"
 
     id = Column(Integer, primary_key=True, index=True)
-    room_id = Column(Integer, ForeignKey("rooms.id"), nullable=False)
+    room_id = Column(Integer, ForeignKey("rooms.id", ondelete="CASCADE"), nullable=False)
     room_type = Column(String, nullable=False)
     price_per_night = Column(Float, nullable=False)
     weekend_price_per_night = Column(Float, nullable=True)  # Price for Friday and Saturday nights
@@ -111,6 +227,9 @@ class RoomTariff(BaseModel):
     end_date = Column(Date, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    version = Column(Integer, nullable=False, server_default="1")
+
+    __mapper_args__ = {"version_id_col": version}
 
     # Relationships
     room = relationship("Room", back_populates="tariffs")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, String
+from .base import BaseModel
+
+class IdempotencyKey(BaseModel):
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), nullable=False, unique=True, index=True)  # sha256 of route, caller and header value
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body
+    status = Column(String, nullable=False, default="pending")  # pending, completed
+    response_status = Column(Integer)
+    response_content_type = Column(String)
+    response_body = Column(LargeBinary)
+    expires_at = Column(DateTime, nullable=False, index=True)
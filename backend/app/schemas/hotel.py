@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, constr
+from pydantic import BaseModel, EmailStr, Field, constr, model_validator
 from typing import Optional, List
 from datetime import date, datetime
 from app.models.hotel import RoomType, BookingStatus
@@ -26,6 +26,8 @@ class RoomUpdate(BaseModel):
 class Room(RoomBase):
     id: int
     is_available: bool
+    archived_at: Optional[datetime] = None
+    version: int
     created_at: datetime
     updated_at: datetime
 
@@ -50,6 +52,7 @@ class GuestUpdate(GuestBase):
 
 class Guest(GuestBase):
     id: int
+    archived_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -58,7 +61,10 @@ class Guest(GuestBase):
 
 class BookingBase(BaseModel):
     guest_id: int
-    room_id: int
+    # A type-level booking gives only room_type; a room is assigned later
+    room_id: Optional[int] = None
+    room_type: Optional[RoomType] = None
+    party_size: Optional[int] = Field(None, ge=1)
     check_in_date: date
     check_out_date: date
     special_requests: Optional[str] = None
@@ -66,7 +72,45 @@ class BookingBase(BaseModel):
     payment_status: Optional[str] = None
 
 class BookingCreate(BookingBase):
-    pass
+    @model_validator(mode="after")
+    def check_room(self):
+        if self.room_id is None and self.room_type is None:
+            raise ValueError("room_id or room_type is required")
+        return self
+
+class BookingAssign(BaseModel):
+    room_id: int
+
+class BookingModify(BaseModel):
+    """New dates and/or room; fields left out keep their current value."""
+    check_in_date: Optional[date] = None
+    check_out_date: Optional[date] = None
+    room_id: Optional[int] = None
+    reason: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_change(self):
+        if self.check_in_date is None and self.check_out_date is None and self.room_id is None:
+            raise ValueError("check_in_date, check_out_date or room_id is required")
+        return self
+
+class BookingChange(BaseModel):
+    id: int
+    booking_id: int
+    changed_by: Optional[int] = None
+    old_check_in_date: date
+    old_check_out_date: date
+    new_check_in_date: date
+    new_check_out_date: date
+    old_room_id: Optional[int] = None
+    new_room_id: Optional[int] = None
+    old_total_price: Optional[float] = None
+    new_total_price: Optional[float] = None
+    reason: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
 
 class BookingUpdate(BaseModel):
     status: Optional[BookingStatus] = None
@@ -79,14 +123,142 @@ class Booking(BookingBase):
     status: BookingStatus
     total_price: Optional[float] = None
     payment_status: Optional[str] = None
+    auto_assigned: bool = False
+    allotment_id: Optional[int] = None
+    archived_at: Optional[datetime] = None
+    version: int
     created_at: datetime
     updated_at: datetime
     guest: Guest
-    room: Room
+    room: Optional[Room] = None
+
+    class Config:
+        from_attributes = True
+
+class BookingSummary(BaseModel):
+    """Compact row for the front desk lists: no nested guest and room."""
+    id: int
+    status: BookingStatus
+    check_in_date: date
+    check_out_date: date
+    payment_status: Optional[str] = None
+    guest_id: int
+    guest_name: str
+    room_id: Optional[int] = None
+    room_type: Optional[RoomType] = None
+    room_number: Optional[str] = None  # Not yet assigned
+
+class BookingBatchCreate(BaseModel):
+    items: List[BookingCreate] = Field(..., min_length=1, max_length=100)
+    all_or_nothing: bool = True
+
+class BookingBatchItemResult(BaseModel):
+    index: int
+    status: str  # created, failed, or skipped when an all-or-nothing batch is rejected
+    booking: Optional[Booking] = None
+    error: Optional[str] = None
+
+class BookingBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BookingBatchItemResult]
+
+class BookingBulkDeleteResult(BaseModel):
+    archived: bool
+    booking_ids: List[int]
+    not_found: List[int]
+
+class RoomHoldCreate(BaseModel):
+    guest_id: int
+    room_id: int
+    check_in_date: date
+    check_out_date: date
+    special_requests: Optional[str] = None
+    minutes: Optional[int] = Field(None, ge=1, description="Defaults to ROOM_HOLD_MINUTES")
+
+class RoomHoldConfirm(BaseModel):
+    payment_status: Optional[str] = None
+
+class RoomHold(BaseModel):
+    id: int
+    guest_id: int
+    room_id: int
+    check_in_date: date
+    check_out_date: date
+    special_requests: Optional[str] = None
+    total_price: Optional[float] = None
+    expires_at: datetime
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class AllotmentBase(BaseModel):
+    holder: str
+    room_type: RoomType
+    start_date: date  # First night
+    end_date: date  # Day after the last night
+    rooms: int = Field(..., ge=1)
+    release_date: date
+
+class AllotmentCreate(AllotmentBase):
+    @model_validator(mode="after")
+    def check_dates(self):
+        if self.end_date <= self.start_date:
+            raise ValueError("end_date must be after start_date")
+        return self
+
+class Allotment(AllotmentBase):
+    id: int
+    released_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
 
     class Config:
         from_attributes = True
 
+class AllotmentPickUpItem(BaseModel):
+    guest_id: int
+    room_id: Optional[int] = None  # Usually left out and assigned later
+    party_size: Optional[int] = Field(None, ge=1)
+    check_in_date: date
+    check_out_date: date
+    special_requests: Optional[str] = None
+    payment_status: Optional[str] = None
+
+class AllotmentPickUp(BaseModel):
+    items: List[AllotmentPickUpItem] = Field(..., min_length=1, max_length=100)
+    all_or_nothing: bool = True
+
+class AllotmentReleaseResult(BaseModel):
+    released: int
+    allotment_ids: List[int]
+
+class InventoryNight(BaseModel):
+    room_type: RoomType
+    night: date
+    total: int
+    sold: int
+    held: int
+    allotted: int
+    available: int
+
+class RoomAssignment(BaseModel):
+    booking_id: int
+    room_id: int
+    room_number: str
+
+class RoomAssignmentResult(BaseModel):
+    room_type: RoomType
+    rooms: int
+    bookings: int  # Bookings the run could place or move
+    assigned: int
+    moved: int
+    unassigned: List[int]  # Booking ids no room could take
+    orphan_nights: int
+    greedy_orphan_nights: int  # Before the local search
+    assignments: List[RoomAssignment]
+
 class EmployeeBase(BaseModel):
     first_name: str
     last_name: str
@@ -157,6 +329,7 @@ class RoomTariff(RoomTariffBase):
     id: int
     created_at: datetime
     updated_at: datetime
+    version: int
 
     class Config:
         orm_mode = True 
\ No newline at end of file
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, EmailStr, model_validator
+from typing import List, Optional
+from datetime import date
+from app.models.hotel import BookingStatus
+
+class ImportRowError(BaseModel):
+    row: int
+    key: Optional[str] = None
+    errors: List[str]
+
+class ImportReport(BaseModel):
+    total: int
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+
+class BookingImportRow(BaseModel):
+    # Migrated data usually knows guests by email and rooms by number, not by our ids
+    guest_id: Optional[int] = None
+    guest_email: Optional[EmailStr] = None
+    room_id: Optional[int] = None
+    room_number: Optional[str] = None
+    check_in_date: date
+    check_out_date: date
+    status: BookingStatus = BookingStatus.confirmed
+    total_price: Optional[float] = None
+    payment_status: Optional[str] = "pending"
+    special_requests: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_references_and_dates(self):
+        if self.guest_id is None and self.guest_email is None:
+            raise ValueError("guest_id or guest_email is required")
+        if self.room_id is None and self.room_number is None:
+            raise ValueError("room_id or room_number is required")
+        if self.check_out_date <= self.check_in_date:
+            raise ValueError("check_out_date must be after check_in_date")
+        return self
+
+class BookingConflict(BaseModel):
+    row: int
+    room_id: int
+    check_in_date: date
+    check_out_date: date
+    conflicting_row: Optional[int] = None
+    conflicting_booking_id: Optional[int] = None
+
+class BookingImportReport(ImportReport):
+    rooms_imported: int
+    rooms_rejected: int
+    conflicts: List[BookingConflict]
@@ -0,0 +1,54 @@
+import argparse
+import io
+import json
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.session import SessionLocal
+from app.services.booking_import import BookingImporter
+from app.services.importer import FORMATS, IMPORTERS, detect_format, get_importer, read_rows
+
+KINDS = sorted([*IMPORTERS, "bookings"])
+
+def import_file(kind: str, path: str, fmt: str, chunk_size: int = None, dry_run: bool = False) -> dict:
+    db = SessionLocal()
+    try:
+        with io.open(path, encoding="utf-8-sig", newline="") as f:
+            rows = read_rows(f, fmt)
+            if kind == "bookings":
+                return BookingImporter().run(db, rows, chunk_size, dry_run=dry_run)
+            return get_importer(kind).run(db, rows, chunk_size)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import guests, rooms, tariffs or bookings from CSV or NDJSON")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int)
+    parser.add_argument("--errors", help="write the per-row error report (JSON) here")
+    parser.add_argument("--dry-run", action="store_true", help="bookings only: validate and report, write nothing")
+    args = parser.parse_args()
+
+    fmt = detect_format(args.format, filename=args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    if args.dry_run and args.kind != "bookings":
+        parser.error("--dry-run is only supported for bookings")
+
+    report = import_file(args.kind, args.path, fmt, args.chunk_size, args.dry_run)
+    print(f"{report['inserted']} of {report['total']} rows imported, {report['failed']} failed")
+    if "conflicts" in report:
+        print(f"{report['rooms_imported']} rooms imported, {report['rooms_rejected']} rejected, "
+              f"{len(report['conflicts'])} overlapping rows")
+    if args.errors:
+        with open(args.errors, "w") as f:
+            json.dump({"errors": report["errors"], "conflicts": report.get("conflicts", [])}, f, indent=2, default=str)
+    else:
+        for error in report["errors"][:20]:
+            print(f"  row {error['row']}: {'; '.join(error['errors'])}")
+        if report["failed"] > 20:
+            print(f"  ... {report['failed'] - 20} more (use --errors to write them all)")
@@ -0,0 +1,29 @@
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.db.session import SessionLocal
+from app.services.night_audit import run_night_audit
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the night audit for a business date")
+    parser.add_argument("--date", type=date.fromisoformat, help="business date to close (default: yesterday)")
+    parser.add_argument("--force", action="store_true", help="run again even if the date is already closed")
+    parser.add_argument("--chunk-size", type=int)
+    args = parser.parse_args()
+
+    business_date = args.date or date.today() - timedelta(days=1)
+    db = SessionLocal()
+    try:
+        run = run_night_audit(db, business_date, force=args.force, chunk_size=args.chunk_size)
+        print(f"Night audit for {business_date}: {run.status} in {run.duration_ms} ms (run {run.id})")
+        print(f"  checked out {run.checked_out}, no-shows {run.no_shows}, "
+              f"rooms blocked {run.rooms_blocked}, rooms released {run.rooms_released}, "
+              f"allotments released {run.allotments_released}")
+        if run.error:
+            print(f"  error: {run.error}")
+    finally:
+        db.close()
+    sys.exit(0 if run.status == "completed" else 1)
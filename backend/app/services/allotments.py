@@ -0,0 +1,124 @@
+"""
+Allotments: blocks of rooms kept for tour operators.
+
+Creating a block counts its rooms as allotted in the room type's inventory
+for every night, so they are no longer on general sale; nothing is written
+to bookings. Guests are booked into the block with pick_up(), which goes
+through the batch booking path and moves each booking's nights from
+allotted to sold. Cancelling such a booking puts its nights back in the
+block while the block is open.
+
+At its release_date a block is released: release_due() marks every due
+block with one UPDATE and recounts the inventory of their room types and
+dates with another, so whatever wasn't picked up goes back on general sale.
+Bookings already picked up stay as they are. The night audit runs it for
+the business date; POST /allotments/release runs it on demand.
+"""
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.hotel import RELEASED_STATUSES, Allotment, Booking
+from app.schemas.hotel import AllotmentCreate, AllotmentPickUpItem, BookingCreate
+from app.services import inventory
+from app.services.booking_batch import create_bookings
+
+logger = logging.getLogger(__name__)
+
+class AllotmentError(Exception):
+    pass
+
+def is_open(allotment: Optional[Allotment]) -> bool:
+    return allotment is not None and allotment.released_at is None
+
+def create_allotment(db: Session, allotment_in: AllotmentCreate) -> Allotment:
+    try:
+        inventory.take(
+            db, allotment_in.room_type, allotment_in.start_date, allotment_in.end_date,
+            count=allotment_in.rooms, allotted=True,
+        )
+    except inventory.SoldOut:
+        db.rollback()
+        raise AllotmentError(f"Not enough {allotment_in.room_type.value} rooms left for this allotment")
+    allotment = Allotment(**allotment_in.model_dump())
+    db.add(allotment)
+    db.commit()
+    logger.info(
+        "Allotment %s: %d %s rooms for %s from %s to %s, released on %s", allotment.id, allotment.rooms,
+        allotment.room_type.value, allotment.holder, allotment.start_date, allotment.end_date,
+        allotment.release_date,
+    )
+    return allotment
+
+def pick_up(
+    db: Session, allotment: Allotment, items: List[AllotmentPickUpItem], all_or_nothing: bool = True
+) -> Tuple[List[dict], List[Booking]]:
+    """Book guests into the block; same results as create_bookings()."""
+    if not is_open(allotment):
+        raise AllotmentError("Allotment has been released")
+    bookings = [BookingCreate(**item.model_dump(), room_type=allotment.room_type) for item in items]
+    return create_bookings(db, bookings, all_or_nothing=all_or_nothing, allotment=allotment)
+
+def rooms_left(db: Session, allotment: Allotment, check_in_date: date, check_out_date: date) -> int:
+    """The fewest rooms the block has left on any day of the stay (check-out day included)."""
+    left = {night: allotment.rooms for night in inventory.days(check_in_date, check_out_date)}
+    picked_up = db.query(Booking.check_in_date, Booking.check_out_date).filter(
+        Booking.allotment_id == allotment.id,
+        Booking.status.notin_(RELEASED_STATUSES),
+        Booking.check_in_date <= check_out_date,
+        Booking.check_out_date >= check_in_date,
+    )
+    for picked_in, picked_out in picked_up:
+        for night in inventory.days(max(picked_in, check_in_date), min(picked_out, check_out_date)):
+            left[night] -= 1
+    return min(left.values(), default=0)
+
+def _recount(db: Session, allotments: List[Tuple]) -> None:
+    """Recount the nights of (room_type, start_date, end_date) blocks, per room type."""
+    ranges = {}
+    for room_type, start_date, end_date in allotments:
+        start, end = ranges.get(room_type, (start_date, end_date))
+        ranges[room_type] = (min(start, start_date), max(end, end_date))
+    for room_type, (start, end) in ranges.items():
+        inventory.recount(db, room_types=[room_type], start=start, end=end)
+
+def release(db: Session, allotment: Allotment) -> Allotment:
+    """Release one block now, before its release date."""
+    if allotment.released_at is None:
+        allotment.released_at = datetime.utcnow()
+        db.flush()
+        _recount(db, [(allotment.room_type, allotment.start_date, allotment.end_date)])
+        db.commit()
+        logger.info("Allotment %s released early", allotment.id)
+    return allotment
+
+def release_due(db: Session, on: date) -> List[int]:
+    """Release every open block whose release_date is on or before `on`; returns their ids."""
+    released = db.execute(
+        update(Allotment)
+        .where(Allotment.released_at.is_(None), Allotment.release_date <= on)
+        .values(released_at=datetime.utcnow())
+        .returning(Allotment.id, Allotment.room_type, Allotment.start_date, Allotment.end_date)
+        .execution_options(synchronize_session=False)
+    ).all()
+    _recount(db, [row[1:] for row in released])
+    db.commit()
+    if released:
+        logger.info("Released %d allotments due by %s", len(released), on)
+    return sorted(row.id for row in released)
+
+def delete(db: Session, allotment: Allotment) -> None:
+    """Delete a block; bookings picked up from it are kept, without the link."""
+    db.execute(
+        update(Booking)
+        .where(Booking.allotment_id == allotment.id)
+        .values(allotment_id=None, version=Booking.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.delete(allotment)
+    db.flush()
+    _recount(db, [(allotment.room_type, allotment.start_date, allotment.end_date)])
+    db.commit()
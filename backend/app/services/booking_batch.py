@@ -0,0 +1,266 @@
+"""
+Create many bookings in one transaction (tour groups, allotment pick-ups).
+
+Every item is checked with the same rules and error messages as
+POST /bookings, but against data fetched once for the whole batch: one query
+each for guests, rooms (locked for the transaction), overlapping bookings,
+overlapping room holds, inventory (locked too) and tariffs. Items are then
+validated in order, so later items also see the bookings accepted earlier in
+the same batch. Items may name a room type instead of a room.
+
+A batch for an allotment (a pick-up) is checked against the rooms left in
+that block, locked like the inventory, instead of the rooms on general sale.
+"""
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy.orm import Session, joinedload
+
+from app.core import metrics, tracing
+from app.crud.hotel import room_hold
+from app.models.hotel import (
+    RELEASED_STATUSES, Allotment, Booking, Guest, Room, RoomInventory, RoomTariff, RoomType,
+)
+from app.schemas.hotel import BookingCreate
+from app.services import inventory
+from app.services.pricing import price_stay, select_tariff, stays_overlap
+
+logger = logging.getLogger(__name__)
+
+class BatchItemError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code  # What POST /bookings answers for the same problem
+
+class BookingBatch:
+    def __init__(self, db: Session, items: List[BookingCreate], allotment: Optional[Allotment] = None):
+        self.db = db
+        self.items = items
+        self.allotment = allotment
+        self.rooms: Dict[int, Room] = {}
+        self.guest_ids = set()
+        self.stays: Dict[int, List[Tuple[date, date]]] = defaultdict(list)
+        self.tariffs: Dict[str, List[RoomTariff]] = defaultdict(list)
+        self.free: Dict[Tuple[RoomType, date], int] = {}  # Rooms left per type and night
+        self.allotted: Dict[date, int] = {}  # Rooms left in the allotment per night
+        self._candidates: Dict[Tuple[str, date], List[RoomTariff]] = {}
+
+    def load(self) -> None:
+        db = self.db
+        guest_ids = {item.guest_id for item in self.items}
+        room_ids = {item.room_id for item in self.items if item.room_id is not None}
+        check_ins = [item.check_in_date for item in self.items]
+        check_outs = [item.check_out_date for item in self.items]
+
+        with tracing.span("guest lookup"):
+            self.guest_ids = {guest_id for (guest_id,) in db.query(Guest.id).filter(Guest.id.in_(guest_ids))}
+        with tracing.span("room lookup"):
+            # Locked until commit, so concurrent batches for the same rooms queue up
+            rooms = db.query(Room).filter(Room.id.in_(room_ids)).order_by(Room.id).with_for_update().all()
+            self.rooms = {r.id: r for r in rooms}
+        with tracing.span("overlap fetch"):
+            overlapping = db.query(Booking.room_id, Booking.check_in_date, Booking.check_out_date).filter(
+                Booking.room_id.in_(room_ids),
+                Booking.status.notin_(RELEASED_STATUSES),
+                Booking.check_in_date <= max(check_outs),
+                Booking.check_out_date >= min(check_ins),
+            )
+            for room_id, check_in_date, check_out_date in overlapping:
+                self.stays[room_id].append((check_in_date, check_out_date))
+        with tracing.span("hold fetch"):
+            # Another guest's unexpired hold blocks the dates like a booking
+            for room_id, check_in_date, check_out_date in room_hold.get_overlapping(
+                db, room_ids=room_ids, check_in_date=min(check_ins), check_out_date=max(check_outs)
+            ):
+                self.stays[room_id].append((check_in_date, check_out_date))
+        room_types = {r.type for r in rooms} | {item.room_type for item in self.items if item.room_type}
+        with tracing.span("inventory fetch"):
+            start, end = min(check_ins), max(check_outs)
+            for room_type in room_types:
+                inventory.ensure(db, room_type, start, end)
+            rows = db.query(RoomInventory).filter(
+                RoomInventory.room_type.in_(room_types),
+                RoomInventory.night >= start,
+                RoomInventory.night <= end,
+            ).order_by(RoomInventory.id).with_for_update()
+            self.free = {
+                (row.room_type, row.night): row.total - row.sold - row.held - row.allotted for row in rows
+            }
+        if self.allotment is not None:
+            with tracing.span("allotment fetch"):
+                self._load_allotment()
+        with tracing.span("tariff fetch"):
+            tariffs = db.query(RoomTariff).filter(
+                RoomTariff.room_type.in_({room_type.value for room_type in room_types}),
+                RoomTariff.start_date <= max(check_ins),
+                RoomTariff.end_date >= min(check_ins),
+            ).order_by(RoomTariff.min_nights.desc())
+            for tariff in tariffs:
+                self.tariffs[tariff.room_type].append(tariff)
+
+    def _load_allotment(self) -> None:
+        # Locked until commit, so concurrent pick-ups from the block queue up
+        allotment = self.allotment = (
+            self.db.query(Allotment)
+            .filter(Allotment.id == self.allotment.id)
+            .populate_existing()
+            .with_for_update()
+            .one()
+        )
+        self.allotted = {
+            night: allotment.rooms for night in inventory.days(allotment.start_date, allotment.end_date)
+        }
+        picked_up = self.db.query(Booking.check_in_date, Booking.check_out_date).filter(
+            Booking.allotment_id == allotment.id, Booking.status.notin_(RELEASED_STATUSES)
+        )
+        for check_in_date, check_out_date in picked_up:
+            for night in inventory.days(check_in_date, check_out_date):
+                if night in self.allotted:
+                    self.allotted[night] -= 1
+
+    def _tariffs_for(self, room_type: str, check_in_date: date) -> List[RoomTariff]:
+        key = (room_type, check_in_date)
+        if key not in self._candidates:
+            self._candidates[key] = [
+                t for t in self.tariffs[room_type] if t.start_date <= check_in_date <= t.end_date
+            ]
+        return self._candidates[key]
+
+    def check(self, item: BookingCreate) -> Booking:
+        """Validate one item against the batch data; returns the (unsaved) booking."""
+        if item.guest_id not in self.guest_ids:
+            raise BatchItemError("Guest not found", 404)
+        room_type = item.room_type
+        if item.room_id is not None:
+            room = self.rooms.get(item.room_id)
+            if room is None:
+                raise BatchItemError("Room not found", 404)
+            if not room.is_available:
+                raise BatchItemError("Room is not available")
+            if room_type is not None and room_type != room.type:
+                raise BatchItemError(f"Room {room.number} is not a {room_type.value} room")
+            if item.party_size and room.capacity and item.party_size > room.capacity:
+                raise BatchItemError(f"Room {room.number} sleeps at most {room.capacity}")
+            room_type = room.type
+        if item.check_out_date <= item.check_in_date:
+            raise BatchItemError("Check-out date must be after check-in date")
+        if item.room_id is not None:
+            for check_in_date, check_out_date in self.stays[item.room_id]:
+                if stays_overlap(item.check_in_date, item.check_out_date, check_in_date, check_out_date):
+                    raise BatchItemError("Room is already booked for these dates")
+        if self.allotment is not None:
+            self._check_allotment(item)
+        else:
+            for night in inventory.days(item.check_in_date, item.check_out_date):
+                if self.free.get((room_type, night), 0) <= 0:
+                    raise BatchItemError(f"No {room_type.value} rooms left for these dates")
+
+        nights = (item.check_out_date - item.check_in_date).days
+        tariffs = self._tariffs_for(room_type.value, item.check_in_date)
+        if not tariffs:
+            metrics.PRICING_FAILURES.labels("no_tariff_for_date").inc()
+            raise BatchItemError("No tariff found for this room type and date")
+        tariff = select_tariff(tariffs, nights)
+        if tariff is None:
+            metrics.PRICING_FAILURES.labels("no_tariff_for_length_of_stay").inc()
+            raise BatchItemError(f"No tariff found for {nights} nights stay")
+
+        return Booking(
+            **item.model_dump(exclude={"total_price", "room_type"}),
+            room_type=room_type,
+            total_price=price_stay(tariff, item.check_in_date, item.check_out_date),
+            allotment_id=self.allotment.id if self.allotment is not None else None,
+        )
+
+    def _check_allotment(self, item: BookingCreate) -> None:
+        allotment = self.allotment
+        if allotment.released_at is not None:
+            raise BatchItemError("Allotment has been released")
+        if item.check_in_date < allotment.start_date or item.check_out_date > allotment.end_date:
+            raise BatchItemError("Stay is outside the allotment dates")
+        for night in inventory.days(item.check_in_date, item.check_out_date):
+            if self.allotted[night] <= 0:
+                raise BatchItemError("No rooms left in the allotment for these dates")
+
+    def accept(self, booking: Booking) -> None:
+        """Make an accepted booking visible to the items after it."""
+        for night in inventory.days(booking.check_in_date, booking.check_out_date):
+            if self.allotment is not None:
+                self.allotted[night] -= 1
+            else:
+                self.free[(booking.room_type, night)] -= 1
+        if booking.room_id is not None:
+            room = self.rooms[booking.room_id]
+            self.stays[room.id].append((booking.check_in_date, booking.check_out_date))
+            room.is_available = False
+
+def create_bookings(
+    db: Session, items: List[BookingCreate], all_or_nothing: bool = True, allotment: Optional[Allotment] = None,
+) -> Tuple[List[dict], List[Booking]]:
+    """
+    Validate and insert `items` in one transaction, picked up from
+    `allotment` if given (the items must be of its room type).
+
+    Returns per-item results (index, status, error) and the created bookings,
+    reloaded with guest and room. With all_or_nothing, one failed item means
+    nothing is written and the valid items are reported as "skipped".
+    """
+    batch = BookingBatch(db, items, allotment)
+    batch.load()
+
+    results: List[dict] = []
+    accepted: List[Tuple[int, Booking]] = []
+    with tracing.span("validate", items=len(items)):
+        for index, item in enumerate(items):
+            try:
+                booking = batch.check(item)
+            except BatchItemError as e:
+                results.append({"index": index, "status": "failed", "error": str(e)})
+                continue
+            batch.accept(booking)
+            accepted.append((index, booking))
+            results.append({"index": index, "status": "created"})
+
+    failed = len(items) - len(accepted)
+    if not accepted or (all_or_nothing and failed):
+        db.rollback()
+        for result in results:
+            if result["status"] == "created":
+                result["status"] = "skipped"
+        return results, []
+
+    with tracing.span("inventory", rows=len(accepted)):
+        # One conditional increment per distinct stay. The rows were locked in
+        # load(), so this only runs short where locking isn't supported (SQLite)
+        stays = Counter((b.room_type, b.check_in_date, b.check_out_date) for _, b in accepted)
+        count_stay = inventory.take if allotment is None else inventory.pick_up
+        try:
+            for (room_type, check_in_date, check_out_date), count in stays.items():
+                count_stay(db, room_type, check_in_date, check_out_date, count=count)
+        except inventory.SoldOut as e:
+            db.rollback()
+            for result in results:
+                if result["status"] == "created":
+                    result.update(status="failed", error=str(e))
+            return results, []
+
+    with tracing.span("insert", rows=len(accepted)):
+        db.add_all(booking for _, booking in accepted)
+        db.flush()
+        ids = {index: booking.id for index, booking in accepted}
+        db.commit()
+    metrics.BOOKINGS_CREATED.inc(len(accepted))
+    logger.info("Batch created %d bookings, %d failed", len(accepted), failed)
+
+    created = {
+        b.id: b
+        for b in db.query(Booking)
+        .options(joinedload(Booking.guest), joinedload(Booking.room))
+        .filter(Booking.id.in_(ids.values()))
+    }
+    for result in results:
+        if result["status"] == "created":
+            result["booking"] = created[ids[result["index"]]]
+    return results, list(created.values())
@@ -0,0 +1,280 @@
+"""
+Booking updates as a single unit of work.
+
+The status transition, its effect on room availability and inventory, the
+remaining field updates and the payment transaction are applied to the
+session and written with one flush and one commit. If anything fails the
+session is rolled back, so a booking is never left half-updated.
+
+modify_booking() changes a booking's dates or room the same way. Only the
+delta is re-checked and repriced: nights the stay already had were free of
+conflicts and are paid for, so overlap checks, inventory and price deal
+with the added and removed nights alone.
+"""
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.crud.hotel import get_booking_tariffs, room as crud_room, room_hold
+from app.models.hotel import (
+    RELEASED_STATUSES, Booking, BookingChange, BookingStatus, FinancialTransaction, Room, RoomType,
+)
+from app.schemas.hotel import BookingModify, BookingUpdate
+from app.services import allotments, inventory
+from app.services.pricing import find_overlapping_booking, nights, price_nights, price_stay, select_tariff
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_CATEGORY = "оплата_бронирования"
+
+# Room availability after a booking moves to this status
+ROOM_AVAILABILITY = {
+    BookingStatus.cancelled: True,
+    BookingStatus.checked_in: False,
+    BookingStatus.checked_out: True,
+    BookingStatus.no_show: True,
+}
+
+def _add_payment(db: Session, booking: Booking) -> None:
+    existing_transaction = db.query(FinancialTransaction.id).filter(
+        FinancialTransaction.booking_id == booking.id,
+        FinancialTransaction.transaction_type == "income",
+        FinancialTransaction.category == PAYMENT_CATEGORY,
+    ).first()
+    if existing_transaction:
+        return
+    db.add(FinancialTransaction(
+        booking_id=booking.id,
+        amount=booking.total_price,
+        transaction_type="income",
+        category=PAYMENT_CATEGORY,
+        description=f"Оплата за бронирование #{booking.id}",
+        payment_method="cash",
+        transaction_date=date.today(),
+    ))
+
+def _release_nights(db: Session, booking: Booking) -> None:
+    if allotments.is_open(booking.allotment):
+        inventory.put_back(db, booking.room_type, booking.check_in_date, booking.check_out_date)
+    else:
+        inventory.release(db, booking.room_type, booking.check_in_date, booking.check_out_date)
+
+def _take_nights(db: Session, booking: Booking) -> None:
+    if allotments.is_open(booking.allotment):
+        if allotments.rooms_left(db, booking.allotment, booking.check_in_date, booking.check_out_date) <= 0:
+            raise inventory.SoldOut("No rooms left in the allotment for these dates")
+        inventory.pick_up(db, booking.room_type, booking.check_in_date, booking.check_out_date)
+    else:
+        inventory.take(db, booking.room_type, booking.check_in_date, booking.check_out_date)
+
+def update_booking(db: Session, booking: Booking, booking_in: BookingUpdate) -> Booking:
+    """
+    Apply `booking_in` to `booking` (loaded with guest and room) in one
+    transaction and return it.
+    """
+    booking_id = booking.id
+    update_data = booking_in.model_dump(exclude_unset=True)
+    try:
+        new_status = update_data.pop("status", None)
+        if new_status is not None:
+            if new_status in ROOM_AVAILABILITY and booking.room is not None:
+                booking.room.is_available = ROOM_AVAILABILITY[new_status]
+            # Cancelling gives the nights back, to the allotment while it is open;
+            # reinstating takes them again (SoldOut if gone)
+            if new_status in RELEASED_STATUSES and booking.status not in RELEASED_STATUSES:
+                _release_nights(db, booking)
+            elif new_status not in RELEASED_STATUSES and booking.status in RELEASED_STATUSES:
+                _take_nights(db, booking)
+            booking.status = new_status
+        for field, value in update_data.items():
+            setattr(booking, field, value)
+        if update_data.get("payment_status") == "paid":
+            _add_payment(db, booking)
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Booking %s update rolled back", booking_id)
+        raise
+
+    if new_status == BookingStatus.checked_in:
+        metrics.BOOKING_CHECKINS.inc()
+    return booking
+
+class AssignmentError(Exception):
+    pass
+
+def assign_room(db: Session, booking: Booking, room: Room) -> Booking:
+    """
+    Put a booking (usually a type-level one) in a room of its type. The
+    inventory doesn't change: the nights were already sold for the type.
+    A room chosen here is kept by POST /rooms/assign.
+    """
+    if room.type != booking.room_type:
+        raise AssignmentError(f"Room {room.number} is not a {booking.room_type.value} room")
+    if room.archived_at is not None:
+        raise AssignmentError("Room is archived")
+    if booking.party_size and room.capacity and booking.party_size > room.capacity:
+        raise AssignmentError(f"Room {room.number} sleeps at most {room.capacity}")
+    others = [b for b in db.query(Booking).filter(Booking.room_id == room.id) if b.id != booking.id]
+    if find_overlapping_booking(others, booking.check_in_date, booking.check_out_date) or room_hold.get_overlapping(
+        db, room_ids=[room.id], check_in_date=booking.check_in_date, check_out_date=booking.check_out_date,
+    ):
+        raise AssignmentError("Room is already booked for these dates")
+    old_room = booking.room
+    booking.room = room
+    booking.auto_assigned = False
+    if booking.status not in RELEASED_STATUSES:
+        room.is_available = False
+    if old_room is not None and old_room.id != room.id:
+        crud_room.refresh_availability(db, rooms=[old_room])
+    db.commit()
+    logger.info("Booking %s assigned to room %s", booking.id, room.number)
+    return booking
+
+class ModificationError(Exception):
+    pass
+
+MODIFIABLE_STATUSES = (BookingStatus.pending, BookingStatus.confirmed, BookingStatus.checked_in)
+
+def _added_days(booking: Booking, check_in_date: date, check_out_date: date) -> List[Tuple[date, date]]:
+    """
+    The (first, last) day ranges the new stay covers and the old one didn't,
+    inclusive like the overlap rule: the check-out day counts. At most one
+    before the old stay and one after it.
+    """
+    added = []
+    if check_in_date < booking.check_in_date:
+        added.append((check_in_date, min(booking.check_in_date - timedelta(days=1), check_out_date)))
+    if check_out_date > booking.check_out_date:
+        added.append((max(booking.check_out_date + timedelta(days=1), check_in_date), check_out_date))
+    return added
+
+def _check_room(db: Session, booking: Booking, room: Room, days: List[Tuple[date, date]]) -> None:
+    """Check nothing else has `room` on the day ranges, the booking itself aside."""
+    for first, last in days:
+        conflict = db.query(Booking.id).filter(
+            Booking.room_id == room.id,
+            Booking.id != booking.id,
+            Booking.status.notin_(RELEASED_STATUSES),
+            Booking.check_in_date <= last,
+            Booking.check_out_date >= first,
+        ).first()
+        if conflict or room_hold.get_overlapping(db, room_ids=[room.id], check_in_date=first, check_out_date=last):
+            raise ModificationError(f"Room {room.number} is already booked for these dates")
+
+def _reprice(
+    db: Session, booking: Booking, room_type: RoomType, check_in_date: date, check_out_date: date,
+    old_nights: set, new_nights: set,
+) -> float:
+    """
+    New total for the stay. While the stay keeps the tariff it was priced
+    with, only the added and removed nights are priced; a different room
+    type, season or length-of-stay tariff reprices the whole stay.
+    """
+    tariff = select_tariff(get_booking_tariffs(db, room_type, check_in_date), len(new_nights))
+    if tariff is None:
+        raise ModificationError(f"No tariff found for {len(new_nights)} nights stay")
+    if booking.total_price is not None and room_type == booking.room_type:
+        if check_in_date == booking.check_in_date and len(new_nights) == len(old_nights):
+            old_tariff = tariff
+        else:
+            old_tariff = select_tariff(
+                get_booking_tariffs(db, booking.room_type, booking.check_in_date), len(old_nights)
+            )
+        if old_tariff is not None and old_tariff.id == tariff.id:
+            return round(
+                booking.total_price - price_nights(tariff, old_nights - new_nights)
+                + price_nights(tariff, new_nights - old_nights),
+                2,
+            )
+    return price_stay(tariff, check_in_date, check_out_date)
+
+def modify_booking(
+    db: Session, booking: Booking, modify_in: BookingModify, room: Optional[Room] = None,
+    changed_by: Optional[int] = None,
+) -> Booking:
+    """
+    Move `booking` (loaded with guest and room) to new dates and/or `room`,
+    reprice it, adjust the inventory and record a BookingChange, all in one
+    transaction. Raises ModificationError, or SoldOut if the inventory has
+    no room for the added nights.
+    """
+    check_in_date = modify_in.check_in_date or booking.check_in_date
+    check_out_date = modify_in.check_out_date or booking.check_out_date
+    old_room = booking.room
+    room = room or old_room
+    if check_out_date <= check_in_date:
+        raise ModificationError("check_out_date must be after check_in_date")
+    if booking.status not in MODIFIABLE_STATUSES:
+        raise ModificationError(f"A {booking.status.value} booking can't be modified")
+    if booking.status == BookingStatus.checked_in and check_in_date != booking.check_in_date:
+        raise ModificationError("The guest has checked in; the check-in date can't change")
+    moved = room is not None and (old_room is None or room.id != old_room.id)
+    if (check_in_date, check_out_date) == (booking.check_in_date, booking.check_out_date) and not moved:
+        raise ModificationError("The booking already has these dates and room")
+    room_type = room.type if room is not None else booking.room_type
+    if moved:
+        if room.archived_at is not None:
+            raise ModificationError("Room is archived")
+        if booking.party_size and room.capacity and booking.party_size > room.capacity:
+            raise ModificationError(f"Room {room.number} sleeps at most {room.capacity}")
+    picked_up = allotments.is_open(booking.allotment)
+    if picked_up:
+        if room_type != booking.room_type:
+            raise ModificationError(f"Allotment bookings must stay in a {booking.room_type.value} room")
+        if check_in_date < booking.allotment.start_date or check_out_date > booking.allotment.end_date:
+            raise ModificationError("Stay is outside the allotment dates")
+
+    # A room the booking already had was free on the days it kept
+    if room is not None:
+        _check_room(
+            db, booking, room,
+            [(check_in_date, check_out_date)] if moved else _added_days(booking, check_in_date, check_out_date),
+        )
+    old_nights = set(nights(booking.check_in_date, booking.check_out_date))
+    new_nights = set(nights(check_in_date, check_out_date))
+    total_price = _reprice(db, booking, room_type, check_in_date, check_out_date, old_nights, new_nights)
+    change = BookingChange(
+        booking_id=booking.id, changed_by=changed_by, reason=modify_in.reason,
+        old_check_in_date=booking.check_in_date, old_check_out_date=booking.check_out_date,
+        new_check_in_date=check_in_date, new_check_out_date=check_out_date,
+        old_room_id=booking.room_id, new_room_id=room.id if room is not None else None,
+        old_total_price=booking.total_price, new_total_price=total_price,
+    )
+    booking_id = booking.id
+    try:
+        if room_type != booking.room_type:
+            inventory.release(db, booking.room_type, booking.check_in_date, booking.check_out_date)
+            inventory.take(db, room_type, check_in_date, check_out_date)
+        else:
+            inventory.move(
+                db, room_type, booking.check_in_date, booking.check_out_date, check_in_date, check_out_date,
+                picked_up=picked_up,
+            )
+        booking.check_in_date, booking.check_out_date = check_in_date, check_out_date
+        booking.room_type = room_type
+        booking.total_price = total_price
+        if moved:
+            booking.room = room
+            booking.auto_assigned = False
+            room.is_available = False
+            crud_room.refresh_availability(db, rooms=[old_room])
+        db.add(change)
+        db.flush()
+        # The inventory only knows the room type has allotted rooms; the block must have them
+        if picked_up and allotments.rooms_left(db, booking.allotment, check_in_date, check_out_date) < 0:
+            raise inventory.SoldOut("No rooms left in the allotment for these dates")
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("Booking %s modification rolled back", booking_id)
+        raise
+    logger.info(
+        "Booking %s moved from %s-%s to %s-%s, room %s to %s, price %s to %s", booking_id,
+        change.old_check_in_date, change.old_check_out_date, check_in_date, check_out_date,
+        change.old_room_id, change.new_room_id, change.old_total_price, total_price,
+    )
+    return booking
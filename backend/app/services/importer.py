@@ -0,0 +1,224 @@
+"""
+Bulk import of guests, rooms and tariffs from CSV or NDJSON.
+
+Rows are read lazily and processed in chunks of IMPORT_CHUNK_SIZE: each chunk
+is validated against the create schema, checked for duplicate keys within the
+file and against the database (one query per chunk), then inserted with one
+multi-row INSERT and committed. Rows that fail are reported individually and
+don't stop the rest of the import.
+"""
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple, Type
+import csv
+import json
+import logging
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.hotel import Guest, Room, RoomTariff, RoomType
+from app.schemas.hotel import GuestCreate, RoomCreate, RoomTariffCreate
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "ndjson")
+
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/json-lines": "ndjson",
+}
+
+# (row number, parsed fields or None, parse error or None)
+RawRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+def detect_format(explicit: Optional[str] = None, content_type: Optional[str] = None,
+                  filename: Optional[str] = None) -> Optional[str]:
+    if explicit:
+        return explicit.lower() if explicit.lower() in FORMATS else None
+    if content_type:
+        fmt = CONTENT_TYPES.get(content_type.split(";", 1)[0].strip().lower())
+        if fmt:
+            return fmt
+    if filename:
+        extension = filename.rsplit(".", 1)[-1].lower()
+        return {"csv": "csv", "ndjson": "ndjson", "jsonl": "ndjson"}.get(extension)
+    return None
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[RawRow]:
+    """Yield rows numbered by their line in the file (CSV data starts at 2)."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for fields in reader:
+            # Empty cells mean "not given", so optional fields fall back to their defaults
+            yield reader.line_num, {k: v for k, v in fields.items() if k is not None and v != ""}, None
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(fields, dict):
+            yield line_number, None, "expected a JSON object"
+            continue
+        yield line_number, fields, None
+
+def validation_messages(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in error.errors()
+    ]
+
+class Importer:
+    """Validates, de-duplicates and inserts rows of one model."""
+
+    def __init__(self, model, schema: Type[BaseModel], key_fields: Tuple[str, ...]):
+        self.model = model
+        self.schema = schema
+        self.key_fields = key_fields
+
+    def key(self, obj: BaseModel) -> tuple:
+        return tuple(getattr(obj, field) for field in self.key_fields)
+
+    def check(self, obj: BaseModel) -> Optional[str]:
+        """Extra validation beyond the schema; returns an error message."""
+        return None
+
+    def to_values(self, db: Session, obj: BaseModel) -> Dict[str, Any]:
+        return obj.model_dump()
+
+    def prepare(self, db: Session) -> None:
+        """Called once before the first chunk."""
+
+    def existing_keys(self, db: Session, keys: Iterable[tuple]) -> Set[tuple]:
+        keys = list(keys)
+        if not keys:
+            return set()
+        columns = [getattr(self.model, field) for field in self.key_fields]
+        if len(columns) == 1:
+            query = select(columns[0]).where(columns[0].in_([k[0] for k in keys]))
+        else:
+            query = select(*columns).where(tuple_(*columns).in_(keys))
+        return {tuple(row) for row in db.execute(query)}
+
+    def run(self, db: Session, rows: Iterable[RawRow], chunk_size: Optional[int] = None) -> Dict[str, Any]:
+        chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        report = {"total": 0, "inserted": 0, "failed": 0, "errors": []}
+        seen: Set[tuple] = set()
+        self.prepare(db)
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            report["total"] += len(chunk)
+            self._import_chunk(db, chunk, seen, report)
+        report["errors"].sort(key=lambda e: e["row"])
+        report["failed"] = len(report["errors"])
+        logger.info(
+            "Imported %s: %d inserted, %d failed of %d rows",
+            self.model.__tablename__, report["inserted"], report["failed"], report["total"],
+        )
+        return report
+
+    def _import_chunk(self, db: Session, chunk: List[RawRow], seen: Set[tuple], report: Dict[str, Any]) -> None:
+        errors = report["errors"]
+        valid: List[Tuple[int, tuple, BaseModel]] = []
+        for row_number, fields, parse_error in chunk:
+            if parse_error:
+                errors.append({"row": row_number, "key": None, "errors": [parse_error]})
+                continue
+            try:
+                obj = self.schema.model_validate(fields)
+            except ValidationError as e:
+                errors.append({"row": row_number, "key": None, "errors": validation_messages(e)})
+                continue
+            key = self.key(obj)
+            message = self.check(obj)
+            if message is None and key in seen:
+                message = "duplicate of an earlier row in this file"
+            if message:
+                errors.append({"row": row_number, "key": self._format_key(key), "errors": [message]})
+                continue
+            seen.add(key)
+            valid.append((row_number, key, obj))
+
+        existing = self.existing_keys(db, (key for _, key, _ in valid))
+        values = []
+        inserted_rows = []
+        for row_number, key, obj in valid:
+            if key in existing:
+                errors.append({"row": row_number, "key": self._format_key(key), "errors": ["already exists"]})
+                continue
+            try:
+                values.append(self.to_values(db, obj))
+            except ValueError as e:
+                errors.append({"row": row_number, "key": self._format_key(key), "errors": [str(e)]})
+                continue
+            inserted_rows.append((row_number, key))
+        if not values:
+            return
+
+        try:
+            db.execute(insert(self.model), values)
+            db.commit()
+        except SQLAlchemyError as e:
+            # e.g. a concurrent insert of the same key; the chunk is rolled back as a whole
+            db.rollback()
+            logger.warning("Import chunk of %s failed: %s", self.model.__tablename__, e)
+            message = f"chunk rolled back: {type(e).__name__}"
+            errors.extend(
+                {"row": row_number, "key": self._format_key(key), "errors": [message]}
+                for row_number, key in inserted_rows
+            )
+            return
+        report["inserted"] += len(values)
+
+    @staticmethod
+    def _format_key(key: tuple) -> str:
+        return "/".join(str(part) for part in key)
+
+class TariffImporter(Importer):
+    """Tariffs are keyed by room type, minimum stay and period; room_id is the type's first room."""
+
+    def __init__(self):
+        super().__init__(RoomTariff, RoomTariffCreate, ("room_type", "min_nights", "start_date", "end_date"))
+        self.room_for_type: Dict[str, int] = {}
+
+    def prepare(self, db: Session) -> None:
+        self.room_for_type = {
+            room_type.value if isinstance(room_type, RoomType) else room_type: room_id
+            for room_type, room_id in db.execute(select(Room.type, func.min(Room.id)).group_by(Room.type))
+        }
+
+    def check(self, obj: RoomTariffCreate) -> Optional[str]:
+        if obj.room_type not in [rt.value for rt in RoomType]:
+            return "Invalid room type"
+        if obj.start_date >= obj.end_date:
+            return "Start date must be before end date"
+        return None
+
+    def to_values(self, db: Session, obj: RoomTariffCreate) -> Dict[str, Any]:
+        room_id = self.room_for_type.get(obj.room_type)
+        if room_id is None:
+            raise ValueError(f"No room of type {obj.room_type}")
+        return {**obj.model_dump(), "room_id": room_id}
+
+IMPORTERS = {
+    "guests": lambda: Importer(Guest, GuestCreate, ("email",)),
+    "rooms": lambda: Importer(Room, RoomCreate, ("number",)),
+    "tariffs": TariffImporter,
+}
+
+def get_importer(kind: str) -> Importer:
+    """A fresh importer for one run; importers may hold per-run lookups."""
+    return IMPORTERS[kind]()
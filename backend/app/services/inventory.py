@@ -0,0 +1,299 @@
+"""
+Room inventory per type and night, for type-level availability without
+scanning bookings.
+
+A row (room_type, night) holds total, sold, held and allotted. A stay
+counts on every day from check-in to check-out, both included: the overlap
+rule (pricing.stays_overlap) keeps a room busy on its check-out day, so the
+inventory does too, and never sells more than the rooms can hold. Bookings,
+holds and allotments change it with conditional increments in their own
+transaction:
+
+    UPDATE inventory SET sold = sold + n
+    WHERE room_type = ? AND night >= check_in AND night <= check_out
+      AND sold + held + allotted + n <= total
+
+If fewer rows than days were updated, some day is full: take() raises
+SoldOut and the caller rolls back. The database re-checks the condition
+under the row lock, so concurrent bookings can't oversell.
+
+Rows are created on first use, with their counts taken from rooms, bookings
+holds and allotments. recount() recomputes rows from the same queries.
+Set-based changes (night audit, bulk delete, import, allotment release) use
+it, and it also repairs drift.
+
+held counts every hold row, expired or not: the reaper releases a hold's
+days when it deletes the row, so a recount that dropped expired holds
+first would see them released twice.
+
+A booking picked up from an allotment moves its days from allotted to
+sold (pick_up(); put_back() undoes it), so the block never counts twice.
+"""
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+import logging
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.hotel import RELEASED_STATUSES, Allotment, Booking, Room, RoomHold, RoomInventory, RoomType
+
+logger = logging.getLogger(__name__)
+
+class SoldOut(Exception):
+    pass
+
+def days(check_in_date: date, check_out_date: date) -> List[date]:
+    """The rows a stay counts in: check-in to check-out, both included."""
+    return [check_in_date + timedelta(days=i) for i in range((check_out_date - check_in_date).days + 1)]
+
+def _total(room_type: Any):
+    return (
+        select(func.count(Room.id))
+        .where(Room.type == room_type, Room.archived_at.is_(None))
+        .scalar_subquery()
+    )
+
+def _sold(room_type: Any, night: Any):
+    return (
+        select(func.count(Booking.id))
+        .where(
+            Booking.room_type == room_type,
+            Booking.status.notin_(RELEASED_STATUSES),
+            Booking.check_in_date <= night,
+            Booking.check_out_date >= night,
+        )
+        .scalar_subquery()
+    )
+
+def _held(room_type: Any, night: Any):
+    return (
+        select(func.count(RoomHold.id))
+        .join(Room, Room.id == RoomHold.room_id)
+        .where(
+            Room.type == room_type,
+            RoomHold.check_in_date <= night,
+            RoomHold.check_out_date >= night,
+        )
+        .scalar_subquery()
+    )
+
+def _allotted(room_type: Any, night: Any):
+    blocks = (
+        select(func.coalesce(func.sum(Allotment.rooms), 0))
+        .where(
+            Allotment.room_type == room_type,
+            Allotment.released_at.is_(None),
+            Allotment.start_date <= night,
+            Allotment.end_date >= night,
+        )
+        .scalar_subquery()
+    )
+    picked_up = (
+        select(func.count(Booking.id))
+        .join(Allotment, Allotment.id == Booking.allotment_id)
+        .where(
+            Allotment.room_type == room_type,
+            Allotment.released_at.is_(None),
+            Booking.status.notin_(RELEASED_STATUSES),
+            Booking.check_in_date <= night,
+            Booking.check_out_date >= night,
+        )
+        .scalar_subquery()
+    )
+    return blocks - picked_up
+
+def _days_of(room_type: RoomType, check_in_date: date, check_out_date: date) -> List[Any]:
+    return [
+        RoomInventory.room_type == room_type,
+        RoomInventory.night >= check_in_date,
+        RoomInventory.night <= check_out_date,
+    ]
+
+def ensure(db: Session, room_type: RoomType, check_in_date: date, check_out_date: date) -> None:
+    """Create the missing rows for the days of the stay."""
+    existing = set(db.scalars(
+        select(RoomInventory.night).where(*_days_of(room_type, check_in_date, check_out_date))
+    ))
+    missing = [night for night in days(check_in_date, check_out_date) if night not in existing]
+    if not missing:
+        return
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    now = datetime.utcnow()
+    db.execute(
+        dialect.insert(RoomInventory)
+        .values([
+            {
+                "room_type": room_type, "night": night, "total": _total(room_type),
+                "sold": _sold(room_type, night), "held": _held(room_type, night),
+                "allotted": _allotted(room_type, night),
+                "created_at": now, "updated_at": now,
+            }
+            for night in missing
+        ])
+        # A concurrent request created them first; its counts are as good as ours
+        .on_conflict_do_nothing(index_elements=["room_type", "night"])
+    )
+
+def _column(held: bool, allotted: bool):
+    if allotted:
+        return RoomInventory.allotted
+    return RoomInventory.held if held else RoomInventory.sold
+
+def take(
+    db: Session, room_type: RoomType, check_in_date: date, check_out_date: date, *,
+    count: int = 1, held: bool = False, allotted: bool = False,
+) -> None:
+    """
+    Count `count` more rooms of `room_type` as sold (or held, or allotted)
+    on every day of the stay. Raises SoldOut if a day has no room left;
+    the caller must roll back, as the other days may already have been
+    counted.
+
+    Call it before the booking or hold row is written: rows created here
+    already count whatever is in the database.
+    """
+    ensure(db, room_type, check_in_date, check_out_date)
+    column = _column(held, allotted)
+    result = db.execute(
+        update(RoomInventory)
+        .where(
+            *_days_of(room_type, check_in_date, check_out_date),
+            RoomInventory.sold + RoomInventory.held + RoomInventory.allotted + count <= RoomInventory.total,
+        )
+        .values({column: column + count})
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(days(check_in_date, check_out_date)):
+        raise SoldOut(f"No {room_type.value} rooms left for these dates")
+
+def release(
+    db: Session, room_type: RoomType, check_in_date: date, check_out_date: date, *,
+    count: int = 1, held: bool = False, allotted: bool = False,
+) -> None:
+    """Undo take(); days without a row had nothing counted yet."""
+    column = _column(held, allotted)
+    db.execute(
+        update(RoomInventory)
+        .where(*_days_of(room_type, check_in_date, check_out_date), column >= count)
+        .values({column: column - count})
+        .execution_options(synchronize_session=False)
+    )
+
+def pick_up(
+    db: Session, room_type: RoomType, check_in_date: date, check_out_date: date, *, count: int = 1,
+) -> None:
+    """
+    Turn `count` allotted rooms into sold ones on every day of the stay.
+    Raises SoldOut if a day has fewer allotted rooms left. Whether they
+    are left in the right allotment is for the caller to check.
+    """
+    result = db.execute(
+        update(RoomInventory)
+        .where(*_days_of(room_type, check_in_date, check_out_date), RoomInventory.allotted >= count)
+        .values(allotted=RoomInventory.allotted - count, sold=RoomInventory.sold + count)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount < len(days(check_in_date, check_out_date)):
+        raise SoldOut("No rooms left in the allotment for these dates")
+
+def put_back(
+    db: Session, room_type: RoomType, check_in_date: date, check_out_date: date, *, count: int = 1,
+) -> None:
+    """Undo pick_up(), e.g. when a booking from an unreleased allotment is cancelled."""
+    db.execute(
+        update(RoomInventory)
+        .where(*_days_of(room_type, check_in_date, check_out_date), RoomInventory.sold >= count)
+        .values(allotted=RoomInventory.allotted + count, sold=RoomInventory.sold - count)
+        .execution_options(synchronize_session=False)
+    )
+
+def move(
+    db: Session, room_type: RoomType, check_in_date: date, check_out_date: date,
+    new_check_in_date: date, new_check_out_date: date, *, picked_up: bool = False,
+) -> None:
+    """
+    Move a sold stay to new dates, touching only the days that change.
+    Raises SoldOut like take(). With picked_up the days go back to and
+    come from the allotted rooms instead (put_back() and pick_up()).
+    """
+    old, new = set(days(check_in_date, check_out_date)), set(days(new_check_in_date, new_check_out_date))
+    for start, end in _ranges(sorted(old - new)):
+        (put_back if picked_up else release)(db, room_type, start, end)
+    for start, end in _ranges(sorted(new - old)):
+        (pick_up if picked_up else take)(db, room_type, start, end)
+
+def _ranges(sorted_days: List[date]) -> Iterable[tuple]:
+    """Consecutive days as (first, last) ranges, both included like a stay's."""
+    start = previous = None
+    for day in sorted_days:
+        if start is None:
+            start = day
+        elif day != previous + timedelta(days=1):
+            yield start, previous
+            start = day
+        previous = day
+    if start is not None:
+        yield start, previous
+
+def recount(
+    db: Session, *, room_types: Optional[Iterable[RoomType]] = None,
+    start: Optional[date] = None, end: Optional[date] = None,
+) -> int:
+    """
+    Recompute the existing rows from rooms, bookings, holds and allotments,
+    optionally only for `room_types` and days in [start, end], both included
+    like a stay's. Returns the rows updated; doesn't commit.
+    """
+    where = []
+    if room_types is not None:
+        where.append(RoomInventory.room_type.in_(list(room_types)))
+    if start is not None:
+        where.append(RoomInventory.night >= start)
+    if end is not None:
+        where.append(RoomInventory.night <= end)
+    result = db.execute(
+        update(RoomInventory)
+        .where(*where)
+        .values(
+            total=_total(RoomInventory.room_type),
+            sold=_sold(RoomInventory.room_type, RoomInventory.night),
+            held=_held(RoomInventory.room_type, RoomInventory.night),
+            allotted=_allotted(RoomInventory.room_type, RoomInventory.night),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+def refresh_totals(db: Session, room_types: Iterable[RoomType]) -> None:
+    """After rooms are added, archived, deleted or change type. Doesn't commit."""
+    db.execute(
+        update(RoomInventory)
+        .where(RoomInventory.room_type.in_(list(room_types)), RoomInventory.night >= date.today())
+        .values(total=_total(RoomInventory.room_type))
+        .execution_options(synchronize_session=False)
+    )
+
+def availability(
+    db: Session, start: date, end: date, room_types: Optional[Iterable[RoomType]] = None
+) -> List[Dict[str, Any]]:
+    """Every day in [start, end) per room type, creating rows on first use."""
+    room_types = list(room_types or RoomType)
+    for room_type in room_types:
+        ensure(db, room_type, start, end - timedelta(days=1))
+    db.commit()
+    rows = db.execute(
+        select(RoomInventory.room_type, RoomInventory.night, RoomInventory.total,
+               RoomInventory.sold, RoomInventory.held, RoomInventory.allotted)
+        .where(
+            RoomInventory.room_type.in_(room_types),
+            RoomInventory.night >= start,
+            RoomInventory.night < end,
+        )
+        .order_by(RoomInventory.room_type, RoomInventory.night)
+    )
+    return [
+        {**row._asdict(), "available": max(row.total - row.sold - row.held - row.allotted, 0)}
+        for row in rows
+    ]
@@ -0,0 +1,242 @@
+"""
+Night audit: closes a business date.
+
+Each step is a set-based UPDATE, repeated on chunks of NIGHT_AUDIT_CHUNK_SIZE
+rows and committed per chunk. Like any other write it bumps the rows'
+version, so clients holding an older one get 412 on their next PUT:
+
+1. auto check-out: checked-in bookings due out on or before the date
+2. no-shows: pending and confirmed bookings due in on or before the date
+3. room availability: rooms whose is_available flag disagrees with their
+   active bookings (pending, confirmed or checked in) are corrected
+4. inventory: the no-shows' room types are recounted over the days their
+   stays cover, which gives those days back, chunk_size days at a time
+5. allotments: blocks whose release date is on or before the date are
+   released, with their unpicked rooms back on general sale
+
+Then the date's revenue snapshot is written, replacing any earlier one, and
+idempotency keys past their TTL are purged.
+
+A step only selects rows that still need the change, so the job is
+idempotent, and a run that died half way is finished by the next one. Every
+run is logged in night_audit_runs with the rows touched per step and its
+duration.
+
+The audit runs from the CLI (app/scripts/night_audit.py) or from the
+in-process scheduler, enabled with NIGHT_AUDIT_SCHEDULER_ENABLED.
+"""
+from datetime import date, datetime, time as dt_time, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+import logging
+import time
+
+from sqlalchemy import and_, exists, func, not_, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core import idempotency
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.audit import DailyRevenue, NightAuditRun
+from app.models.hotel import ACTIVE_STATUSES, Booking, BookingStatus, FinancialTransaction, Room
+from app.services import allotments, inventory
+
+logger = logging.getLogger(__name__)
+
+OCCUPYING_STATUSES = (BookingStatus.checked_in, BookingStatus.checked_out)
+
+def _update_in_chunks(
+    db: Session, run: NightAuditRun, counter: str, model: Any, where: List[Any], values: Dict[str, Any],
+    chunk_size: int,
+) -> None:
+    """
+    UPDATE at most chunk_size matching rows at a time until none are left,
+    adding the rows touched to `run.<counter>` in the same commit.
+    """
+    while True:
+        ids = select(model.id).where(*where).order_by(model.id).limit(chunk_size)
+        result = db.execute(
+            update(model).where(model.id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+        )
+        setattr(run, counter, getattr(run, counter) + result.rowcount)
+        db.commit()
+        if result.rowcount < chunk_size:
+            return
+
+def _recount_in_chunks(db: Session, spans: List[Any], chunk_size: int) -> int:
+    """
+    Recount each (room_type, first, last) span of inventory days, chunk_size
+    days per commit. Returns the rows updated.
+    """
+    recounted = 0
+    for room_type, first, last in spans:
+        while first <= last:
+            chunk_end = min(first + timedelta(days=chunk_size - 1), last)
+            recounted += inventory.recount(db, room_types=[room_type], start=first, end=chunk_end)
+            db.commit()
+            first = chunk_end + timedelta(days=1)
+    return recounted
+
+def _snapshot_revenue(db: Session, business_date: date) -> DailyRevenue:
+    def total(transaction_type: str) -> float:
+        return db.scalar(
+            select(func.coalesce(func.sum(FinancialTransaction.amount), 0.0)).where(
+                FinancialTransaction.transaction_type == transaction_type,
+                FinancialTransaction.transaction_date == business_date,
+            )
+        )
+
+    # Stays covering the night of business_date
+    stays = db.execute(
+        select(Booking.total_price, Booking.check_in_date, Booking.check_out_date).where(
+            Booking.status.in_(OCCUPYING_STATUSES),
+            Booking.check_in_date <= business_date,
+            Booking.check_out_date > business_date,
+        )
+    ).all()
+    room_revenue = sum(
+        (total_price or 0.0) / (check_out_date - check_in_date).days
+        for total_price, check_in_date, check_out_date in stays
+    )
+
+    db.query(DailyRevenue).filter(DailyRevenue.business_date == business_date).delete(synchronize_session=False)
+    snapshot = DailyRevenue(
+        business_date=business_date,
+        income=total("income"),
+        expenses=total("expense"),
+        room_revenue=round(room_revenue, 2),
+        rooms_occupied=len(stays),
+        rooms_total=db.scalar(select(func.count(Room.id)).where(Room.archived_at.is_(None))),
+    )
+    db.add(snapshot)
+    db.commit()
+    return snapshot
+
+def run_night_audit(
+    db: Session, business_date: date, *, force: bool = False, chunk_size: Optional[int] = None
+) -> NightAuditRun:
+    """
+    Close `business_date`. Unless `force` is set, a date that already has a
+    completed run is skipped and that run is returned.
+    """
+    if not force:
+        completed = (
+            db.query(NightAuditRun)
+            .filter(NightAuditRun.business_date == business_date, NightAuditRun.status == "completed")
+            .first()
+        )
+        if completed:
+            logger.info("Night audit for %s already completed (run %s)", business_date, completed.id)
+            return completed
+
+    chunk_size = chunk_size or settings.NIGHT_AUDIT_CHUNK_SIZE
+    run = NightAuditRun(
+        business_date=business_date, status="running", started_at=datetime.utcnow(),
+        checked_out=0, no_shows=0, rooms_blocked=0, rooms_released=0, allotments_released=0,
+    )
+    db.add(run)
+    db.commit()
+    started = time.perf_counter()
+    try:
+        _update_in_chunks(
+            db, run, "checked_out", Booking,
+            [Booking.status == BookingStatus.checked_in, Booking.check_out_date <= business_date],
+            {"status": BookingStatus.checked_out, "version": Booking.version + 1}, chunk_size,
+        )
+        no_show_where = [
+            Booking.status.in_((BookingStatus.pending, BookingStatus.confirmed)),
+            Booking.check_in_date <= business_date,
+        ]
+        # Also no-shows from a run that died before its recount, while their days still matter
+        recount_spans = db.execute(
+            select(Booking.room_type, func.min(Booking.check_in_date), func.max(Booking.check_out_date))
+            .where(
+                Booking.room_type.isnot(None),
+                or_(
+                    and_(*no_show_where),
+                    and_(Booking.status == BookingStatus.no_show, Booking.check_out_date >= business_date),
+                ),
+            )
+            .group_by(Booking.room_type)
+        ).all()
+        _update_in_chunks(
+            db, run, "no_shows", Booking, no_show_where,
+            {"status": BookingStatus.no_show, "version": Booking.version + 1}, chunk_size,
+        )
+        held = or_(
+            Room.archived_at.isnot(None),
+            exists().where(Booking.room_id == Room.id, Booking.status.in_(ACTIVE_STATUSES)),
+        )
+        _update_in_chunks(
+            db, run, "rooms_blocked", Room,
+            [or_(Room.is_available.is_(None), Room.is_available == True), held],
+            {"is_available": False, "version": Room.version + 1}, chunk_size,
+        )
+        _update_in_chunks(
+            db, run, "rooms_released", Room,
+            [or_(Room.is_available.is_(None), Room.is_available == False), not_(held)],
+            {"is_available": True, "version": Room.version + 1}, chunk_size,
+        )
+        recounted = _recount_in_chunks(db, recount_spans, chunk_size)
+        logger.info("Recounted %d inventory rows for %d room types", recounted, len(recount_spans))
+        run.allotments_released = len(allotments.release_due(db, business_date))
+        _snapshot_revenue(db, business_date)
+        logger.info("Purged %d expired idempotency keys", idempotency.purge_expired(db))
+        run.status = "completed"
+    except Exception as e:
+        db.rollback()
+        run.status = "failed"
+        run.error = f"{type(e).__name__}: {e}"
+        logger.exception("Night audit for %s failed", business_date)
+    run.finished_at = datetime.utcnow()
+    run.duration_ms = int((time.perf_counter() - started) * 1000)
+    db.commit()
+    logger.info(
+        "Night audit for %s %s in %d ms: %d checked out, %d no-shows, %d rooms blocked, %d released, "
+        "%d allotments released",
+        business_date, run.status, run.duration_ms, run.checked_out, run.no_shows,
+        run.rooms_blocked, run.rooms_released, run.allotments_released,
+    )
+    return run
+
+def _audit_time() -> dt_time:
+    hours, minutes = settings.NIGHT_AUDIT_TIME.split(":")
+    return dt_time(int(hours), int(minutes))
+
+def _run_for(business_date: date) -> str:
+    db = SessionLocal()
+    try:
+        return run_night_audit(db, business_date).status
+    finally:
+        db.close()
+
+async def night_audit_loop() -> None:
+    """
+    Each day at NIGHT_AUDIT_TIME, close the previous business date. Started
+    after that time, it first catches up on yesterday if it isn't closed yet.
+    """
+    while True:
+        now = datetime.now()
+        due = datetime.combine(now.date(), _audit_time())
+        if now < due:
+            await asyncio.sleep((due - now).total_seconds())
+            continue
+        try:
+            await asyncio.to_thread(_run_for, now.date() - timedelta(days=1))
+        except Exception:
+            logger.exception("Night audit scheduler run failed")
+        await asyncio.sleep((due + timedelta(days=1) - datetime.now()).total_seconds())
+
+_scheduler_task: Optional[asyncio.Task] = None
+
+def start_scheduler() -> None:
+    global _scheduler_task
+    if _scheduler_task is None:
+        logger.info("Night audit scheduled daily at %s", settings.NIGHT_AUDIT_TIME)
+        _scheduler_task = asyncio.get_running_loop().create_task(night_audit_loop())
+
+def stop_scheduler() -> None:
+    global _scheduler_task
+    if _scheduler_task is not None:
+        _scheduler_task.cancel()
+        _scheduler_task = None
@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Sequence
+
+from app.models.hotel import RELEASED_STATUSES, Booking, RoomTariff
+
+WEEKEND_DAYS = (4, 5)  # Friday and Saturday nights
+
+def select_tariff(tariffs: Sequence[RoomTariff], nights: int) -> Optional[RoomTariff]:
+    """
+    Pick the tariff for a stay of `nights` nights.
+    `tariffs` must be ordered by min_nights descending, as returned by
+    crud.get_booking_tariffs.
+    """
+    for tariff in tariffs:
+        if nights >= tariff.min_nights:
+            return tariff
+    return None
+
+def nights(check_in_date: date, check_out_date: date) -> List[date]:
+    """The nights paid for: check-in up to, not including, check-out."""
+    return [check_in_date + timedelta(days=i) for i in range((check_out_date - check_in_date).days)]
+
+def price_stay(tariff: RoomTariff, check_in_date: date, check_out_date: date) -> float:
+    """Total price of a stay: each night at the tariff's weekday or weekend price."""
+    return price_nights(tariff, nights(check_in_date, check_out_date))
+
+def price_nights(tariff: RoomTariff, nights: Iterable[date]) -> float:
+    """Price of the given nights alone, e.g. the ones added to or removed from a stay."""
+    return sum(
+        tariff.weekend_price_per_night
+        if night.weekday() in WEEKEND_DAYS and tariff.weekend_price_per_night is not None
+        else tariff.price_per_night
+        for night in nights
+    )
+
+def stays_overlap(check_in_a: date, check_out_a: date, check_in_b: date, check_out_b: date) -> bool:
+    # Inclusive on both ends: a check-out day can't be another stay's check-in day
+    return check_in_a <= check_out_b and check_out_a >= check_in_b
+
+def find_overlapping_booking(
+    bookings: Iterable[Booking], check_in_date: date, check_out_date: date
+) -> Optional[Booking]:
+    for existing_booking in bookings:
+        if (
+            existing_booking.status not in RELEASED_STATUSES
+            and stays_overlap(
+                check_in_date, check_out_date, existing_booking.check_in_date, existing_booking.check_out_date
+            )
+        ):
+            return existing_booking
+    return None
@@ -0,0 +1,445 @@
+"""
+Room assignment for type-level bookings.
+
+Each room type is solved on its own, as interval scheduling on the rooms'
+timelines. Under the overlap rule of pricing.stays_overlap a room is busy
+from the check-in day through the check-out day, so a stay blocks the days
+[check_in, check_out + 1). The solver works in two passes:
+
+1. greedy: the stays to place are taken by check-in (longest first) and each
+   goes to the room where it creates the fewest orphan nights, then the one
+   it follows most closely (interval partitioning, best fit);
+2. local search: stays next to an orphan gap are relocated or swapped with a
+   stay in another room while that lowers the orphan nights, and stays the
+   greedy pass couldn't place get a room by moving one stay out of the way.
+
+An orphan gap is free time between two stays of a room that is too short to
+sell a stay of `min_nights`; its nights count as orphan nights. Time before
+a room's first stay and after its last one is never an orphan.
+
+Fixed stays never move: bookings whose room was chosen by hand (by the guest
+at booking time or with POST /bookings/{id}/assign), stays that began before
+the window, and room holds. Bookings placed by an earlier run are marked
+auto_assigned and may be moved again. A room only takes a booking whose
+party_size fits its capacity.
+"""
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import time
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.hotel import room as crud_room, room_hold
+from app.models.hotel import RELEASED_STATUSES, Booking, BookingStatus, Room, RoomType
+
+logger = logging.getLogger(__name__)
+
+MOVABLE_STATUSES = (BookingStatus.pending, BookingStatus.confirmed)
+
+@dataclass
+class Stay:
+    id: int
+    start: int  # Ordinal of the check-in day
+    end: int  # Ordinal of the day after check-out: the first day the room is free again
+    party_size: Optional[int] = None
+    room_id: Optional[int] = None  # Current room of a movable stay, if any
+
+@dataclass
+class Plan:
+    assignments: Dict[int, int]  # Stay id -> room id, for every placed movable stay
+    unplaced: List[int]
+    orphan_nights: int
+    greedy_orphan_nights: int
+    greedy_unplaced: int
+    moves: int  # Relocations and swaps made by the local search
+    elapsed_ms: int = 0
+
+def _orphan(gap: int, min_nights: int) -> int:
+    # A stay of n nights needs n + 1 free days
+    return gap if 0 < gap <= min_nights else 0
+
+class _Timeline:
+    """A room's stays, sorted and non-overlapping. stay_id is None for fixed ones."""
+    __slots__ = ("room_id", "capacity", "starts", "items")
+
+    def __init__(self, room_id: int, capacity: Optional[int]):
+        self.room_id = room_id
+        self.capacity = capacity
+        self.starts: List[int] = []
+        self.items: List[Tuple[int, int, Optional[int]]] = []
+
+    def takes(self, stay: Stay) -> bool:
+        return stay.party_size is None or self.capacity is None or stay.party_size <= self.capacity
+
+    def neighbours(self, start: int, end: int) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """(end of the stay before, start of the stay after), or None if [start, end) isn't free."""
+        i = bisect_left(self.starts, end)
+        previous_end = self.items[i - 1][1] if i else None
+        if previous_end is not None and previous_end > start:
+            return None
+        return previous_end, self.starts[i] if i < len(self.starts) else None
+
+    def conflicts(self, start: int, end: int) -> List[Tuple[int, int, Optional[int]]]:
+        i = bisect_left(self.starts, end)
+        found = []
+        while i and self.items[i - 1][1] > start:
+            i -= 1
+            found.append(self.items[i])
+        return found
+
+    def add(self, start: int, end: int, stay_id: Optional[int]) -> None:
+        i = bisect_right(self.starts, start)
+        self.items.insert(i, (start, end, stay_id))
+        self.starts.insert(i, start)
+
+    def remove(self, start: int, stay_id: int) -> None:
+        i = bisect_left(self.starts, start)
+        while self.items[i][2] != stay_id:
+            i += 1
+        del self.items[i]
+        del self.starts[i]
+
+    def orphan_nights(self, min_nights: int) -> int:
+        items = self.items
+        return sum(_orphan(items[i + 1][0] - items[i][1], min_nights) for i in range(len(items) - 1))
+
+def _insert_cost(gaps: Tuple[Optional[int], Optional[int]], start: int, end: int, min_nights: int) -> int:
+    """Orphan nights added by putting [start, end) between the given neighbours."""
+    previous_end, next_start = gaps
+    cost = 0
+    if previous_end is not None:
+        cost += _orphan(start - previous_end, min_nights)
+    if next_start is not None:
+        cost += _orphan(next_start - end, min_nights)
+        if previous_end is not None:
+            cost -= _orphan(next_start - previous_end, min_nights)
+    return cost
+
+class _Solver:
+    def __init__(self, rooms: Sequence[Tuple[int, Optional[int]]], fixed: Iterable[Tuple[int, int, int]],
+                 stays: Sequence[Stay], min_nights: int):
+        self.min_nights = min_nights
+        self.timelines = {room_id: _Timeline(room_id, capacity) for room_id, capacity in rooms}
+        self.order = list(self.timelines.values())
+        self.stays = {stay.id: stay for stay in stays}
+        self.placed: Dict[int, _Timeline] = {}
+        self.ending: Dict[int, List[_Timeline]] = defaultdict(list)  # End day -> rooms with a stay ending then
+        for room_id, start, end in fixed:
+            timeline = self.timelines.get(room_id)
+            if timeline is not None:
+                timeline.add(start, end, None)
+                self.ending[end].append(timeline)
+        self.moves = 0
+
+    # Placement
+
+    def _place(self, stay: Stay, timeline: _Timeline) -> None:
+        timeline.add(stay.start, stay.end, stay.id)
+        self.ending[stay.end].append(timeline)
+        self.placed[stay.id] = timeline
+
+    def _unplace(self, stay: Stay) -> _Timeline:
+        # `ending` may keep a stale entry; candidates are re-checked with neighbours()
+        timeline = self.placed.pop(stay.id)
+        timeline.remove(stay.start, stay.id)
+        return timeline
+
+    def _best_room(self, stay: Stay, candidates: Iterable[_Timeline], best=None):
+        for timeline in candidates:
+            if not timeline.takes(stay):
+                continue
+            gaps = timeline.neighbours(stay.start, stay.end)
+            if gaps is None:
+                continue
+            before = stay.start - gaps[0] if gaps[0] is not None else float("inf")
+            # Between equals, the smallest room that fits keeps larger ones for larger parties
+            spare = (timeline.capacity or 0) - (stay.party_size or 0)
+            key = (_insert_cost(gaps, stay.start, stay.end, self.min_nights), before, spare)
+            if best is None or key < best[0]:
+                best = (key, timeline)
+        return best
+
+    def greedy(self, stays: List[Stay]) -> List[Stay]:
+        """Place `stays`; returns the ones no room could take."""
+        unplaced = []
+        if not stays:
+            return unplaced
+        # Nothing ends before the earliest fixed stay or the first stay placed here
+        horizon = min(min(self.ending, default=stays[0].start), min(stay.start for stay in stays))
+        for stay in sorted(stays, key=lambda s: (s.start, s.start - s.end, s.id)):
+            # Rooms with a stay ending closest before this one come first; stop at
+            # the first day that gives a placement costing no orphan nights
+            best = None
+            for day in range(stay.start, horizon - 1, -1):
+                best = self._best_room(stay, self.ending.get(day, ()), best)
+                if best is not None and best[0][0] <= 0:
+                    break
+            if best is None or best[0][0] > 0:
+                best = self._best_room(stay, self.order, best)
+            if best is None:
+                unplaced.append(stay)
+            else:
+                self._place(stay, best[1])
+        return unplaced
+
+    # Local search
+
+    def orphan_nights(self) -> int:
+        return sum(timeline.orphan_nights(self.min_nights) for timeline in self.order)
+
+    def _orphan_neighbours(self) -> List[Stay]:
+        """Movable stays on either side of an orphan gap."""
+        found = []
+        for timeline in self.order:
+            items = timeline.items
+            for i in range(len(items) - 1):
+                if _orphan(items[i + 1][0] - items[i][1], self.min_nights):
+                    found.extend(self.stays[item[2]] for item in (items[i], items[i + 1]) if item[2] is not None)
+        return list({stay.id: stay for stay in found}.values())
+
+    def _relocate(self, stay: Stay) -> bool:
+        source = self.placed[stay.id]
+        self._unplace(stay)
+        removed = _insert_cost(source.neighbours(stay.start, stay.end), stay.start, stay.end, self.min_nights)
+        best = None
+        for timeline in self.order:
+            if timeline is source or not timeline.takes(stay):
+                continue
+            gaps = timeline.neighbours(stay.start, stay.end)
+            if gaps is None:
+                continue
+            gain = removed - _insert_cost(gaps, stay.start, stay.end, self.min_nights)
+            if gain > 0 and (best is None or gain > best[0]):
+                best = (gain, timeline)
+        self._place(stay, best[1] if best else source)
+        return best is not None
+
+    def _swap(self, stay: Stay) -> bool:
+        source = self.placed[stay.id]
+        for timeline in self.order:
+            if timeline is source or not timeline.takes(stay):
+                continue
+            blocking = timeline.conflicts(stay.start, stay.end)
+            if len(blocking) != 1 or blocking[0][2] is None:
+                continue
+            other = self.stays[blocking[0][2]]
+            if not source.takes(other):
+                continue
+            before = source.orphan_nights(self.min_nights) + timeline.orphan_nights(self.min_nights)
+            self._unplace(stay)
+            self._unplace(other)
+            if source.neighbours(other.start, other.end) is not None:
+                self._place(stay, timeline)
+                self._place(other, source)
+                after = source.orphan_nights(self.min_nights) + timeline.orphan_nights(self.min_nights)
+                if after < before:
+                    return True
+                self._unplace(stay)
+                self._unplace(other)
+            self._place(stay, source)
+            self._place(other, timeline)
+        return False
+
+    def _make_room(self, stay: Stay) -> bool:
+        """Place an unplaced stay by relocating the one stay in its way."""
+        best = self._best_room(stay, self.order)
+        if best is not None:
+            self._place(stay, best[1])
+            return True
+        for timeline in self.order:
+            if not timeline.takes(stay):
+                continue
+            blocking = timeline.conflicts(stay.start, stay.end)
+            if len(blocking) != 1 or blocking[0][2] is None:
+                continue
+            other = self.stays[blocking[0][2]]
+            self._unplace(other)
+            target = self._best_room(other, (t for t in self.order if t is not timeline))
+            if target is not None:
+                self._place(other, target[1])
+                self._place(stay, timeline)
+                return True
+            self._place(other, timeline)
+        return False
+
+    def improve(self, unplaced: List[Stay], max_passes: int, deadline: float) -> List[Stay]:
+        for _ in range(max_passes):
+            improved = False
+            still_unplaced = []
+            for stay in unplaced:
+                if time.perf_counter() < deadline and self._make_room(stay):
+                    self.moves += 1
+                    improved = True
+                else:
+                    still_unplaced.append(stay)
+            unplaced = still_unplaced
+            for stay in self._orphan_neighbours():
+                if time.perf_counter() >= deadline:
+                    return unplaced
+                if stay.id in self.placed and (self._relocate(stay) or self._swap(stay)):
+                    self.moves += 1
+                    improved = True
+            if not improved:
+                break
+        return unplaced
+
+def solve(
+    rooms: Sequence[Tuple[int, Optional[int]]],
+    fixed: Iterable[Tuple[int, int, int]],
+    stays: Sequence[Stay],
+    *,
+    min_nights: int = 1,
+    max_passes: Optional[int] = None,
+    time_limit: Optional[float] = None,
+) -> Plan:
+    """
+    Assign `stays` to `rooms` ((room_id, capacity) pairs) around the `fixed`
+    (room_id, start, end) stays. Movable stays that already have a room keep
+    it as their starting point; the others are placed by the greedy pass.
+    """
+    started = time.perf_counter()
+    max_passes = settings.ROOM_ASSIGNMENT_MAX_PASSES if max_passes is None else max_passes
+    time_limit = settings.ROOM_ASSIGNMENT_TIME_LIMIT_SECONDS if time_limit is None else time_limit
+    solver = _Solver(rooms, fixed, stays, min_nights)
+
+    new = []
+    for stay in stays:
+        timeline = solver.timelines.get(stay.room_id)
+        if timeline is not None and timeline.takes(stay) and timeline.neighbours(stay.start, stay.end) is not None:
+            solver._place(stay, timeline)
+        else:
+            new.append(stay)
+    unplaced = solver.greedy(new)
+    greedy_orphan_nights, greedy_unplaced = solver.orphan_nights(), len(unplaced)
+    unplaced = solver.improve(unplaced, max_passes, started + time_limit)
+
+    return Plan(
+        assignments={stay_id: timeline.room_id for stay_id, timeline in solver.placed.items()},
+        unplaced=sorted(stay.id for stay in unplaced),
+        orphan_nights=solver.orphan_nights(),
+        greedy_orphan_nights=greedy_orphan_nights,
+        greedy_unplaced=greedy_unplaced,
+        moves=solver.moves,
+        elapsed_ms=int((time.perf_counter() - started) * 1000),
+    )
+
+def _blocked(check_in_date: date, check_out_date: date) -> Tuple[int, int]:
+    return check_in_date.toordinal(), check_out_date.toordinal() + 1
+
+def assign_rooms(
+    db: Session,
+    *,
+    start: date,
+    end: date,
+    room_types: Optional[Iterable[RoomType]] = None,
+    min_nights: int = 1,
+    dry_run: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Assign rooms to the pending and confirmed bookings arriving in
+    [start, end) that have none, moving earlier automatic assignments where
+    that strands fewer nights. Rooms and bookings are locked while solving;
+    the changes are committed together unless `dry_run`. Returns a summary
+    per room type.
+    """
+    results = []
+    for room_type in room_types or RoomType:
+        rooms = (
+            db.query(Room)
+            .filter(Room.type == room_type, Room.archived_at.is_(None))
+            .order_by(Room.id)
+            .with_for_update()
+            .all()
+        )
+        movable = (
+            db.query(Booking)
+            .filter(
+                Booking.room_type == room_type,
+                Booking.status.in_(MOVABLE_STATUSES),
+                Booking.archived_at.is_(None),
+                Booking.check_in_date >= start,
+                Booking.check_in_date < end,
+                or_(Booking.room_id.is_(None), Booking.auto_assigned == True),
+            )
+            .order_by(Booking.id)
+            .with_for_update()
+            .all()
+        )
+        summary = {
+            "room_type": room_type, "rooms": len(rooms), "bookings": len(movable), "assigned": 0,
+            "moved": 0, "unassigned": [], "orphan_nights": 0, "greedy_orphan_nights": 0, "assignments": [],
+        }
+        results.append(summary)
+        if not movable or not rooms:
+            summary["unassigned"] = [b.id for b in movable if b.room_id is None]
+            continue
+
+        movable_ids = {b.id for b in movable}
+        first = min(b.check_in_date for b in movable)
+        last = max(b.check_out_date for b in movable)
+        room_ids = [r.id for r in rooms]
+        fixed = [
+            (room_id, *_blocked(check_in_date, check_out_date))
+            for booking_id, room_id, check_in_date, check_out_date in db.query(
+                Booking.id, Booking.room_id, Booking.check_in_date, Booking.check_out_date
+            ).filter(
+                Booking.room_id.in_(room_ids),
+                Booking.status.notin_(RELEASED_STATUSES),
+                Booking.check_in_date <= last,
+                # Older stays are too far back to leave an orphan gap
+                Booking.check_out_date >= first - timedelta(days=min_nights + 1),
+            )
+            if booking_id not in movable_ids
+        ]
+        fixed += [
+            (room_id, *_blocked(check_in_date, check_out_date))
+            for room_id, check_in_date, check_out_date in room_hold.get_overlapping(
+                db, room_ids=room_ids, check_in_date=first, check_out_date=last
+            )
+        ]
+        stays = [
+            Stay(b.id, *_blocked(b.check_in_date, b.check_out_date), party_size=b.party_size, room_id=b.room_id)
+            for b in movable
+        ]
+        plan = solve([(r.id, r.capacity) for r in rooms], fixed, stays, min_nights=min_nights)
+
+        rooms_by_id = {r.id: r for r in rooms}
+        vacated = set()
+        for b in movable:
+            room_id = plan.assignments.get(b.id)
+            if room_id is None or room_id == b.room_id:
+                continue
+            summary["assigned" if b.room_id is None else "moved"] += 1
+            summary["assignments"].append(
+                {"booking_id": b.id, "room_id": room_id, "room_number": rooms_by_id[room_id].number}
+            )
+            if not dry_run:
+                if b.room_id is not None:
+                    vacated.add(b.room_id)
+                b.room_id = room_id
+                b.auto_assigned = True
+                # Like a manual assignment, a room with an active booking isn't available
+                rooms_by_id[room_id].is_available = False
+        # A room a booking moved out of may have nothing left in it
+        crud_room.refresh_availability(db, rooms=[rooms_by_id[room_id] for room_id in vacated])
+        summary.update(
+            unassigned=plan.unplaced,
+            orphan_nights=plan.orphan_nights,
+            greedy_orphan_nights=plan.greedy_orphan_nights,
+        )
+        logger.info(
+            "Room assignment for %s: %d assigned, %d moved, %d left, %d orphan nights (greedy %d) in %d ms",
+            room_type.value, summary["assigned"], summary["moved"], len(plan.unplaced),
+            plan.orphan_nights, plan.greedy_orphan_nights, plan.elapsed_ms,
+        )
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return results
@@ -0,0 +1,140 @@
+"""
+Room holds: a room kept for a guest for a few minutes while they check out.
+
+Placing a hold runs the same checks as POST /bookings (through BookingBatch,
+with the room row locked) and commits straight away, so no transaction or
+lock stays open while the guest types card details. Until it expires the
+hold counts in every overlap check like a booking, and its nights count as
+held in the room type's inventory.
+
+Confirming deletes the hold and creates the booking in one transaction: if
+the booking fails (the tariff is gone, say) the hold is left as it was.
+Expired holds are ignored by the checks and deleted by the reaper every
+ROOM_HOLD_REAP_INTERVAL_SECONDS.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import List, Optional
+import asyncio
+import logging
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.hotel import Booking, Room, RoomHold
+from app.schemas.hotel import BookingCreate, RoomHoldCreate
+from app.services import inventory
+from app.services.booking_batch import BatchItemError, BookingBatch, create_bookings
+
+logger = logging.getLogger(__name__)
+
+class HoldError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+def place_hold(db: Session, hold_in: RoomHoldCreate) -> RoomHold:
+    minutes = hold_in.minutes or settings.ROOM_HOLD_MINUTES
+    if minutes > settings.ROOM_HOLD_MAX_MINUTES:
+        raise HoldError(f"A room can be held for at most {settings.ROOM_HOLD_MAX_MINUTES} minutes")
+    item = BookingCreate(**hold_in.model_dump(exclude={"minutes"}))
+    batch = BookingBatch(db, [item])
+    batch.load()
+    try:
+        quote = batch.check(item)
+    except BatchItemError as e:
+        db.rollback()
+        raise HoldError(str(e), e.status_code)
+    try:
+        inventory.take(db, quote.room_type, item.check_in_date, item.check_out_date, held=True)
+    except inventory.SoldOut as e:
+        db.rollback()
+        raise HoldError(str(e))
+    hold = RoomHold(
+        **item.model_dump(include={"guest_id", "room_id", "check_in_date", "check_out_date", "special_requests"}),
+        total_price=quote.total_price,
+        expires_at=datetime.utcnow() + timedelta(minutes=minutes),
+    )
+    db.add(hold)
+    db.commit()
+    logger.info("Room %s held until %s (hold %s)", hold.room_id, hold.expires_at, hold.id)
+    return hold
+
+def confirm_hold(db: Session, hold_id: int, payment_status: Optional[str] = None) -> Booking:
+    """Turn an unexpired hold into a booking (loaded with guest and room)."""
+    hold = db.scalars(delete(RoomHold).where(RoomHold.id == hold_id).returning(RoomHold)).one_or_none()
+    if hold is None:
+        db.rollback()
+        raise HoldError("Hold not found", 404)
+    if hold.expires_at <= datetime.utcnow():
+        db.rollback()
+        raise HoldError("Hold has expired", 410)
+    _release_held(db, [hold])
+    item = BookingCreate(
+        guest_id=hold.guest_id,
+        room_id=hold.room_id,
+        check_in_date=hold.check_in_date,
+        check_out_date=hold.check_out_date,
+        special_requests=hold.special_requests,
+        payment_status=payment_status,
+    )
+    # The deleted hold no longer blocks its own dates; a failure rolls the delete back
+    results, created = create_bookings(db, [item])
+    if not created:
+        raise HoldError(results[0]["error"], 409)
+    logger.info("Hold %s confirmed as booking %s", hold_id, created[0].id)
+    return created[0]
+
+def release_hold(db: Session, hold_id: int) -> Optional[RoomHold]:
+    hold = db.scalars(delete(RoomHold).where(RoomHold.id == hold_id).returning(RoomHold)).one_or_none()
+    if hold is not None:
+        _release_held(db, [hold])
+    db.commit()
+    return hold
+
+def reap_expired(db: Session) -> int:
+    """Delete expired holds; returns how many were removed."""
+    holds = db.scalars(
+        delete(RoomHold).where(RoomHold.expires_at <= datetime.utcnow()).returning(RoomHold)
+    ).all()
+    _release_held(db, holds)
+    db.commit()
+    return len(holds)
+
+def _release_held(db: Session, holds: List[RoomHold]) -> None:
+    room_types = dict(db.execute(select(Room.id, Room.type).where(Room.id.in_({h.room_id for h in holds}))).all())
+    stays = Counter((room_types[h.room_id], h.check_in_date, h.check_out_date) for h in holds)
+    for (room_type, check_in_date, check_out_date), count in stays.items():
+        inventory.release(db, room_type, check_in_date, check_out_date, count=count, held=True)
+
+def _reap() -> int:
+    db = SessionLocal()
+    try:
+        return reap_expired(db)
+    finally:
+        db.close()
+
+async def reaper_loop() -> None:
+    while True:
+        try:
+            reaped = await asyncio.to_thread(_reap)
+            if reaped:
+                logger.info("Reaped %d expired room holds", reaped)
+        except Exception:
+            logger.exception("Room hold reaper failed")
+        await asyncio.sleep(settings.ROOM_HOLD_REAP_INTERVAL_SECONDS)
+
+_reaper_task: Optional[asyncio.Task] = None
+
+def start_reaper() -> None:
+    global _reaper_task
+    if _reaper_task is None:
+        _reaper_task = asyncio.get_running_loop().create_task(reaper_loop())
+
+def stop_reaper() -> None:
+    global _reaper_task
+    if _reaper_task is not None:
+        _reaper_task.cancel()
+        _reaper_task = None
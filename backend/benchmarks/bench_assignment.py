@@ -0,0 +1,180 @@
+"""
+Room assignment at hotel scale: 500 rooms over 90 days by default.
+
+Generates random type-level demand that the rooms could hold: no day has
+more stays than rooms, counting the check-out day that the overlap rule
+keeps busy. A share of the stays is locked to a random free room, as if the
+guest chose it, and party sizes go up to the largest capacity. The demand
+is solved with room_assignment.solve and with a plain first-fit baseline;
+per room type the stays left unplaced and the orphan nights are printed
+for first fit, the greedy pass and the local search, with the solve time.
+
+With --db the same demand is written to a scratch SQLite database and
+assigned through room_assignment.assign_rooms, so loading, locking and
+committing the bookings are timed too.
+
+Exits non-zero if a room type takes more than --max-seconds, or if the
+solver leaves more stays unplaced or more orphan nights than first fit.
+
+Usage (from backend/):
+    python -m benchmarks.bench_assignment [--rooms 500] [--days 90] [--min-nights 2] [--db]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_assignment.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_db_file}")
+
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.hotel import Booking, BookingStatus, Guest, Room, RoomType
+from app.models.user import User  # noqa: F401 - registers the users table
+from app.services import room_assignment
+from app.services.room_assignment import Stay, _Timeline
+
+CAPACITIES = [2, 2, 2, 3, 4]
+PARTY_SIZES = [1, 2, 2, 2, 3, 4]
+STAY_NIGHTS = [1, 1, 2, 2, 2, 3, 3, 4, 5, 7]
+
+def _demand(rooms, days, occupancy, locked_share, rng):
+    """Stays in the order they were booked; some are locked into a room."""
+    busy = [0] * (days + 1)
+    timelines = [_Timeline(room_id, capacity) for room_id, capacity in rooms]
+    stays, fixed = [], []
+    for stay_id in range(int(len(rooms) * days * occupancy)):
+        nights = rng.choice(STAY_NIGHTS)
+        start = rng.randrange(days - nights + 1)
+        end = start + nights + 1
+        if any(busy[day] >= len(rooms) for day in range(start, end)):
+            continue
+        stay = Stay(stay_id, start, end, party_size=rng.choice(PARTY_SIZES))
+        if rng.random() < locked_share:
+            # The guest picked a room that was still free when they booked
+            room = next((t for t in rng.sample(timelines, len(timelines))
+                         if t.takes(stay) and t.neighbours(start, end)), None)
+            if room is None:
+                continue
+            room.add(start, end, None)
+            fixed.append((room.room_id, start, end))
+        else:
+            stays.append(stay)
+        for day in range(start, end):
+            busy[day] += 1
+    return stays, fixed
+
+def _first_fit(rooms, fixed, stays, min_nights):
+    timelines = [_Timeline(room_id, capacity) for room_id, capacity in rooms]
+    by_id = {t.room_id: t for t in timelines}
+    for room_id, start, end in fixed:
+        by_id[room_id].add(start, end, None)
+    unplaced = 0
+    for stay in sorted(stays, key=lambda s: (s.start, s.id)):
+        room = next((t for t in timelines if t.takes(stay) and t.neighbours(stay.start, stay.end)), None)
+        if room is None:
+            unplaced += 1
+        else:
+            room.add(stay.start, stay.end, stay.id)
+    return unplaced, sum(t.orphan_nights(min_nights) for t in timelines)
+
+def _write(rooms_per_type, demand):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        guest = Guest(first_name="Bench", last_name="Guest", email="bench@example.com", phone="000")
+        db.add(guest)
+        db.flush()
+        first_day = date.today() + timedelta(days=1)
+        room_ids = {}
+        for room_type, rooms in rooms_per_type.items():
+            for room_id, capacity in rooms:
+                room = Room(number=str(room_id), type=room_type, floor=1, capacity=capacity, is_available=True)
+                db.add(room)
+                db.flush()
+                room_ids[room_id] = room.id
+        for room_type, (stays, fixed) in demand.items():
+            rows = [(None, stay.start, stay.end, stay.party_size) for stay in stays]
+            rows += [(room_ids[room_id], start, end, None) for room_id, start, end in fixed]
+            db.bulk_insert_mappings(Booking, [
+                {
+                    "guest_id": guest.id, "room_id": room_id, "room_type": room_type, "party_size": party_size,
+                    "check_in_date": first_day + timedelta(days=start),
+                    "check_out_date": first_day + timedelta(days=end - 1),
+                    "status": BookingStatus.confirmed, "total_price": 100.0,
+                }
+                for room_id, start, end, party_size in rows
+            ])
+        db.commit()
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=500, help="Split evenly between the room types")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--occupancy", type=float, default=0.6, help="Stay requests per room and day")
+    parser.add_argument("--locked", type=float, default=0.1, help="Share of stays booked for a given room")
+    parser.add_argument("--min-nights", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-seconds", type=float, default=10.0)
+    parser.add_argument("--db", action="store_true", help="Also run assign_rooms on a scratch SQLite database")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    room_types = list(RoomType)
+    rooms_per_type, demand = {}, {}
+    next_id = 1
+    for index, room_type in enumerate(room_types):
+        count = args.rooms // len(room_types) + (index < args.rooms % len(room_types))
+        rooms_per_type[room_type] = [(next_id + i, rng.choice(CAPACITIES)) for i in range(count)]
+        next_id += count
+        demand[room_type] = _demand(rooms_per_type[room_type], args.days, args.occupancy, args.locked, rng)
+
+    failures = []
+    print(f"{'room type':<12} {'rooms':>5} {'stays':>6} {'locked':>6}  "
+          f"{'first fit':>18}  {'greedy':>18}  {'local search':>25}")
+    print(f"{'':<12} {'':>5} {'':>6} {'':>6}  {'unplaced orphans':>18}  {'unplaced orphans':>18}  "
+          f"{'unplaced orphans moves':>25}  ms")
+    for room_type in room_types:
+        rooms, (stays, fixed) = rooms_per_type[room_type], demand[room_type]
+        ff_unplaced, ff_orphans = _first_fit(rooms, fixed, stays, args.min_nights)
+        started = time.perf_counter()
+        plan = room_assignment.solve(rooms, fixed, stays, min_nights=args.min_nights)
+        seconds = time.perf_counter() - started
+        print(f"{room_type.value:<12} {len(rooms):>5} {len(stays):>6} {len(fixed):>6}  "
+              f"{ff_unplaced:>8} {ff_orphans:>9}  {plan.greedy_unplaced:>8} {plan.greedy_orphan_nights:>9}  "
+              f"{len(plan.unplaced):>8} {plan.orphan_nights:>9} {plan.moves:>6}  {seconds * 1000:.0f}")
+        if seconds > args.max_seconds:
+            failures.append(f"{room_type.value}: {seconds:.1f} s")
+        if (len(plan.unplaced), plan.orphan_nights) > (ff_unplaced, ff_orphans):
+            failures.append(f"{room_type.value}: worse than first fit")
+
+    if args.db:
+        _write(rooms_per_type, demand)
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            results = room_assignment.assign_rooms(
+                db, start=date.today(), end=date.today() + timedelta(days=args.days + 1),
+                min_nights=args.min_nights,
+            )
+            seconds = time.perf_counter() - started
+        finally:
+            db.close()
+        assigned = sum(r["assigned"] for r in results)
+        print(f"\nassign_rooms on SQLite: {assigned} bookings assigned in {seconds * 1000:.0f} ms "
+              f"(load, solve and commit)")
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
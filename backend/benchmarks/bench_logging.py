@@ -0,0 +1,95 @@
+"""
+Request-path logging cost benchmark.
+
+Replays the log calls made by one create_booking (a 7 night stay) and one
+login, first with the old setup (basicConfig StreamHandler, eager f-strings,
+per-night INFO lines) and then with app.core.logging_config (queue handler,
+%-style arguments, per-night lines at DEBUG). Both write to a temp file and
+only the time spent on the calling thread is measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_logging --iterations 2000
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import logging_config
+
+NIGHTS = 7
+PRICE = 100.0
+WEEKEND_PRICE = 150.0
+EMAIL = "frontdesk@example.com"
+
+def _before(logger: logging.Logger, check_in: date) -> None:
+    current = check_in
+    for _ in range(NIGHTS):
+        is_weekend = current.weekday() in [4, 5]
+        logger.info(f"Date: {current}, is_weekend: {is_weekend}, weekday: {current.weekday()}")
+        logger.info(f"Weekend price: {WEEKEND_PRICE}, Regular price: {PRICE}")
+        logger.info(f"Using regular price: {PRICE}")
+        current += timedelta(days=1)
+    logger.info(f"Final total price: {PRICE * NIGHTS}")
+    for message in ("Login attempt for user", "Authenticating user", "User authenticated successfully",
+                    "Login successful for user"):
+        logger.info(f"{message}: {EMAIL}")
+    logger.info(f"Creating access token for user {42}")
+
+def _after(logger: logging.Logger, check_in: date) -> None:
+    current = check_in
+    for _ in range(NIGHTS):
+        is_weekend = current.weekday() in [4, 5]
+        logger.debug("Date: %s, is_weekend: %s, weekday: %s", current, is_weekend, current.weekday())
+        logger.debug("Using regular price: %s", PRICE)
+        current += timedelta(days=1)
+    logger.info("Final total price: %s", PRICE * NIGHTS)
+    for message in ("Login attempt for user: %s", "Authenticating user: %s", "User authenticated successfully: %s",
+                    "Login successful for user: %s"):
+        logger.info(message, EMAIL)
+    logger.info("Creating access token for user %s", 42)
+
+def _measure(fn, logger: logging.Logger, iterations: int) -> float:
+    check_in = date(2025, 6, 2)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(logger, check_in)
+    return (time.perf_counter() - start) / iterations
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    root = logging.getLogger()
+    logger = logging.getLogger("bench.request")
+    out_dir = tempfile.mkdtemp()
+
+    with open(os.path.join(out_dir, "before.log"), "w") as before_stream:
+        handler = logging.StreamHandler(before_stream)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        before = _measure(_before, logger, args.iterations)
+        root.removeHandler(handler)
+
+    with open(os.path.join(out_dir, "after.log"), "w") as after_stream:
+        logging_config.setup_logging(stream=after_stream)
+        after = _measure(_after, logger, args.iterations)
+        drain_start = time.perf_counter()
+        logging_config.shutdown_logging()
+        drain = time.perf_counter() - drain_start
+
+    print(f"iterations:                 {args.iterations}")
+    print(f"before (sync, f-strings):   {before * 1e6:8.1f} us/request")
+    print(f"after (queue, lazy %):      {after * 1e6:8.1f} us/request")
+    print(f"speedup on request thread:  {before / after:8.1f}x")
+    print(f"background drain at exit:   {drain * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Login throughput benchmark.
+
+Fires CONCURRENCY simultaneous logins at /auth/login while probing a cheap
+endpoint, and reports login throughput plus the probe latency so threadpool
+starvation shows up as a number.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login --logins 50 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_login.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_db_file}")
+
+import httpx
+
+from app.main import app
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.user import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password"
+
+def _setup() -> None:
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        if not db.query(User).filter(User.email == EMAIL).first():
+            db.add(User(email=EMAIL, hashed_password=get_password_hash(PASSWORD), is_active=True))
+            db.commit()
+    finally:
+        db.close()
+
+async def _run(logins: int, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = {}
+        probe_latencies = []
+        done = asyncio.Event()
+
+        async def login() -> None:
+            async with semaphore:
+                response = await client.post(
+                    f"{settings.API_V1_STR}/auth/login",
+                    data={"username": EMAIL, "password": PASSWORD},
+                )
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe() -> None:
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get(f"{settings.API_V1_STR}/")
+                probe_latencies.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        probe_task = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await probe_task
+
+    print(f"bcrypt rounds:      {settings.BCRYPT_ROUNDS}")
+    print(f"pool workers:       {settings.PASSWORD_HASH_WORKERS}")
+    print(f"max pending:        {settings.PASSWORD_HASH_MAX_PENDING}")
+    print(f"logins:             {logins} (concurrency {concurrency})")
+    print(f"status codes:       {statuses}")
+    print(f"elapsed:            {elapsed:.3f}s")
+    print(f"throughput:         {statuses.get(200, 0) / elapsed:.1f} logins/s")
+    if probe_latencies:
+        probe_latencies.sort()
+        p95 = probe_latencies[int(len(probe_latencies) * 0.95) - 1]
+        print(f"probe p50 / p95:    {statistics.median(probe_latencies) * 1000:.1f}ms / {p95 * 1000:.1f}ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    _setup()
+    asyncio.run(_run(args.logins, args.concurrency))
+
+if __name__ == "__main__":
+    main()
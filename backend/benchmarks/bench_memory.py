@@ -0,0 +1,145 @@
+"""
+Peak memory of listing bookings.
+
+Seeds SQLite databases with N bookings and measures the tracemalloc peak of
+GET /bookings?limit=N (ORM objects with nested guest and room) and of the
+streaming, column-projected GET /bookings/export. Response bodies are
+discarded chunk by chunk so only server-side memory is measured.
+
+Exits non-zero if the export peak grows more than --max-ratio times when N
+grows by --factor, i.e. when the streaming path stops being sublinear.
+
+Usage (from backend/):
+    python -m benchmarks.bench_memory --base 1000 --factor 4
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_memory.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_db_file}")
+
+from app.main import app
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.hotel import Booking, BookingStatus, Guest, Room, RoomType
+from app.models.user import User
+
+def _seed(bookings: int) -> str:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        user = User(email="bench@example.com", hashed_password="-", is_active=True)
+        db.add(user)
+        rooms = [Room(number=str(100 + i), type=RoomType.GUEST_HOUSE, floor=1, capacity=2) for i in range(50)]
+        guests = [
+            Guest(first_name="Guest", last_name=str(i), email=f"guest{i}@example.com", phone="000")
+            for i in range(200)
+        ]
+        db.add_all(rooms + guests)
+        db.flush()
+        start = date(2025, 1, 1)
+        db.bulk_save_objects([
+            Booking(
+                guest_id=guests[i % len(guests)].id,
+                room_id=rooms[i % len(rooms)].id,
+                room_type=rooms[i % len(rooms)].type,
+                check_in_date=start + timedelta(days=2 * (i // len(rooms))),
+                check_out_date=start + timedelta(days=2 * (i // len(rooms)) + 2),
+                status=BookingStatus.confirmed,
+                total_price=200.0,
+                payment_status="pending",
+            )
+            for i in range(bookings)
+        ])
+        db.commit()
+        return create_access_token(user.id)
+    finally:
+        db.close()
+
+async def _request(path: str, query: str, token: str) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await response_done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_done.set()
+
+    await app(scope, receive, send)
+    return status
+
+def _peak_kb(path: str, query: str, token: str) -> int:
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    status = asyncio.run(_request(path, query, token))
+    _, peak = tracemalloc.get_traced_memory()
+    assert status == 200, f"{path} returned {status}"
+    return (peak - baseline) // 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base", type=int, default=1000)
+    parser.add_argument("--factor", type=int, default=4)
+    parser.add_argument("--max-ratio", type=float, default=2.0)
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    results = {}
+    for n in (args.base, args.base * args.factor):
+        token = _seed(n)
+        # Warm up imports and caches so they don't count towards the first run
+        _peak_kb(f"{settings.API_V1_STR}/bookings/export", "", token)
+        results[n] = (
+            _peak_kb(f"{settings.API_V1_STR}/bookings/", f"limit={n}", token),
+            _peak_kb(f"{settings.API_V1_STR}/bookings/export", "", token),
+        )
+    tracemalloc.stop()
+
+    print(f"{'bookings':>10} {'list peak KB':>14} {'export peak KB':>16}")
+    for n, (list_peak, export_peak) in results.items():
+        print(f"{n:>10} {list_peak:>14} {export_peak:>16}")
+
+    small, large = results[args.base][1], results[args.base * args.factor][1]
+    ratio = large / max(small, 1)
+    print(f"export growth for {args.factor}x bookings: {ratio:.2f}x (limit {args.max_ratio}x)")
+    if ratio > args.max_ratio:
+        print("FAIL: export peak memory grows faster than allowed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+SQL statements and commits per PUT /bookings/{id}.
+
+Runs a few typical updates against a scratch SQLite database, counting the
+statements and commits each request issues, and checks that a failure half
+way through the unit of work (the payment INSERT) leaves nothing behind.
+
+Exits non-zero if any request takes more than --max-statements statements or
+more than one commit, or if the failed update was partially applied.
+
+Usage (from backend/):
+    python -m benchmarks.bench_update_booking
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_db_file = os.path.join(tempfile.mkdtemp(), "bench_update_booking.db")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{_db_file}")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.models.base import Base
+from app.models.hotel import Booking, BookingStatus, FinancialTransaction, Guest, Room, RoomType
+from app.models.user import User  # noqa: F401 - registers the users table
+
+SCENARIOS = [
+    ("check in", {"status": "checked_in"}),
+    ("edit special requests", {"special_requests": "late arrival"}),
+    ("check out and pay", {"status": "checked_out", "payment_status": "paid"}),
+    ("pay again (transaction exists)", {"payment_status": "paid"}),
+]
+
+class Counter:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.fail_on = None
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.fail_on and statement.startswith(self.fail_on):
+            raise RuntimeError("simulated failure")
+        self.statements.append(statement.split(None, 1)[0].upper())
+
+    def commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.statements, self.commits = [], 0
+
+def _seed() -> int:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = SessionLocal()
+    try:
+        room = Room(number="101", type=RoomType.GUEST_HOUSE, floor=1, capacity=2)
+        guest = Guest(first_name="Guest", last_name="One", email="guest@example.com", phone="000")
+        db.add_all([room, guest])
+        db.flush()
+        booking = Booking(
+            guest_id=guest.id, room_id=room.id, room_type=room.type, check_in_date=date.today(),
+            check_out_date=date.today() + timedelta(days=2), status=BookingStatus.confirmed,
+            total_price=200.0, payment_status="pending",
+        )
+        db.add(booking)
+        db.commit()
+        return booking.id
+    finally:
+        db.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-statements", type=int, default=6)
+    args = parser.parse_args()
+
+    booking_id = _seed()
+    counter = Counter()
+    event.listen(engine, "before_cursor_execute", counter.before_cursor_execute)
+    event.listen(engine, "commit", counter.commit)
+    client = TestClient(app, raise_server_exceptions=False)
+    url = f"{settings.API_V1_STR}/bookings/{booking_id}"
+
+    failures = []
+    print(f"{'scenario':<32} {'statements':>10} {'commits':>8}  breakdown")
+    for name, body in SCENARIOS:
+        counter.reset()
+        response = client.put(url, json=body)
+        if response.status_code != 200:
+            failures.append(f"{name}: HTTP {response.status_code}")
+        breakdown = ", ".join(f"{s}x{counter.statements.count(s)}" for s in sorted(set(counter.statements)))
+        print(f"{name:<32} {len(counter.statements):>10} {counter.commits:>8}  {breakdown}")
+        if len(counter.statements) > args.max_statements or counter.commits > 1:
+            failures.append(f"{name}: {len(counter.statements)} statements, {counter.commits} commits")
+
+    # A failing INSERT must roll back the status and room changes made before it
+    db = SessionLocal()
+    db.query(FinancialTransaction).delete()
+    db.query(Booking).filter(Booking.id == booking_id).update(
+        {"status": BookingStatus.confirmed, "payment_status": "pending"}
+    )
+    db.commit()
+    counter.fail_on = "INSERT INTO financial_transactions"
+    response = client.put(url, json={"status": "checked_in", "payment_status": "paid"})
+    counter.fail_on = None
+    booking = db.get(Booking, booking_id)
+    db.refresh(booking)
+    room_available = db.get(Room, booking.room_id).is_available
+    partial = booking.status != BookingStatus.confirmed or booking.payment_status == "paid" or not room_available
+    print(f"\nfailed update: HTTP {response.status_code}, status {booking.status.value}, "
+          f"payment {booking.payment_status}, room available {room_available}")
+    if partial:
+        failures.append("failed update was partially applied")
+    db.close()
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+"""
+Deterministic synthetic dataset for benchmarks and load tests.
+
+Generates rooms, guests, tariffs, bookings and payments from a seed:
+
+    - bookings never overlap within a room (each room is walked forward in time,
+      with at least a day between a check-out and the next check-in)
+    - quarterly tariffs (1-night and 7-night rates) cover every generated night
+    - total_price follows the booking pricing rules (tariff valid at check-in,
+      weekend rate on Friday and Saturday nights)
+    - checked-in and checked-out bookings are paid by one income transaction of
+      exactly total_price, in the app's payment category
+
+Bookings are spread around --anchor (default: today): past stays are checked
+out, stays spanning the anchor are checked in and future ones are confirmed.
+The same seed, sizes and anchor always produce the same rows.
+
+Rows are generated in chunks and loaded with COPY on PostgreSQL or chunked
+executemany on SQLite, bypassing the ORM. Ids are assigned here, so the target
+tables must be empty (or pass --reset). Other scripts can call `load_dataset`.
+
+Usage (from backend/):
+    python -m benchmarks.dataset --bookings 1000000 --reset \\
+        --admin-email admin@example.com --admin-password secret
+    python -m benchmarks.dataset --db-url sqlite:///bench.db --create-tables --bookings 100000
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.security import get_password_hash
+from app.models.base import Base
+from app.models.hotel import RoomType
+from app.models.user import User  # noqa: F401 - registers the users table
+from app.services.booking_updates import PAYMENT_CATEGORY
+from app.services.pricing import WEEKEND_DAYS
+
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "rooms": ("id", "number", "type", "floor", "capacity", "is_available", "created_at", "updated_at"),
+    "guests": ("id", "first_name", "last_name", "email", "phone", "is_active", "created_at", "updated_at"),
+    "room_tariffs": (
+        "id", "room_id", "room_type", "price_per_night", "weekend_price_per_night", "min_nights",
+        "start_date", "end_date", "created_at", "updated_at",
+    ),
+    "bookings": (
+        "id", "guest_id", "room_id", "room_type", "check_in_date", "check_out_date", "status", "total_price",
+        "payment_status", "created_at", "updated_at",
+    ),
+    "financial_transactions": (
+        "id", "booking_id", "amount", "transaction_type", "category", "description", "payment_method",
+        "transaction_date", "created_at", "updated_at",
+    ),
+}
+
+# Children first, so deleting in this order never violates a foreign key
+RESET_ORDER = (
+    "inventory", "room_holds", "financial_transactions", "booking_changes", "bookings", "allotments", "room_tariffs",
+    "guests", "rooms",
+)
+
+# Days between one stay's check-out and the next check-in. At least 1: the
+# overlap rule keeps a room busy on its check-out day
+MAX_GAP = 2
+MAX_NIGHTS = 7
+NIGHTS_WEIGHTS = (30, 25, 18, 10, 7, 5, 5)
+AVERAGE_DAYS_PER_BOOKING = (1 + MAX_GAP) / 2 + sum(n * w for n, w in enumerate(NIGHTS_WEIGHTS, 1)) / sum(NIGHTS_WEIGHTS)
+WEEKLY_DISCOUNT = 0.85
+CANCELLED_SHARE = 0.05
+PAYMENT_METHODS = ("card", "cash", "transfer")
+
+Chunk = Tuple[str, List[tuple]]
+
+def _weekend_nights(check_in: int, nights: int) -> int:
+    """Friday and Saturday nights in [check_in, check_in + nights), check_in as an ordinal."""
+    full_weeks, rest = divmod(nights, 7)
+    count = full_weeks * len(WEEKEND_DAYS)
+    weekday = date.fromordinal(check_in).weekday()
+    for offset in range(rest):
+        if (weekday + offset) % 7 in WEEKEND_DAYS:
+            count += 1
+    return count
+
+def _quarter_start(day: date) -> date:
+    return date(day.year, 3 * ((day.month - 1) // 3) + 1, 1)
+
+def _next_quarter(day: date) -> date:
+    return date(day.year + 1, 1, 1) if day.month == 10 else date(day.year, day.month + 3, 1)
+
+def generate(
+    seed: int,
+    rooms: int,
+    guests: int,
+    bookings: int,
+    anchor: date,
+    chunk_size: int = 50_000,
+) -> Iterator[Chunk]:
+    """Yield (table, rows) chunks in foreign-key order."""
+    rng = random.Random(seed)
+    stamp = datetime.combine(anchor, datetime.min.time()).strftime("%Y-%m-%d %H:%M:%S.%f")
+    room_types = list(RoomType)
+
+    room_rows = [
+        (i, str(100 * (1 + (i - 1) // 100) + (i - 1) % 100), room_types[i % len(room_types)].name,
+         1 + (i - 1) // 100, rng.randint(1, 4), True, stamp, stamp)
+        for i in range(1, rooms + 1)
+    ]
+    first_room_of_type = {}
+    for row in room_rows:
+        first_room_of_type.setdefault(row[2], row[0])
+    yield "rooms", room_rows
+
+    for start in range(1, guests + 1, chunk_size):
+        yield "guests", [
+            (i, f"Guest{i}", f"Family{i % 997}", f"guest{i}@example.com", f"+7900{i:07d}", True, stamp, stamp)
+            for i in range(start, min(start + chunk_size, guests + 1))
+        ]
+
+    per_room, extra = divmod(bookings, rooms)
+    span = int((per_room + 1) * (MAX_GAP + MAX_NIGHTS)) + 1
+    first_day = anchor - timedelta(days=int((per_room + 1) * AVERAGE_DAYS_PER_BOOKING / 2))
+
+    # rates[type][quarter] = ((weekday, weekend) at min_nights 1, (weekday, weekend) at min_nights 7)
+    rates: Dict[str, List[Tuple[tuple, tuple]]] = {}
+    tariff_rows = []
+    quarter = _quarter_start(first_day)
+    first_quarter = quarter
+    last_day = first_day + timedelta(days=span)
+    while quarter <= last_day:
+        following = _next_quarter(quarter)
+        for room_type in first_room_of_type:
+            base = float(rng.randint(80, 200))
+            pair = []
+            for min_nights, discount in ((1, 1.0), (7, WEEKLY_DISCOUNT)):
+                price = round(base * discount, 2)
+                weekend = round(price * 1.3, 2)
+                tariff_id = len(tariff_rows) + 1
+                tariff_rows.append((
+                    tariff_id, first_room_of_type[room_type], room_type, price, weekend, min_nights,
+                    quarter.isoformat(), (following - timedelta(days=1)).isoformat(), stamp, stamp,
+                ))
+                pair.append((price, weekend))
+            rates.setdefault(room_type, []).append(tuple(pair))
+        quarter = following
+    yield "room_tariffs", tariff_rows
+
+    anchor_ordinal = anchor.toordinal()
+    first_quarter_index = first_quarter.year * 4 + (first_quarter.month - 1) // 3
+    nights_choices = list(range(1, MAX_NIGHTS + 1))
+    booking_rows: List[tuple] = []
+    payment_rows: List[tuple] = []
+    booking_id = payment_id = 0
+    for room in room_rows:
+        room_id, room_type = room[0], room[2]
+        room_rates = rates[room_type]
+        day = first_day.toordinal()
+        for _ in range(per_room + (1 if room_id <= extra else 0)):
+            day += rng.randint(1, MAX_GAP)
+            nights = rng.choices(nights_choices, NIGHTS_WEIGHTS)[0]
+            check_out = day + nights
+            check_in_date = date.fromordinal(day)
+
+            quarter_rates = room_rates[check_in_date.year * 4 + (check_in_date.month - 1) // 3 - first_quarter_index]
+            price, weekend = quarter_rates[1] if nights >= 7 else quarter_rates[0]
+            weekend_nights = _weekend_nights(day, nights)
+            total = round(price * (nights - weekend_nights) + weekend * weekend_nights, 2)
+
+            if rng.random() < CANCELLED_SHARE:
+                status, payment = "cancelled", "pending"
+            elif check_out <= anchor_ordinal:
+                status, payment = "checked_out", "paid"
+            elif day <= anchor_ordinal:
+                status, payment = "checked_in", "paid"
+            else:
+                status, payment = "confirmed", "pending"
+
+            booking_id += 1
+            check_in_iso = check_in_date.isoformat()
+            booking_rows.append((
+                booking_id, rng.randint(1, guests), room_id, room_type, check_in_iso,
+                date.fromordinal(check_out).isoformat(), status, total, payment, stamp, stamp,
+            ))
+            if payment == "paid":
+                payment_id += 1
+                payment_rows.append((
+                    payment_id, booking_id, total, "income", PAYMENT_CATEGORY,
+                    f"Оплата за бронирование #{booking_id}", PAYMENT_METHODS[rng.randrange(len(PAYMENT_METHODS))],
+                    check_in_iso, stamp, stamp,
+                ))
+            day = check_out
+
+            if len(booking_rows) >= chunk_size:
+                yield "bookings", booking_rows
+                yield "financial_transactions", payment_rows
+                booking_rows, payment_rows = [], []
+    if booking_rows:
+        yield "bookings", booking_rows
+        yield "financial_transactions", payment_rows
+
+def _copy_chunk(cursor, table: str, rows: List[tuple]) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(COLUMNS[table])}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+def _insert_chunk(cursor, table: str, rows: List[tuple]) -> None:
+    placeholders = ", ".join("?" for _ in COLUMNS[table])
+    cursor.executemany(f"INSERT INTO {table} ({', '.join(COLUMNS[table])}) VALUES ({placeholders})", rows)
+
+def reset_tables(engine: Engine) -> None:
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.execute(text(f"TRUNCATE {', '.join(RESET_ORDER)} RESTART IDENTITY CASCADE"))
+        else:
+            for table in RESET_ORDER:
+                conn.execute(text(f"DELETE FROM {table}"))
+
+def _ensure_empty(engine: Engine) -> None:
+    with engine.connect() as conn:
+        for table in RESET_ORDER:
+            if conn.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first() is not None:
+                raise RuntimeError(f"table {table} is not empty; pass --reset to clear the dataset tables")
+
+def load_dataset(
+    engine: Engine,
+    seed: int = 42,
+    rooms: int = 500,
+    guests: int = 100_000,
+    bookings: int = 1_000_000,
+    anchor: Optional[date] = None,
+    chunk_size: int = 50_000,
+) -> Dict[str, int]:
+    """Generate the dataset into empty tables and return the row count per table."""
+    _ensure_empty(engine)
+    postgres = engine.dialect.name == "postgresql"
+    write = _copy_chunk if postgres else _insert_chunk
+    counts = dict.fromkeys(COLUMNS, 0)
+
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        if not postgres:
+            cursor.execute("PRAGMA synchronous = OFF")
+        for table, rows in generate(seed, rooms, guests, bookings, anchor or date.today(), chunk_size):
+            if rows:
+                write(cursor, table, rows)
+                counts[table] += len(rows)
+        if postgres:
+            # Ids were assigned explicitly, so move the serial sequences past them
+            for table in COLUMNS:
+                cursor.execute(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+                )
+        raw.commit()
+    finally:
+        raw.close()
+    return counts
+
+def _ensure_admin(engine: Engine, email: str, password: str) -> None:
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM users WHERE email = :email"), {"email": email}).first() is None:
+            conn.execute(
+                text(
+                    "INSERT INTO users (email, hashed_password, is_active, is_superuser, created_at, updated_at) "
+                    "VALUES (:email, :hashed_password, :active, :active, :now, :now)"
+                ),
+                {"email": email, "hashed_password": get_password_hash(password), "active": True,
+                 "now": datetime.utcnow()},
+            )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db-url", default=settings.SQLALCHEMY_DATABASE_URI)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rooms", type=int, default=500)
+    parser.add_argument("--guests", type=int, default=100_000)
+    parser.add_argument("--bookings", type=int, default=1_000_000)
+    parser.add_argument("--anchor", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--create-tables", action="store_true", help="create missing tables from the models")
+    parser.add_argument("--reset", action="store_true", help="delete existing rows from the dataset tables")
+    parser.add_argument("--admin-email", help="also create this superuser (for load tests)")
+    parser.add_argument("--admin-password")
+    args = parser.parse_args()
+    if args.admin_email and not args.admin_password:
+        parser.error("--admin-email needs --admin-password")
+
+    engine = create_engine(args.db_url)
+    try:
+        if args.create_tables:
+            Base.metadata.create_all(engine)
+        if args.reset:
+            reset_tables(engine)
+        start = time.perf_counter()
+        counts = load_dataset(
+            engine, args.seed, args.rooms, args.guests, args.bookings, args.anchor, args.chunk_size
+        )
+        elapsed = time.perf_counter() - start
+        if args.admin_email:
+            _ensure_admin(engine, args.admin_email, args.admin_password)
+    finally:
+        engine.dispose()
+
+    for table, count in counts.items():
+        print(f"{table:<24} {count:>10}")
+    print(f"loaded {sum(counts.values())} rows in {elapsed:.1f}s ({engine.dialect.name})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Micro-benchmarks for the booking, pricing and tariff hot paths.
+
+Seeds a scratch database with deterministic synthetic data (--seed), times
+each case, writes the results as JSON and optionally compares them with a
+stored baseline, flagging cases whose best (minimum) time per op got slower
+than --threshold. The minimum is used because it is the least sensitive to
+noise from other processes.
+
+The target database's tables are dropped and recreated, so --db-url must
+point at a scratch database (SQLite file by default, or a local Postgres).
+
+Usage (from backend/):
+    python -m benchmarks.hot_paths --output bench.json \\
+        --baseline benchmarks/baselines/sqlite.json
+    python -m benchmarks.hot_paths --db-url postgresql://user:pw@localhost/hotel_bench
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+
+from app.core.config import settings
+from app.crud import hotel as crud
+from app.models.base import Base
+from app.models.hotel import Booking, BookingStatus, Guest, Room, RoomTariff, RoomType
+from app.models.user import User  # noqa: F401 - registers the users table
+from app.schemas.hotel import Booking as BookingSchema, BookingCreate, GuestCreate, RoomCreate
+from app.services.pricing import find_overlapping_booking, price_stay, select_tariff
+
+ROOMS = 50
+GUESTS = 500
+BOOKINGS_PER_ROOM = 60
+START = date(2025, 1, 1)
+
+def seed_database(db: Session, seed: int) -> None:
+    rng = random.Random(seed)
+    rooms = [
+        Room(number=str(100 + i), type=rng.choice(list(RoomType)), floor=1 + i // 10, capacity=rng.randint(1, 4))
+        for i in range(ROOMS)
+    ]
+    guests = [
+        Guest(first_name=f"Guest{i}", last_name=f"Family{i % 97}", email=f"guest{i}@example.com",
+              phone=f"+7900{i:07d}")
+        for i in range(GUESTS)
+    ]
+    db.add_all(rooms + guests)
+    db.flush()
+
+    for room_type in RoomType:
+        for quarter in range(4):
+            for min_nights, discount in ((1, 1.0), (3, 0.95), (7, 0.85)):
+                base = rng.randint(80, 200) * discount
+                db.add(RoomTariff(
+                    room_id=rooms[0].id,
+                    room_type=room_type.value,
+                    price_per_night=round(base, 2),
+                    weekend_price_per_night=round(base * 1.3, 2),
+                    min_nights=min_nights,
+                    start_date=START + timedelta(days=91 * quarter),
+                    end_date=START + timedelta(days=91 * quarter + 90),
+                ))
+
+    bookings = []
+    for room in rooms:
+        day = START
+        for _ in range(BOOKINGS_PER_ROOM):
+            day += timedelta(days=rng.randint(0, 3))
+            nights = rng.randint(1, 5)
+            bookings.append(Booking(
+                guest_id=rng.choice(guests).id,
+                room_id=room.id,
+                room_type=room.type,
+                check_in_date=day,
+                check_out_date=day + timedelta(days=nights),
+                status=rng.choice([BookingStatus.confirmed, BookingStatus.checked_out, BookingStatus.cancelled]),
+                total_price=100.0 * nights,
+                payment_status="pending",
+            ))
+            day += timedelta(days=nights)
+    db.bulk_save_objects(bookings)
+    db.commit()
+
+def _time(fn: Callable[[], object], number: int, repeat: int) -> Dict[str, float]:
+    fn()  # warm up caches and compiled statements
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter_ns() - start) / number / 1000)
+    return {
+        "median_us": round(statistics.median(samples), 3),
+        "min_us": round(min(samples), 3),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "number": number,
+        "repeat": repeat,
+    }
+
+def build_cases(db: Session, seed: int) -> Dict[str, Callable[[], object]]:
+    rng = random.Random(seed + 1)
+    tariff = RoomTariff(price_per_night=120.0, weekend_price_per_night=160.0, min_nights=1)
+    tariffs = crud.get_booking_tariffs(db, RoomType.FRAME.value, START + timedelta(days=10))
+    room_ids = [r.id for r in db.query(Room.id).order_by(Room.id)]
+    probes = [
+        (rng.choice(room_ids), START + timedelta(days=rng.randint(0, 300)))
+        for _ in range(64)
+    ]
+    probe_index = iter(range(10 ** 12))
+
+    def next_probe():
+        return probes[next(probe_index) % len(probes)]
+
+    def overlap():
+        room_id, check_in = next_probe()
+        existing = crud.booking.get_by_room(db, room_id=room_id, skip=0, limit=100)
+        return find_overlapping_booking(existing, check_in, check_in + timedelta(days=3))
+
+    def tariff_resolution():
+        _, check_in = next_probe()
+        return select_tariff(crud.get_booking_tariffs(db, RoomType.GUEST_HOUSE.value, check_in), 4)
+
+    update_target = (
+        db.query(Booking).options(joinedload(Booking.guest), joinedload(Booking.room)).order_by(Booking.id).first()
+    )
+    counter = iter(range(10 ** 12))
+
+    def crud_update():
+        return crud.booking.update(
+            db, db_obj=update_target, obj_in={"special_requests": f"late check-in {next(counter)}"}
+        )
+
+    room_target = db.query(Room).order_by(Room.id).first()
+    guest_target = db.query(Guest).order_by(Guest.id).first()
+    serial = iter(range(10 ** 12))
+
+    def create_room():
+        return crud.room.create(db, obj_in=RoomCreate(
+            number=f"bench-{next(serial)}", type=RoomType.FRAME, floor=9, capacity=2,
+        ))
+
+    def create_guest():
+        n = next(serial)
+        return crud.guest.create(db, obj_in=GuestCreate(
+            first_name="Bench", last_name=str(n), email=f"bench{n}@example.com", phone="+79000000000",
+        ))
+
+    far_future = START + timedelta(days=3650)
+
+    def create_booking():
+        # Far beyond the seeded stays, one night apart, so rows never collide
+        check_in = far_future + timedelta(days=2 * next(serial))
+        return crud.booking.create(db, obj_in=BookingCreate(
+            guest_id=guest_target.id, room_id=room_target.id, check_in_date=check_in,
+            check_out_date=check_in + timedelta(days=1), total_price=100.0,
+        ))
+
+    def update_room():
+        return crud.room.update(db, db_obj=room_target, obj_in={"description": f"renovated {next(counter)}"})
+
+    def update_guest():
+        return crud.guest.update(db, db_obj=guest_target, obj_in={"address": f"street {next(counter)}"})
+
+    page = (
+        db.query(Booking)
+        .options(joinedload(Booking.guest), joinedload(Booking.room))
+        .order_by(Booking.id)
+        .limit(100)
+        .all()
+    )
+    adapter = TypeAdapter(List[BookingSchema])
+
+    def serialize():
+        return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+    return {
+        "pricing.nightly_price_7_nights": lambda: price_stay(tariff, START, START + timedelta(days=7)),
+        "pricing.nightly_price_30_nights": lambda: price_stay(tariff, START, START + timedelta(days=30)),
+        "pricing.select_tariff": lambda: select_tariff(tariffs, 4),
+        "booking.overlap_detection": overlap,
+        "tariff.resolution": tariff_resolution,
+        "crud.update_roundtrip": crud_update,
+        "crud.create_room": create_room,
+        "crud.create_guest": create_guest,
+        "crud.create_booking": create_booking,
+        "crud.update_room": update_room,
+        "crud.update_guest": update_guest,
+        "serialize.booking_page_100": serialize,
+    }
+
+CASE_SIZES = {
+    "pricing.nightly_price_7_nights": (2000, 7),
+    "pricing.nightly_price_30_nights": (1000, 7),
+    "pricing.select_tariff": (20000, 7),
+    "booking.overlap_detection": (200, 7),
+    "tariff.resolution": (200, 7),
+    "crud.update_roundtrip": (100, 7),
+    "crud.create_room": (100, 7),
+    "crud.create_guest": (100, 7),
+    "crud.create_booking": (100, 7),
+    "crud.update_room": (100, 7),
+    "crud.update_guest": (100, 7),
+    "serialize.booking_page_100": (50, 7),
+}
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    print(f"\n{'case (min us/op)':<34} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {'-':>12} {result['min_us']:>12.2f} {'new':>9}")
+            continue
+        change = (result["min_us"] - base["min_us"]) / base["min_us"]
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<34} {base['min_us']:>12.2f} {result['min_us']:>12.2f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db-url", default=None, help="scratch database URL (default: temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", help="run only cases starting with this prefix")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    db_url = args.db_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    if db_url == settings.SQLALCHEMY_DATABASE_URI:
+        parser.error("refusing to drop tables in the application database; use a scratch database")
+
+    engine = create_engine(db_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)()
+    try:
+        seed_database(db, args.seed)
+        cases = build_cases(db, args.seed)
+        results = {}
+        for name, fn in cases.items():
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            number, repeat = CASE_SIZES[name]
+            results[name] = _time(fn, number, repeat)
+            print(f"{name:<34} median {results[name]['median_us']:>10.2f} us  min {results[name]['min_us']:>10.2f} us")
+    finally:
+        db.close()
+        engine.dispose()
+
+    report = {
+        "meta": {
+            "dialect": engine.dialect.name,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "created_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["dialect"] != report["meta"]["dialect"]:
+            print(f"warning: baseline was recorded on {baseline['meta']['dialect']}")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
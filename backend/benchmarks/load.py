@@ -0,0 +1,263 @@
+"""
+End-to-end load scenarios against a running API.
+
+Virtual users log in through /auth/login and replay one of these mixes:
+
+    checkout_rush      morning front desk: list bookings, settle and check out
+    checkin_wave       evening arrivals: /bookings/{id}/checkin, room status
+    booking_burst      web booking engine hammering one popular room type
+    accountant_paging  accountants paging through /financial
+    mixed              all of the above, weighted like a normal day
+
+Throughput and p50/p95/p99 latency are reported per route template.
+
+Either point --base-url at a server that is already running, or pass
+--workers N to start `uvicorn app.main:app --workers N` for the run. Seed the
+database with rooms, guests, bookings and transactions first, so there is
+something to page through.
+
+Usage (from backend/):
+    python -m benchmarks.load --workers 4 --scenario mixed --users 50 --duration 60 \\
+        --email admin@example.com --password secret
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+API = "/api/v1"
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+class Recorder:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: int, elapsed: float) -> None:
+        self.latencies[route].append(elapsed)
+        self.statuses[route][status] += 1
+
+    def report(self, elapsed: float) -> Dict[str, dict]:
+        rows = {}
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            rows[route] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / elapsed, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "statuses": dict(self.statuses[route]),
+            }
+        return rows
+
+class Session:
+    """One logged-in virtual user."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, rng: random.Random, data: "SharedData"):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.data = data
+        self.headers: Dict[str, str] = {}
+
+    async def call(self, method: str, route: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=self.headers, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(f"{method} {route}", 0, time.perf_counter() - start)
+            return None
+        self.recorder.record(f"{method} {route}", response.status_code, time.perf_counter() - start)
+        return response
+
+    async def login(self, email: str, password: str) -> None:
+        response = await self.call(
+            "POST", "/auth/login", f"{API}/auth/login", data={"username": email, "password": password}
+        )
+        if response is None or response.status_code != 200:
+            raise RuntimeError(f"login failed: {response.status_code if response else 'no response'}")
+        self.headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+class SharedData:
+    """Ids discovered up front and handed out to virtual users."""
+
+    def __init__(self):
+        self.confirmed: List[int] = []
+        self.checked_in: List[int] = []
+        self.booking_ids: List[int] = []
+        self.rooms_by_type: Dict[str, List[int]] = defaultdict(list)
+        self.guest_ids: List[int] = []
+        self.popular_type: Optional[str] = None
+
+    def pop(self, pool: List[int]) -> Optional[int]:
+        return pool.pop() if pool else None
+
+    async def load(self, session: Session, sample: int) -> None:
+        bookings = await session.call("GET", "/bookings/", f"{API}/bookings/", params={"limit": sample})
+        for b in bookings.json() if bookings is not None and bookings.status_code == 200 else []:
+            self.booking_ids.append(b["id"])
+            if b["status"] == "confirmed":
+                self.confirmed.append(b["id"])
+            elif b["status"] == "checked_in":
+                self.checked_in.append(b["id"])
+        rooms = await session.call("GET", "/rooms/", f"{API}/rooms/", params={"limit": sample})
+        for r in rooms.json() if rooms is not None and rooms.status_code == 200 else []:
+            self.rooms_by_type[r["type"]].append(r["id"])
+        guests = await session.call("GET", "/guests/", f"{API}/guests/", params={"limit": sample})
+        self.guest_ids = [g["id"] for g in (guests.json() if guests is not None and guests.status_code == 200 else [])]
+        if self.rooms_by_type:
+            self.popular_type = max(self.rooms_by_type, key=lambda t: len(self.rooms_by_type[t]))
+        session.rng.shuffle(self.confirmed)
+        session.rng.shuffle(self.checked_in)
+
+async def checkout_rush(s: Session) -> None:
+    await s.call("GET", "/bookings/", f"{API}/bookings/", params={"limit": 50})
+    booking_id = s.data.pop(s.data.checked_in)
+    if booking_id is None:
+        return
+    await s.call("GET", "/bookings/{booking_id}", f"{API}/bookings/{booking_id}")
+    await s.call(
+        "PUT", "/bookings/{booking_id}", f"{API}/bookings/{booking_id}",
+        json={"status": "checked_out", "payment_status": "paid"},
+    )
+
+async def checkin_wave(s: Session) -> None:
+    booking_id = s.data.pop(s.data.confirmed)
+    if booking_id is not None:
+        await s.call("GET", "/bookings/{booking_id}", f"{API}/bookings/{booking_id}")
+        await s.call("POST", "/bookings/{booking_id}/checkin", f"{API}/bookings/{booking_id}/checkin")
+    await s.call("GET", "/rooms/", f"{API}/rooms/", params={"available_only": True})
+
+async def booking_burst(s: Session) -> None:
+    room_type = s.data.popular_type
+    if not room_type or not s.data.guest_ids:
+        return
+    check_in = date.today() + timedelta(days=s.rng.randint(1, 60))
+    await s.call(
+        "GET", "/tariffs/current", f"{API}/tariffs/current",
+        params={"room_type": room_type, "date": check_in.isoformat()},
+    )
+    await s.call(
+        "POST", "/bookings/", f"{API}/bookings/",
+        json={
+            "guest_id": s.rng.choice(s.data.guest_ids),
+            "room_id": s.rng.choice(s.data.rooms_by_type[room_type]),
+            "check_in_date": check_in.isoformat(),
+            "check_out_date": (check_in + timedelta(days=s.rng.randint(1, 5))).isoformat(),
+        },
+    )
+
+async def accountant_paging(s: Session) -> None:
+    page = s.rng.randint(0, 40)
+    response = await s.call("GET", "/financial/", f"{API}/financial/", params={"skip": page * 50, "limit": 50})
+    if response is not None and response.status_code == 200 and response.json():
+        transaction_id = s.rng.choice(response.json())["id"]
+        await s.call("GET", "/financial/{transaction_id}", f"{API}/financial/{transaction_id}")
+
+SCENARIOS: Dict[str, List[Tuple[Callable, int]]] = {
+    "checkout_rush": [(checkout_rush, 1)],
+    "checkin_wave": [(checkin_wave, 1)],
+    "booking_burst": [(booking_burst, 1)],
+    "accountant_paging": [(accountant_paging, 1)],
+    "mixed": [(checkout_rush, 3), (checkin_wave, 3), (booking_burst, 5), (accountant_paging, 1)],
+}
+
+async def virtual_user(client, recorder, data, args, seed: int, deadline: float) -> None:
+    session = Session(client, recorder, random.Random(seed), data)
+    await session.login(args.email, args.password)
+    actions, weights = zip(*SCENARIOS[args.scenario])
+    while time.perf_counter() < deadline:
+        action = session.rng.choices(actions, weights)[0]
+        await action(session)
+        if args.think_time:
+            await asyncio.sleep(session.rng.expovariate(1 / args.think_time))
+
+async def run(args) -> Dict[str, dict]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+        setup = Session(client, Recorder(), random.Random(args.seed), SharedData())
+        await setup.login(args.email, args.password)
+        await setup.data.load(setup, args.sample)
+
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            virtual_user(client, recorder, setup.data, args, args.seed + i, deadline)
+            for i in range(args.users)
+        ))
+        elapsed = time.perf_counter() - start
+    return {"elapsed_s": round(elapsed, 2), "routes": recorder.report(elapsed)}
+
+def start_server(args) -> subprocess.Popen:
+    host, port = args.base_url.split("//", 1)[1].rsplit(":", 1)
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", host, "--port", port,
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=backend_dir,
+    )
+    for _ in range(100):
+        try:
+            httpx.get(f"{args.base_url}/", timeout=1)
+            return process
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start")
+
+def print_report(result: Dict[str, dict]) -> None:
+    print(f"\n{'route':<42} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    total = 0
+    for route, row in result["routes"].items():
+        total += row["requests"]
+        print(f"{route:<42} {row['requests']:>7} {row['throughput_rps']:>8.1f} {row['p50_ms']:>8.1f} "
+              f"{row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}  {row['statuses']}")
+    print(f"\ntotal: {total} requests in {result['elapsed_s']}s ({total / result['elapsed_s']:.1f} req/s)")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--workers", type=int, default=0, help="start uvicorn with this many workers")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between actions, seconds")
+    parser.add_argument("--sample", type=int, default=2000, help="bookings/rooms/guests fetched up front")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the report as JSON here")
+    args = parser.parse_args()
+
+    server = start_server(args) if args.workers else None
+    try:
+        result = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result.update({"scenario": args.scenario, "users": args.users, "workers": args.workers or None})
+    print_report(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -11,5 +11,6 @@ setup(
         "psycopg2-binary",
         "pydantic",
         "pydantic-settings",
+        "prometheus-client",
     ],
 ) 
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""
+API tests against a scratch SQLite database.
+
+Each test gets fresh tables with two GUEST_HOUSE rooms (1 and 2), two FRAME
+rooms (3 and 4), three guests and a 100/150 (weekend) tariff per type, and
+an admin client. `day(n)` is n days after a Monday about a month from now, so
+day(4) and day(5) are Friday and Saturday nights.
+"""
+import os
+import tempfile
+from datetime import date, timedelta
+
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.security import get_password_hash
+from app.db.session import SessionLocal, engine
+from app.main import app
+from app.models.base import Base
+from app.models.hotel import Guest, Room, RoomTariff, RoomType
+from app.models.user import User
+
+API = "/api/v1"
+MONDAY = date.today() + timedelta(weeks=5, days=-date.today().weekday())
+
+def day(n: int) -> str:
+    return (MONDAY + timedelta(days=n)).isoformat()
+
+@pytest.fixture
+def db():
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session = SessionLocal()
+    session.add(User(email="admin@example.com", hashed_password=get_password_hash("secret"),
+                     is_active=True, is_superuser=True))
+    for i, room_type in enumerate([RoomType.GUEST_HOUSE] * 2 + [RoomType.FRAME] * 2):
+        session.add(Room(number=str(100 + i), type=room_type, floor=1, capacity=2, is_available=True))
+    for i in range(3):
+        session.add(Guest(first_name="Guest", last_name=str(i), email=f"guest{i}@example.com", phone="000"))
+    session.flush()
+    for room_type in RoomType:
+        session.add(RoomTariff(
+            room_id=1, room_type=room_type.value, price_per_night=100, weekend_price_per_night=150,
+            min_nights=1, start_date=date.today(), end_date=date.today() + timedelta(days=365),
+        ))
+    session.commit()
+    yield session
+    session.close()
+
+@pytest.fixture
+def client(db):
+    client = TestClient(app)
+    token = client.post(
+        f"{API}/auth/login", data={"username": "admin@example.com", "password": "secret"}
+    ).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    return client
+
+def book(client, check_in: int, check_out: int, *, guest_id: int = 1, room_id=None, room_type=None, headers=None):
+    body = {"guest_id": guest_id, "check_in_date": day(check_in), "check_out_date": day(check_out)}
+    if room_id is not None:
+        body["room_id"] = room_id
+    if room_type is not None:
+        body["room_type"] = room_type
+    return client.post(f"{API}/bookings/", json=body, headers=headers or {})
+
+def inventory(client, start: int, end: int, room_type: str = "GUEST_HOUSE"):
+    """(sold, held, available) for each day in [day(start), day(end)]."""
+    rows = client.get(
+        f"{API}/inventory/", params={"start": day(start), "end": day(end + 1), "room_type": room_type}
+    ).json()
+    return [(row["sold"], row["held"], row["available"]) for row in rows]
@@ -0,0 +1,45 @@
+import uuid
+from unittest import mock
+
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.crud.hotel import CRUDRoom
+from app.models.hotel import Booking, Room
+
+from .conftest import API, book
+
+def test_if_match_with_an_old_version_gets_412(client):
+    booking = client.get(f"{API}/bookings/{book(client, 0, 2, room_id=1).json()['id']}")
+    etag = booking.headers["ETag"]
+    booking_id = booking.json()["id"]
+    first = client.put(f"{API}/bookings/{booking_id}", json={"special_requests": "late"}, headers={"If-Match": etag})
+    assert first.status_code == 200
+    assert first.headers["ETag"] != etag
+    stale = client.put(f"{API}/bookings/{booking_id}", json={"special_requests": "early"}, headers={"If-Match": etag})
+    assert stale.status_code == 412
+    assert client.get(f"{API}/bookings/{booking_id}").json()["special_requests"] == "late"
+
+def test_idempotency_key_replays_the_first_response(client, db):
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    first = book(client, 0, 2, room_id=1, headers=headers)
+    retry = book(client, 0, 2, room_id=1, headers=headers)
+    assert first.status_code == retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json()["id"] == first.json()["id"]
+    assert db.query(Booking).count() == 1
+
+def test_stale_room_rolls_the_booking_back(client, db):
+    def stale(self, db, **kwargs):
+        db.rollback()
+        raise StaleDataError("Room 1 was modified by another request")
+
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    with mock.patch.object(CRUDRoom, "update", stale):
+        assert book(client, 0, 2, room_id=1, headers=headers).status_code == 412
+    assert db.query(Booking).count() == 0
+    assert db.get(Room, 1).is_available is True
+
+    # Nothing was written, so a retry with the same key runs again
+    retry = book(client, 0, 2, room_id=1, headers=headers)
+    assert retry.status_code == 200
+    assert "Idempotent-Replayed" not in retry.headers
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+from app.models.hotel import RoomHold
+from app.services import inventory as inventory_service, room_holds
+
+from .conftest import API, book, day, inventory
+
+def hold(client, room_id, check_in, check_out, guest_id=1):
+    return client.post(f"{API}/holds/", json={
+        "guest_id": guest_id, "room_id": room_id, "check_in_date": day(check_in), "check_out_date": day(check_out),
+    })
+
+def test_hold_blocks_the_room_and_counts_as_held(client):
+    assert hold(client, 1, 0, 2).status_code == 200
+    assert inventory(client, 0, 2) == [(0, 1, 1)] * 3
+    response = book(client, 1, 3, room_id=1, guest_id=2)
+    assert response.status_code == 400
+
+def test_confirm_turns_held_into_sold(client):
+    placed = hold(client, 1, 0, 2).json()
+    response = client.post(f"{API}/holds/{placed['id']}/confirm", json={})
+    assert response.status_code == 200
+    assert response.json()["total_price"] == 200
+    assert inventory(client, 0, 2) == [(1, 0, 1)] * 3
+
+def test_reaper_and_recount_agree_on_expired_holds(client, db):
+    expired = hold(client, 1, 0, 2).json()
+    hold(client, 2, 0, 2, guest_id=2)
+    db.get(RoomHold, expired["id"]).expires_at = datetime.utcnow() - timedelta(minutes=1)
+    db.commit()
+
+    # Recounting before the reaper runs mustn't make it release the hold twice
+    inventory_service.recount(db)
+    db.commit()
+    assert room_holds.reap_expired(db) == 1
+    assert inventory(client, 0, 2) == [(0, 1, 1)] * 3
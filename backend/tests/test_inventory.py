@@ -0,0 +1,61 @@
+from app.services import inventory as inventory_service
+
+from .conftest import API, book, day, inventory
+
+def test_type_level_booking_is_refused_when_sold_out(client):
+    assert book(client, 0, 2, room_type="GUEST_HOUSE").status_code == 200
+    assert book(client, 1, 3, room_type="GUEST_HOUSE", guest_id=2).status_code == 200
+    response = book(client, 2, 4, room_type="GUEST_HOUSE", guest_id=3)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "No GUEST_HOUSE rooms left for these dates"
+    assert inventory(client, 0, 3) == [(1, 0, 1), (2, 0, 0), (2, 0, 0), (1, 0, 1)]
+
+def test_check_out_day_counts_like_the_overlap_rule(client):
+    # Both FRAME rooms are busy on day 2, one stay's check-out and the other's check-in
+    assert book(client, 0, 2, room_type="FRAME").status_code == 200
+    assert book(client, 2, 4, room_type="FRAME", guest_id=2).status_code == 200
+    assert book(client, 2, 3, room_type="FRAME", guest_id=3).status_code == 400
+    assignment = client.post(f"{API}/rooms/assign", params={"start": day(0), "end": day(7)}).json()
+    frame = next(r for r in assignment if r["room_type"] == "FRAME")
+    assert frame["assigned"] == 2 and frame["unassigned"] == []
+
+def test_cancel_gives_the_days_back_and_reinstate_takes_them(client):
+    booking = book(client, 0, 2, room_type="GUEST_HOUSE").json()
+    book(client, 0, 2, room_type="GUEST_HOUSE", guest_id=2)
+    assert client.put(f"{API}/bookings/{booking['id']}", json={"status": "cancelled"}).status_code == 200
+    assert inventory(client, 0, 2) == [(1, 0, 1)] * 3
+
+    other = book(client, 1, 3, room_type="GUEST_HOUSE", guest_id=3)
+    assert other.status_code == 200
+    response = client.put(f"{API}/bookings/{booking['id']}", json={"status": "confirmed"})
+    assert response.status_code == 400
+    assert client.get(f"{API}/bookings/{booking['id']}").json()["status"] == "cancelled"
+
+    client.put(f"{API}/bookings/{other.json()['id']}", json={"status": "cancelled"})
+    assert client.put(f"{API}/bookings/{booking['id']}", json={"status": "confirmed"}).status_code == 200
+    assert inventory(client, 0, 2) == [(2, 0, 0)] * 3
+
+def test_recount_matches_the_incremental_counts(client, db):
+    book(client, 0, 3, room_type="GUEST_HOUSE")
+    second = book(client, 2, 5, room_id=2, guest_id=2).json()
+    client.post(f"{API}/bookings/{second['id']}/modify", json={"check_in_date": day(3), "check_out_date": day(6)})
+    client.delete(f"{API}/bookings/{second['id']}")
+    book(client, 4, 6, room_type="GUEST_HOUSE", guest_id=3)
+    counted = inventory(client, 0, 7)
+    inventory_service.recount(db)
+    db.commit()
+    assert inventory(client, 0, 7) == counted
+
+def test_delete_releases_the_days(client):
+    booking = book(client, 0, 2, room_type="GUEST_HOUSE").json()
+    assert client.delete(f"{API}/bookings/{booking['id']}").status_code == 200
+    assert inventory(client, 0, 2) == [(0, 0, 2)] * 3
+
+def test_deleting_a_guest_releases_its_bookings_and_holds(client):
+    book(client, 0, 2, room_id=1)
+    client.post(f"{API}/holds/", json={
+        "guest_id": 1, "room_id": 2, "check_in_date": day(3), "check_out_date": day(4),
+    })
+    assert inventory(client, 0, 4) == [(1, 0, 1)] * 3 + [(0, 1, 1)] * 2
+    assert client.delete(f"{API}/guests/1").status_code == 200
+    assert inventory(client, 0, 4) == [(0, 0, 2)] * 5
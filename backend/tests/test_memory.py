@@ -0,0 +1,81 @@
+"""
+Peak memory of GET /bookings/export, a small version of benchmarks/bench_memory.py.
+
+The export streams column projections in batches, so quadrupling the bookings
+must not come close to quadrupling the server-side peak. The batch size is
+shrunk so that these small tables span many batches.
+"""
+import asyncio
+import tracemalloc
+from datetime import timedelta
+
+from app.api.api_v1.endpoints import bookings
+from app.main import app
+from app.models.hotel import Booking, BookingStatus
+
+from .conftest import API, MONDAY
+
+def _seed(db, bookings: int) -> None:
+    db.query(Booking).delete()
+    db.bulk_save_objects([
+        Booking(
+            guest_id=1 + i % 3,
+            room_id=1 + i % 4,
+            check_in_date=MONDAY + timedelta(days=2 * (i // 4)),
+            check_out_date=MONDAY + timedelta(days=2 * (i // 4) + 1),
+            status=BookingStatus.confirmed,
+            total_price=100.0,
+            payment_status="pending",
+        )
+        for i in range(bookings)
+    ])
+    db.commit()
+
+def _export_peak(token: str) -> int:
+    """tracemalloc peak of one export, with the body discarded chunk by chunk."""
+    path = f"{API}/bookings/export"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"test"), (b"authorization", token.encode())],
+        "client": ("127.0.0.1", 0), "server": ("test", 80),
+    }
+    status = 0
+    done = asyncio.Event()
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            done.set()
+
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    asyncio.run(app(scope, receive, send))
+    _, peak = tracemalloc.get_traced_memory()
+    assert status == 200
+    return peak - baseline
+
+def test_export_peak_memory_is_sublinear(client, db, monkeypatch):
+    monkeypatch.setattr(bookings, "EXPORT_BATCH_SIZE", 50)
+    token = client.headers["Authorization"]
+    peaks = []
+    tracemalloc.start()
+    try:
+        for n in (500, 2000):
+            _seed(db, n)
+            _export_peak(token)  # warm-up, so imports and caches don't count
+            peaks.append(_export_peak(token))
+    finally:
+        tracemalloc.stop()
+    assert peaks[1] / max(peaks[0], 1) < 2.5, peaks
@@ -0,0 +1,57 @@
+from app.models.hotel import BookingChange, Room
+
+from .conftest import API, book, day, inventory
+
+def modify(client, booking_id, **body):
+    return client.post(f"{API}/bookings/{booking_id}/modify", json=body)
+
+def test_extending_prices_only_the_added_nights(client):
+    booking = book(client, 0, 3, room_id=1).json()  # Monday to Thursday
+    assert booking["total_price"] == 300
+    # Thursday and Friday nights; Friday is a weekend night
+    response = modify(client, booking["id"], check_out_date=day(5))
+    assert response.status_code == 200
+    assert response.json()["total_price"] == 300 + 100 + 150
+    assert inventory(client, 0, 5) == [(1, 0, 1)] * 6
+
+def test_shortening_takes_off_only_the_removed_nights(client):
+    booking = book(client, 0, 6, room_id=1).json()
+    assert booking["total_price"] == 4 * 100 + 2 * 150
+    response = modify(client, booking["id"], check_in_date=day(2), check_out_date=day(5), reason="Shorter trip")
+    assert response.json()["total_price"] == 100 + 100 + 150
+    assert inventory(client, 0, 6) == [(0, 0, 2)] * 2 + [(1, 0, 1)] * 4 + [(0, 0, 2)]
+
+    change = client.get(f"{API}/bookings/{booking['id']}/changes").json()[0]
+    assert (change["old_check_in_date"], change["new_check_in_date"]) == (day(0), day(2))
+    assert (change["old_total_price"], change["new_total_price"]) == (700, 350)
+    assert change["reason"] == "Shorter trip"
+
+def test_only_the_added_days_are_checked_for_conflicts(client):
+    booking = book(client, 0, 2, room_id=1).json()
+    book(client, 2, 4, room_type="GUEST_HOUSE", guest_id=2)
+    client.post(f"{API}/bookings/{book(client, 5, 6, room_id=2, guest_id=3).json()['id']}/assign", json={"room_id": 1})
+    response = modify(client, booking["id"], check_out_date=day(5))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Room 100 is already booked for these dates"
+    assert modify(client, booking["id"], check_out_date=day(4)).status_code == 200
+
+def test_failed_modification_changes_nothing(client, db):
+    booking = book(client, 0, 2, room_type="GUEST_HOUSE").json()
+    book(client, 3, 5, room_type="GUEST_HOUSE", guest_id=2)
+    book(client, 3, 5, room_type="GUEST_HOUSE", guest_id=3)
+    before = inventory(client, 0, 5)
+    response = modify(client, booking["id"], check_out_date=day(4))
+    assert response.status_code == 400
+    assert inventory(client, 0, 5) == before
+    assert client.get(f"{API}/bookings/{booking['id']}").json()["check_out_date"] == day(2)
+    assert db.query(BookingChange).count() == 0
+
+def test_moving_frees_the_old_room(client, db):
+    booking = book(client, 0, 2, room_id=1).json()
+    response = modify(client, booking["id"], room_id=2)
+    assert response.status_code == 200
+    assert response.json()["total_price"] == booking["total_price"]
+    db.expire_all()
+    assert db.get(Room, 1).is_available is True
+    assert db.get(Room, 2).is_available is False
+    assert book(client, 0, 2, room_id=1, guest_id=2).status_code == 200
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from app.models.hotel import RoomInventory, RoomType
+from app.services.night_audit import run_night_audit
+
+from .conftest import API, MONDAY, book, inventory
+
+def test_no_shows_give_back_only_their_days(client, db):
+    no_show = book(client, 0, 4, room_type="GUEST_HOUSE").json()
+    book(client, 10, 12, room_type="GUEST_HOUSE", guest_id=2)
+    # Drift on a day no no-show covers is left for a full recount to repair
+    db.query(RoomInventory).filter(
+        RoomInventory.room_type == RoomType.GUEST_HOUSE, RoomInventory.night == MONDAY + timedelta(days=11),
+    ).update({"sold": 2})
+    db.commit()
+
+    run = run_night_audit(db, MONDAY + timedelta(days=1), chunk_size=2)
+    assert run.status == "completed" and run.no_shows == 1
+    assert client.get(f"{API}/bookings/{no_show['id']}").json()["status"] == "no_show"
+    assert inventory(client, 0, 4) == [(0, 0, 2)] * 5
+    assert inventory(client, 10, 12) == [(1, 0, 1), (2, 0, 0), (1, 0, 1)]
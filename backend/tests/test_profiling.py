@@ -0,0 +1,9 @@
+from datetime import timedelta
+
+from app.core.profiling import _is_superuser_token
+from app.core.security import create_access_token
+
+def test_only_unexpired_superuser_tokens_can_profile(db):
+    assert _is_superuser_token(f"Bearer {create_access_token(1)}")
+    assert not _is_superuser_token(f"Bearer {create_access_token(1, expires_delta=timedelta(minutes=-1))}")
+    assert not _is_superuser_token(create_access_token(1))
@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core import sql_timing
+
+def test_failed_statements_leave_no_start_time_behind():
+    engine = create_engine("sqlite://")
+    sql_timing.instrument_engine(engine)
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert conn.info["query_start_time"] == []
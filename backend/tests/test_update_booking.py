@@ -0,0 +1,71 @@
+"""
+PUT /bookings/{id} as one unit of work, a pytest version of
+benchmarks/bench_update_booking.py.
+"""
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.crud.hotel import booking as crud_booking
+from app.db.session import SessionLocal, engine
+from app.models.hotel import Booking, FinancialTransaction, Room
+from app.schemas.hotel import BookingUpdate
+from app.services import booking_updates
+
+from .conftest import API, book
+
+class Counter:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement.split(None, 1)[0].upper())
+
+    def commit(self, conn):
+        self.commits += 1
+
+@pytest.fixture
+def counter():
+    counter = Counter()
+    event.listen(engine, "after_cursor_execute", counter.after_cursor_execute)
+    event.listen(engine, "commit", counter.commit)
+    yield counter
+    event.remove(engine, "after_cursor_execute", counter.after_cursor_execute)
+    event.remove(engine, "commit", counter.commit)
+
+@pytest.mark.parametrize("body", [
+    {"status": "checked_in"},
+    {"special_requests": "late arrival"},
+    {"status": "checked_out", "payment_status": "paid"},
+])
+def test_update_commits_once(client, counter, body):
+    booking_id = book(client, 0, 2, room_id=1).json()["id"]
+    counter.statements, counter.commits = [], 0
+    assert client.put(f"{API}/bookings/{booking_id}", json=body).status_code == 200
+    assert counter.commits == 1
+    assert counter.statements.count("UPDATE") <= 3, counter.statements
+
+def test_stale_update_changes_nothing(client, db, counter):
+    created = book(client, 0, 2, room_id=1).json()
+    session = SessionLocal()
+    try:
+        stale = crud_booking.get_with_relations(session, id=created["id"])
+        # Another request moves the booking to a new version meanwhile
+        assert client.put(f"{API}/bookings/{created['id']}", json={"special_requests": "late"}).status_code == 200
+        counter.commits = 0
+        with pytest.raises(StaleDataError):
+            booking_updates.update_booking(
+                session, stale, BookingUpdate(status="checked_out", payment_status="paid")
+            )
+        assert counter.commits == 0
+    finally:
+        session.close()
+
+    db.expire_all()
+    booking = db.get(Booking, created["id"])
+    assert booking.status.value == created["status"]
+    assert booking.payment_status == created["payment_status"]
+    assert booking.special_requests == "late"
+    assert db.get(Room, 1).is_available is False
+    assert db.query(FinancialTransaction).count() == 0